@@ -0,0 +1,92 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+"""Benchmarks `detect_fixations` against the original implementation.
+
+Run with `python pupil_src/benchmarks/bench_fixation_detector.py`.
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+pupil_src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(pupil_src_dir, "shared_modules"))
+# the reference implementation is part of the tests
+sys.path.append(pupil_src_dir)
+
+import file_methods as fm
+import numpy as np
+from camera_models import Dummy_Camera
+from fixation_detector import detect_fixations
+from tests.test_fixation_detector import _detect_fixations_reference
+
+
+def bench_detect_fixations():
+    rng = np.random.default_rng(0)
+    duration, sampling_rate = 5 * 60, 200  # 5 min recording
+    timestamps = np.arange(0, duration, 1 / sampling_rate)
+    # fixations of random length with gaze jitter, connected by saccades
+    targets = rng.uniform(-200, 200, size=(len(timestamps) // 10, 3))
+    targets[:, 2] = 500
+    target_idc = np.cumsum(rng.integers(10, 300, size=len(targets)))
+    target_idc = np.searchsorted(target_idc, np.arange(len(timestamps)))
+    gaze_points = targets[np.minimum(target_idc, len(targets) - 1)]
+    gaze_points = gaze_points + rng.normal(scale=2.0, size=gaze_points.shape)
+    gaze_data = [
+        fm.Serialized_Dict(
+            python_dict={
+                "topic": "gaze.3d.01.",
+                "timestamp": float(ts),
+                "confidence": 1.0,
+                "norm_pos": [0.5 + p[0] / 1000, 0.5 + p[1] / 1000],
+                "gaze_point_3d": p.tolist(),
+            }
+        ).serialized
+        for ts, p in zip(timestamps, gaze_points)
+    ]
+    gaze_data_2d = [
+        fm.Serialized_Dict(
+            python_dict={
+                k: v
+                for k, v in fm.Serialized_Dict(msgpack_bytes=gp).items()
+                if k != "gaze_point_3d"
+            }
+        ).serialized
+        for gp in gaze_data
+    ]
+
+    cap = SimpleNamespace()
+    cap.frame_size = (1280, 720)
+    cap.intrinsics = Dummy_Camera("bench", cap.frame_size)
+    cap.timestamps = timestamps[::6]
+
+    configs = {
+        "3d gaze, default": (gaze_data, 1.5, 0.08, 0.22),
+        "3d gaze, long fixations": (gaze_data, 1.5, 0.3, 1.5),
+        "2d gaze, default": (gaze_data_2d, 1.5, 0.08, 0.22),
+    }
+    for name, (data, max_dispersion, min_duration, max_duration) in configs.items():
+        print(f"{name} ({len(data)} gaze data):")
+        args = (cap, data, np.deg2rad(max_dispersion), min_duration, max_duration, 0)
+        results = {}
+        for detector in (_detect_fixations_reference, detect_fixations):
+            start = time.perf_counter()
+            results[detector] = [fix for _, fix in detector(*args) if fix]
+            print(
+                f"\t{detector.__name__}: {len(results[detector])} fixations in "
+                f"{time.perf_counter() - start:.2f} sec"
+            )
+        identical = results[_detect_fixations_reference] == results[detect_fixations]
+        print(f"\tIdentical results: {identical}")
+
+
+if __name__ == "__main__":
+    bench_detect_fixations()
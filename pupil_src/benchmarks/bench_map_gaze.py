@@ -0,0 +1,106 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+"""Benchmarks batched against per-sample mapping of pupil data to gaze.
+
+Run with `python pupil_src/benchmarks/bench_map_gaze.py`.
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+pupil_src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(pupil_src_dir, "shared_modules"))
+
+import cv2
+import numpy as np
+from camera_models import Radial_Dist_Camera
+from gaze_mapping.gazer_2d import Gazer2D
+from gaze_mapping.gazer_3d.gazer_headset import Gazer3D
+from gaze_producer.worker.map_gaze import MAP_GAZE_BATCH_SIZE
+
+
+def bench_map_pupil_to_gaze(duration_s=10 * 60, eye_frame_rate=200):
+    """Benchmarks batched against per-sample gaze mapping of synthetic pupil data"""
+    rng = np.random.default_rng(0)
+    resolution = (1280, 720)
+    K = [[800.0, 0.0, 640.0], [0.0, 800.0, 360.0], [0.0, 0.0, 1.0]]
+    intrinsics = Radial_Dist_Camera("world", resolution, K, [[0.0] * 5])
+    fake_g_pool = SimpleNamespace(
+        capture=SimpleNamespace(intrinsics=intrinsics, frame_size=resolution)
+    )
+
+    def eye_matrix(rotation_vector, translation):
+        matrix = np.eye(4)
+        matrix[:3, :3] = cv2.Rodrigues(np.array(rotation_vector, dtype=float))[0]
+        matrix[:3, 3] = translation
+        return matrix.tolist()
+
+    matrix0 = eye_matrix([0.1, 2.9, 0.1], [20, 15, -20])
+    matrix1 = eye_matrix([-0.1, 2.9, -0.1], [-40, 15, -20])
+    params_3d = {
+        "left_model": {"eye_camera_to_world_matrix": matrix1, "gaze_distance": 500},
+        "right_model": {"eye_camera_to_world_matrix": matrix0, "gaze_distance": 500},
+        "binocular_model": {
+            "eye_camera_to_world_matrix0": matrix0,
+            "eye_camera_to_world_matrix1": matrix1,
+        },
+    }
+
+    def params_2d(feature_count):
+        return {
+            "coef_": rng.normal(size=(2, feature_count)).tolist(),
+            "intercept_": rng.normal(size=2).tolist(),
+        }
+
+    params_2d = {
+        "left_model": params_2d(6),
+        "right_model": params_2d(6),
+        "binocular_model": params_2d(12),
+    }
+
+    num_samples = int(duration_s * eye_frame_rate)
+    pupil_data = []
+    for eye_id in (0, 1):
+        timestamps = np.arange(num_samples) / eye_frame_rate + eye_id * 1e-3
+        normals = rng.normal([0, 0, -1], 0.2, size=(num_samples, 3))
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        for ts, normal in zip(timestamps.tolist(), normals.tolist()):
+            pupil_data.append(
+                {
+                    "id": eye_id,
+                    "topic": f"pupil.{eye_id}",
+                    "method": "3d c++ 2d",
+                    "timestamp": ts,
+                    "confidence": 0.9,
+                    "norm_pos": [0.5, 0.5],
+                    "sphere": {"center": [0.0, 0.0, 35.0]},
+                    "circle_3d": {"normal": normal},
+                }
+            )
+    print(f"Mapping {len(pupil_data)} pupil data ({duration_s / 60:.0f} min)")
+
+    for gazer_cls, params in ((Gazer2D, params_2d), (Gazer3D, params_3d)):
+        for batch_size in (None, MAP_GAZE_BATCH_SIZE):
+            gazer = gazer_cls(fake_g_pool, params=params)
+            start = time.perf_counter()
+            num_gaze = sum(
+                1 for _ in gazer.map_pupil_to_gaze(pupil_data, batch_size=batch_size)
+            )
+            duration = time.perf_counter() - start
+            print(
+                f"\t{gazer_cls.__name__} batch_size={batch_size}: "
+                f"{duration:.2f} sec for {num_gaze} gaze"
+            )
+
+
+if __name__ == "__main__":
+    bench_map_pupil_to_gaze()
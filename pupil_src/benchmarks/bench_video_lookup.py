@@ -0,0 +1,63 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+"""Benchmarks building the lookup table of a video with and without the container
+index.
+
+Run with `python pupil_src/benchmarks/bench_video_lookup.py`.
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+pupil_src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(pupil_src_dir, "shared_modules"))
+
+import av
+import numpy as np
+from video_capture.utils import Video, VideoSet
+
+
+def bench_build_lookup(duration_s=60 * 60, frame_rate=30):
+    """Benchmarks the first open of a recording, i.e. building its lookup table"""
+    with tempfile.TemporaryDirectory() as rec_dir:
+        num_frames = int(duration_s * frame_rate)
+        print(f"Writing {duration_s / 60:.0f} min test video ({num_frames} frames)...")
+        with av.open(os.path.join(rec_dir, "world.mp4"), "w") as container:
+            stream = container.add_stream("mpeg4", rate=frame_rate)
+            stream.width = stream.height = 32
+            stream.pix_fmt = "yuv420p"
+            image = np.zeros((32, 32, 3), dtype=np.uint8)
+            for frame_idx in range(num_frames):
+                frame = av.VideoFrame.from_ndarray(image, format="rgb24")
+                frame.pts = frame_idx
+                container.mux(stream.encode(frame))
+            container.mux(stream.encode())
+        timestamps = np.arange(num_frames) / frame_rate
+        np.save(os.path.join(rec_dir, "world_timestamps.npy"), timestamps)
+
+        def build_lookup():
+            start = time.perf_counter()
+            video_set = VideoSet(rec_dir, "world", fill_gaps=True)
+            video_set.build_lookup()
+            return video_set.lookup, time.perf_counter() - start
+
+        lookup, duration = build_lookup()
+        print(f"\tpts from container index: {duration:.2f} sec")
+        with mock.patch.object(Video, "_pts_from_index", return_value=None):
+            demux_lookup, demux_duration = build_lookup()
+        print(f"\tpts from demuxing all packets: {demux_duration:.2f} sec")
+        print(f"\tIdentical lookup tables: {np.array_equal(lookup, demux_lookup)}")
+
+
+if __name__ == "__main__":
+    bench_build_lookup()
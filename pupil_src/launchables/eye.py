@@ -77,7 +77,8 @@ def eye(
         ``eye_process.should_stop``: Stops the eye process
         ``recording.started``: Starts recording eye video
         ``recording.stopped``: Stops recording eye video
-        ``frame_publishing.started``: Starts frame publishing
+        ``frame_publishing.started``: Starts frame publishing, optionally via
+            shared memory if ``shared_memory`` is true
         ``frame_publishing.stopped``: Stops frame publishing
         ``start_eye_plugin``: Start plugins in eye process
 
@@ -134,7 +135,12 @@ def eye(
 
         # monitoring
         import psutil
-        from av_writer import JPEG_Writer, MPEG_Writer, NonMonotonicTimestampError
+        from av_writer import (
+            Async_Video_Writer,
+            JPEG_Writer,
+            MPEG_Writer,
+            NonMonotonicTimestampError,
+        )
         from background_helper import IPC_Logging_Task_Proxy
         from file_methods import Persistent_Dict
         from gl_utils import (
@@ -155,6 +161,7 @@ def eye(
         from pyglui import cygl, graph, ui
         from pyglui.cygl.utils import Named_Texture
         from roi import Roi
+        from shared_frame_buffer import Shared_Frame_Writer
 
         # helpers/utils
         from uvc import get_time_monotonic
@@ -272,8 +279,7 @@ def eye(
 
             if all(c > 0 for c in g_pool.camera_render_size):
                 glViewport(0, 0, *g_pool.camera_render_size)
-                for p in g_pool.plugins:
-                    p.gl_display()
+                g_pool.plugins.call("gl_display")
 
             glViewport(0, 0, *window_size)
             # render graphs
@@ -605,6 +611,9 @@ def eye(
         should_publish_frames = False
         frame_publish_format = "jpeg"
         frame_publish_format_recent_warning = False
+        # frames are published via shared memory to local subscribers only
+        frame_publish_shared_memory = False
+        shared_frame_writer = None
 
         # create a timer to control window update frequency
         window_update_timer = timer(1 / 60)
@@ -628,7 +637,12 @@ def eye(
 
         # Event loop
         window_should_close = False
+        last_loop_start = time.perf_counter()
         while not window_should_close:
+            loop_start = time.perf_counter()
+            g_pool.plugins.timing.add_duration("loop", loop_start - last_loop_start)
+            last_loop_start = loop_start
+
             if notify_sub.new_data:
                 t, notification = notify_sub.recv()
                 subject = notification["subject"]
@@ -643,16 +657,21 @@ def eye(
                         logger.debug(f"Saving eye video to: {g_pool.rec_path}")
                         video_path = os.path.join(g_pool.rec_path, f"eye{eye_id}.mp4")
                         if raw_mode and frame and g_pool.capture.jpeg_support:
-                            g_pool.writer = JPEG_Writer(video_path, start_time_synced)
+                            writer = JPEG_Writer(video_path, start_time_synced)
                         elif hasattr(g_pool.capture._recent_frame, "h264_buffer"):
-                            g_pool.writer = H264Writer(
+                            writer = H264Writer(
                                 video_path,
                                 g_pool.capture.frame_size[0],
                                 g_pool.capture.frame_size[1],
                                 g_pool.capture.frame_rate,
                             )
                         else:
-                            g_pool.writer = MPEG_Writer(video_path, start_time_synced)
+                            writer = MPEG_Writer(video_path, start_time_synced)
+                        # encode in the background and rather drop video frames
+                        # than slowing down pupil detection
+                        g_pool.writer = Async_Video_Writer(
+                            writer, max_queued_frames=100, max_wait_s=0.0
+                        )
                 elif subject == "recording.stopped":
                     if g_pool.writer:
                         logger.debug("Done recording.")
@@ -675,12 +694,22 @@ def eye(
                             "doc": eye.__doc__,
                         }
                     )
+                elif subject == "plugin_timing.should_report":
+                    ipc_socket.notify(
+                        g_pool.plugins.timing.report_notification(
+                            g_pool.process, reset=notification.get("reset", False)
+                        )
+                    )
                 elif subject.startswith("frame_publishing.started"):
                     should_publish_frames = True
                     frame_publish_format = notification.get("format", "jpeg")
+                    frame_publish_shared_memory = notification.get(
+                        "shared_memory", False
+                    )
                 elif subject.startswith("frame_publishing.stopped"):
                     should_publish_frames = False
                     frame_publish_format = "jpeg"
+                    frame_publish_shared_memory = False
                 elif (
                     subject.startswith("start_eye_plugin")
                     and notification["target"] == g_pool.process
@@ -704,12 +733,10 @@ def eye(
                         plugin_to_stop.alive = False
                         g_pool.plugins.clean()
 
-                for plugin in g_pool.plugins:
-                    plugin.on_notify(notification)
+                g_pool.plugins.call("on_notify", notification)
 
             event = {}
-            for plugin in g_pool.plugins:
-                plugin.recent_events(event)
+            g_pool.plugins.call("recent_events", event)
 
             frame = event.get("frame")
             if frame:
@@ -734,17 +761,25 @@ def eye(
                             )
                     else:
                         frame_publish_format_recent_warning = False
-                        pupil_socket.send(
-                            {
-                                "topic": f"frame.eye.{eye_id}",
-                                "width": frame.width,
-                                "height": frame.height,
-                                "index": frame.index,
-                                "timestamp": frame.timestamp,
-                                "format": frame_publish_format,
-                                "__raw_data__": [data],
-                            }
-                        )
+                        frame_dict = {
+                            "topic": f"frame.eye.{eye_id}",
+                            "width": frame.width,
+                            "height": frame.height,
+                            "index": frame.index,
+                            "timestamp": frame.timestamp,
+                            "format": frame_publish_format,
+                        }
+                        if frame_publish_shared_memory:
+                            if shared_frame_writer is None:
+                                shared_frame_writer = Shared_Frame_Writer(
+                                    f"eye{eye_id}"
+                                )
+                            frame_dict["shared_memory"] = shared_frame_writer.write(
+                                data
+                            )
+                        else:
+                            frame_dict["__raw_data__"] = [data]
+                        pupil_socket.send(frame_dict)
 
                 t = frame.timestamp
                 dt, ts = t - ts, t
@@ -754,6 +789,9 @@ def eye(
                     pass
 
                 if g_pool.writer:
+                    g_pool.plugins.timing.add_value(
+                        "video_writer_queue", g_pool.writer.queued_frame_count
+                    )
                     try:
                         g_pool.writer.write_video_frame(frame)
                     except NonMonotonicTimestampError as e:
@@ -769,6 +807,9 @@ def eye(
 
                 for result in event.get(EVENT_KEY, ()):
                     pupil_socket.send(result)
+                g_pool.plugins.timing.add_duration(
+                    "frame_to_publish", g_pool.get_timestamp() - frame.timestamp
+                )
 
             # GL drawing
             if window_should_update():
@@ -786,6 +827,9 @@ def eye(
             g_pool.writer.release()
             g_pool.writer = None
 
+        if shared_frame_writer is not None:
+            shared_frame_writer.close()
+
         session_settings["loaded_plugins"] = g_pool.plugins.get_initializers()
         # save session persistent settings
         session_settings["flip"] = g_pool.flip
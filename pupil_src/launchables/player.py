@@ -198,8 +198,7 @@ def player(
         def consume_events_and_render_buffer():
             gl_utils.glViewport(0, 0, *g_pool.camera_render_size)
             g_pool.capture.gl_display()
-            for p in g_pool.plugins:
-                p.gl_display()
+            g_pool.plugins.call("gl_display")
 
             gl_utils.glViewport(0, 0, *window_size)
 
@@ -358,6 +357,8 @@ def player(
                 source_path=video_path,
                 buffered_decoding=True,
                 fill_gaps=True,
+                frame_cache_mb=512,
+                read_ahead=True,
             )
         except AttributeError:
             logger.warning(
@@ -369,6 +370,8 @@ def player(
                 source_path=video_path,
                 buffered_decoding=False,
                 fill_gaps=True,
+                frame_cache_mb=512,
+                read_ahead=True,
             )
 
         # load session persistent settings
@@ -701,6 +704,12 @@ def player(
                                 "doc": p.on_notify.__doc__,
                             }
                         )
+            elif subject == "plugin_timing.should_report":
+                ipc_pub.notify(
+                    g_pool.plugins.timing.report_notification(
+                        g_pool.process, reset=n.get("reset", False)
+                    )
+                )
 
         while not glfw.window_should_close(main_window) and not process_was_interrupted:
             # fetch newest notifications
@@ -712,20 +721,19 @@ def player(
             # notify each plugin if there are new notifications:
             for n in new_notifications:
                 handle_notifications(n)
-                for p in g_pool.plugins:
-                    p.on_notify(n)
+                g_pool.plugins.call("on_notify", n)
 
             events = {}
             # report time between now and the last loop interation
             events["dt"] = get_dt()
+            g_pool.plugins.timing.add_duration("loop", events["dt"])
 
             # pupil and gaze positions are added by their respective producer plugins
             events["pupil"] = []
             events["gaze"] = []
 
             # allow each Plugin to do its work.
-            for p in g_pool.plugins:
-                p.recent_events(events)
+            g_pool.plugins.call("recent_events", events)
 
             # check if a plugin need to be destroyed
             g_pool.plugins.clean()
@@ -736,8 +744,7 @@ def player(
             if gl_utils.is_window_visible(main_window):
                 gl_utils.glViewport(0, 0, *g_pool.camera_render_size)
                 g_pool.capture.gl_display()
-                for p in g_pool.plugins:
-                    p.gl_display()
+                g_pool.plugins.call("gl_display")
 
                 gl_utils.glViewport(0, 0, *window_size)
 
@@ -254,6 +254,12 @@ def service(
                                 "doc": p.on_notify.__doc__,
                             }
                         )
+            elif subject == "plugin_timing.should_report":
+                ipc_pub.notify(
+                    g_pool.plugins.timing.report_notification(
+                        g_pool.app, reset=n.get("reset", False)
+                    )
+                )
 
         # initiate ui update loop
         ipc_pub.notify(
@@ -281,14 +287,12 @@ def service(
                         gaze_pub.send(gaze_datum)
                         events["gaze"].append(gaze_datum)
 
-                for plugin in g_pool.plugins:
-                    plugin.recent_events(events=events)
+                g_pool.plugins.call("recent_events", events)
 
             if notify_sub.socket in socks:
                 topic, n = notify_sub.recv()
                 handle_notifications(n)
-                for plugin in g_pool.plugins:
-                    plugin.on_notify(n)
+                g_pool.plugins.call("on_notify", n)
 
             # check if a plugin need to be destroyed
             g_pool.plugins.clean()
@@ -340,8 +340,7 @@ def world(
 
         def consume_events_and_render_buffer():
             gl_utils.glViewport(0, 0, *camera_render_size)
-            for p in g_pool.plugins:
-                p.gl_display()
+            g_pool.plugins.call("gl_display")
 
             gl_utils.glViewport(0, 0, *window_size)
             try:
@@ -519,6 +518,12 @@ def world(
                                 "doc": p.on_notify.__doc__,
                             }
                         )
+            elif subject == "plugin_timing.should_report":
+                ipc_pub.notify(
+                    g_pool.plugins.timing.report_notification(
+                        g_pool.process, reset=noti.get("reset", False)
+                    )
+                )
             elif subject == "world_process.adapt_window_size":
                 set_window_size()
             elif subject == "world_process.should_stop":
@@ -735,20 +740,21 @@ def world(
                 t, n = notify_sub.recv()
                 new_notifications.append(n)
 
+            g_pool.plugins.timing.add_value("notifications", len(new_notifications))
+
             # notify each plugin if there are new notifications:
             for n in new_notifications:
                 handle_notifications(n)
-                for p in g_pool.plugins:
-                    p.on_notify(n)
+                g_pool.plugins.call("on_notify", n)
 
             # a dictionary that allows plugins to post and read events
             events = {}
             # report time between now and the last loop interation
             events["dt"] = get_dt()
+            g_pool.plugins.timing.add_duration("loop", events["dt"])
 
             # allow each Plugin to do its work.
-            for p in g_pool.plugins:
-                p.recent_events(events)
+            g_pool.plugins.call("recent_events", events)
 
             # check if a plugin need to be destroyed
             g_pool.plugins.clean()
@@ -760,8 +766,7 @@ def world(
             events.pop("annotation", None)
 
             # send new events to ipc:
-            if "frame" in events:
-                del events["frame"]  # send explicitly with frame publisher
+            frame = events.pop("frame", None)  # send explicitly with frame publisher
             if "depth_frame" in events:
                 del events["depth_frame"]
             if "audio_packets" in events:
@@ -771,14 +776,17 @@ def world(
                 assert isinstance(data, (list, tuple))
                 for d in data:
                     ipc_pub.send(d)
+            if frame is not None:
+                g_pool.plugins.timing.add_duration(
+                    "frame_to_publish", g_pool.get_timestamp() - frame.timestamp
+                )
 
             glfw.make_context_current(main_window)
             # render visual feedback from loaded plugins
             glfw.poll_events()
             if window_should_update() and gl_utils.is_window_visible(main_window):
                 gl_utils.glViewport(0, 0, *camera_render_size)
-                for p in g_pool.plugins:
-                    p.gl_display()
+                g_pool.plugins.call("gl_display")
 
                 gl_utils.glViewport(0, 0, *window_size)
                 try:
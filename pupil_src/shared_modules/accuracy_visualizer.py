@@ -29,6 +29,8 @@ from plugin import Plugin
 
 logger = logging.getLogger(__name__)
 
+GAZE_MAPPING_BATCH_SIZE = 1000
+
 
 class CalculationResult(T.NamedTuple):
     result: float
@@ -433,7 +435,9 @@ class Accuracy_Visualizer(Plugin):
     ) -> AccuracyPrecisionResult:
         gazer = gazer_class(g_pool, params=gazer_params)
 
-        gaze_pos = gazer.map_pupil_to_gaze(pupil_list)
+        gaze_pos = gazer.map_pupil_to_gaze(
+            pupil_list, batch_size=GAZE_MAPPING_BATCH_SIZE
+        )
         ref_pos = ref_list
 
         try:
@@ -14,6 +14,8 @@ import logging
 import math
 import multiprocessing as mp
 import os
+import queue
+import threading
 import typing as T
 from fractions import Fraction
 
@@ -327,6 +329,99 @@ class JPEG_Writer(AV_Writer):
         yield packet
 
 
+class Async_Video_Writer:
+    """Writes video frames with a wrapped writer on a dedicated thread.
+
+    Encoding and muxing run in the background, such that they do not slow down the
+    process that captures the frames. Frames are passed by reference and must not be
+    modified after calling `write_video_frame()`.
+
+    Back-pressure: At most `max_queued_frames` frames are waiting to be written. If
+    the queue is full, `write_video_frame()` waits up to `max_wait_s` seconds for the
+    writer thread (indefinitely if None) and drops the frame afterwards. Dropped
+    frames are counted in `dropped_frame_count` and reported on release.
+
+    Exceptions of the wrapped writer, e.g. `NonMonotonicTimestampError`, are raised
+    by the next call to `write_video_frame()`. Later frames are not written anymore.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        writer,
+        max_queued_frames: int = 30,
+        max_wait_s: T.Optional[float] = None,
+    ):
+        self.writer = writer
+        self.max_wait_s = max_wait_s
+        self.written_frame_count = 0
+        self.dropped_frame_count = 0
+        self._error = None
+        self._frame_queue = queue.Queue(maxsize=max_queued_frames)
+        self._thread = threading.Thread(
+            target=self._write_queued_frames, name=type(self).__name__, daemon=True
+        )
+        self._thread.start()
+
+    def write_video_frame(self, input_frame):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+        if not self._thread.is_alive():
+            logger.warning("Container was closed already!")
+            return
+
+        try:
+            if self.max_wait_s is None:
+                self._frame_queue.put(input_frame)
+            else:
+                self._frame_queue.put(input_frame, timeout=self.max_wait_s)
+        except queue.Full:
+            self.dropped_frame_count += 1
+
+    @property
+    def queued_frame_count(self) -> int:
+        return self._frame_queue.qsize()
+
+    def release(self):
+        """Write all queued frames and close the wrapped writer."""
+        if self._thread.is_alive():
+            self._frame_queue.put(self._STOP)
+            self._thread.join()
+
+        if self.dropped_frame_count:
+            logger.warning(
+                f"Dropped {self.dropped_frame_count} of "
+                f"{self.dropped_frame_count + self.written_frame_count} video frames, "
+                "because encoding could not keep up!"
+            )
+        if self._error is not None:
+            logger.error(f"Writing video frames failed: {self._error}")
+        self.writer.release()
+
+    def _write_queued_frames(self):
+        while True:
+            input_frame = self._frame_queue.get()
+            if input_frame is self._STOP:
+                return
+            try:
+                self.writer.write_video_frame(input_frame)
+            except Exception as err:
+                self._error = err
+                self._discard_queued_frames()
+                return
+            self.written_frame_count += 1
+
+    def _discard_queued_frames(self):
+        while True:
+            try:
+                self._frame_queue.get_nowait()
+            except queue.Empty:
+                return
+
+
 class MPEG_Audio_Writer(MPEG_Writer):
     """Extension of MPEG_Writer with audio support."""
 
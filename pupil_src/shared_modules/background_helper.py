@@ -166,6 +166,39 @@ class IPC_Logging_Task_Proxy(Task_Proxy):
         logger.root.setLevel(logging.NOTSET)
 
 
+class Task_Proxy_Group:
+    """Combines multiple task proxies into a single one.
+
+    Results are fetched alternately from all tasks, such that no task is blocked by
+    a full pipe while the foreground is busy with the results of another task.
+    """
+
+    def __init__(self, proxies):
+        self.proxies = list(proxies)
+
+    def fetch(self):
+        """Fetches progress and available results from all tasks"""
+        fetchers = [proxy.fetch() for proxy in self.proxies]
+        while fetchers:
+            for fetcher in fetchers.copy():
+                try:
+                    yield next(fetcher)
+                except StopIteration:
+                    fetchers.remove(fetcher)
+
+    def cancel(self, timeout=1):
+        for proxy in self.proxies:
+            proxy.cancel(timeout)
+
+    @property
+    def completed(self):
+        return all(proxy.completed for proxy in self.proxies)
+
+    @property
+    def canceled(self):
+        return any(proxy.canceled for proxy in self.proxies)
+
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.DEBUG,
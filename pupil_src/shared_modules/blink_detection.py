@@ -12,6 +12,7 @@ import csv
 import logging
 import os
 import time
+import typing as T
 from collections import deque
 
 import csv_utils
@@ -37,6 +38,33 @@ blink_color = cygl_utils.RGBA(0.9961, 0.3789, 0.5313, 0.8)
 threshold_color = cygl_utils.RGBA(0.9961, 0.8438, 0.3984, 0.8)
 
 
+def blink_intervals(response_classification) -> T.Tuple[np.ndarray, np.ndarray]:
+    """Finds blinks in a classified filter response.
+
+    A blink starts at the first onset (1) after the previous blink and ends at the
+    last sample of the first offset run (-1) following its start. Returns the start
+    and end indices of all blinks.
+    """
+    classification = np.asarray(response_classification)
+    is_offset = (classification == -1).astype(np.int8)
+    edges = np.diff(is_offset, prepend=0, append=0)
+    offset_run_starts = np.flatnonzero(edges == 1)
+    offset_run_stops = np.flatnonzero(edges == -1)
+
+    # A blink is in progress at the beginning of an offset run iff there was an
+    # onset since the end of the previous offset run.
+    onset_idc = np.flatnonzero(classification > 0)
+    previous_run_stops = np.concatenate(([0], offset_run_stops[:-1]))
+    next_onsets = np.searchsorted(onset_idc, previous_run_stops)
+    # sentinel onset after the last sample never starts a blink
+    onset_idc = np.append(onset_idc, len(classification))
+    start_idc = onset_idc[next_onsets]
+    ends_blink = start_idc < offset_run_starts
+    start_idc = start_idc[ends_blink]
+    end_idc = offset_run_stops[ends_blink] - 1
+    return start_idc, end_idc
+
+
 class Blink_Detection(Plugin):
     """
     This plugin implements a blink detection algorithm, based on sudden drops in the
@@ -218,6 +246,8 @@ class Offline_Blink_Detection(Observable, Blink_Detection):
         self.filter_response = []
         self.response_classification = []
         self.timestamps = []
+        # Filter response only depends on the data and the history length
+        self._filter_response_key = None
         g_pool.blinks = pm.Affiliator()
         self.cache = {"response_points": (), "class_points": (), "thresholds": ()}
 
@@ -271,6 +301,7 @@ class Offline_Blink_Detection(Observable, Blink_Detection):
 
     def _on_pupil_positions_changed(self):
         logger.info("Pupil postions changed. Recalculating.")
+        self._filter_response_key = None
         self.recalculate()
 
     def export(self, export_window, export_dir):
@@ -341,27 +372,20 @@ class Offline_Blink_Detection(Observable, Blink_Detection):
             self.filter_response = []
             self.response_classification = []
             self.timestamps = []
+            self._filter_response_key = None
+            self.cache["response_points"] = ()
             self.consolidate_classifications()
             return
 
-        self.timestamps = all_pp.timestamps
-        total_time = self.timestamps[-1] - self.timestamps[0]
-
-        conf_iter = (pp["confidence"] for pp in all_pp)
-        activity = np.fromiter(conf_iter, dtype=float, count=len(all_pp))
-        total_time = all_pp[-1]["timestamp"] - all_pp[0]["timestamp"]
-        filter_size = 2 * round(len(all_pp) * self.history_length / total_time / 2.0)
-        blink_filter = np.ones(filter_size) / filter_size
-
-        # This is different from the online filter. Convolution will flip
-        # the filter and result in a reverse filter response. Therefore
-        # we set the first half of the filter to -1 instead of the second
-        # half such that we get the expected result.
-        blink_filter[: filter_size // 2] *= -1
-
-        # The theoretical response maximum is +-0.5
-        # Response of +-0.45 seems sufficient for a confidence of 1.
-        self.filter_response = fftconvolve(activity, blink_filter, "same") / 0.45
+        filter_response_key = (len(all_pp), self.history_length)
+        if filter_response_key != self._filter_response_key:
+            self._filter_response_key = filter_response_key
+            self.timestamps = all_pp.timestamps
+            self.filter_response = self._filter_response(all_pp)
+            # Only rebuilt if the filter response changed, not on threshold changes
+            self.cache["response_points"] = tuple(
+                zip(self.timestamps, self.filter_response)
+            )
 
         onsets = self.filter_response > self.onset_confidence_threshold
         offsets = self.filter_response < -self.offset_confidence_threshold
@@ -374,87 +398,76 @@ class Offline_Blink_Detection(Observable, Blink_Detection):
 
         tm1 = time.perf_counter()
         logger.debug(
-            "Recalculating took\n\t{:.4f}sec for {} pp\n\t{} pp/sec\n\tsize: {}".format(
-                tm1 - t0, len(all_pp), len(all_pp) / (tm1 - t0), filter_size
+            "Recalculating took\n\t{:.4f}sec for {} pp\n\t{} pp/sec".format(
+                tm1 - t0, len(all_pp), len(all_pp) / (tm1 - t0)
             )
         )
 
-    def consolidate_classifications(self):
-        blink = None
-        state = "no blink"  # others: 'blink started' | 'blink ending'
-        blink_data = deque()
-        blink_start_ts = deque()
-        blink_stop_ts = deque()
-        counter = 1
+    def _filter_response(self, all_pp):
+        total_time = self.timestamps[-1] - self.timestamps[0]
+
+        activity = all_pp.column("confidence")
+        filter_size = 2 * round(len(all_pp) * self.history_length / total_time / 2.0)
+        blink_filter = np.ones(filter_size) / filter_size
+
+        # This is different from the online filter. Convolution will flip
+        # the filter and result in a reverse filter response. Therefore
+        # we set the first half of the filter to -1 instead of the second
+        # half such that we get the expected result.
+        blink_filter[: filter_size // 2] *= -1
+
+        # The theoretical response maximum is +-0.5
+        # Response of +-0.45 seems sufficient for a confidence of 1.
+        return fftconvolve(activity, blink_filter, "same") / 0.45
 
+    def consolidate_classifications(self):
         # NOTE: Cache result for performance reasons
         pupil_data = self._pupil_data()
 
-        def start_blink(idx):
-            nonlocal blink
-            nonlocal state
-            nonlocal counter
+        start_idc, end_idc = blink_intervals(self.response_classification)
+        timestamps = np.asarray(self.timestamps, dtype=np.float64)
+        start_ts = timestamps[start_idc]
+        end_ts = timestamps[end_idc]
+
+        # correlate world indices
+        start_frame_idc = np.searchsorted(self.g_pool.timestamps, start_ts)
+        end_frame_idc = np.searchsorted(self.g_pool.timestamps, end_ts)
+        # fix `list index out of range` error
+        end_frame_idc = np.minimum(end_frame_idc, len(self.g_pool.timestamps) - 1)
+
+        blinks = zip(
+            start_idc,
+            end_idc,
+            start_ts,
+            end_ts,
+            start_frame_idc.tolist(),
+            end_frame_idc.tolist(),
+        )
+        blink_data = deque()
+        for counter, blink in enumerate(blinks, 1):
+            start_idx, end_idx, ts_start, ts_end, idx_start, idx_end = blink
+            filter_response = self.filter_response[start_idx:end_idx]
             blink = {
                 "topic": "blink",
-                "__start_response_index__": idx,
-                "start_timestamp": self.timestamps[idx],
+                "start_timestamp": ts_start,
                 "id": counter,
+                "end_timestamp": ts_end,
+                "timestamp": (ts_end + ts_start) / 2,
+                "duration": ts_end - ts_start,
+                "base_data": pupil_data[start_idx:end_idx].tolist(),
+                "filter_response": filter_response.tolist(),
+                # blink confidence is the mean of the absolute filter response
+                # during the blink event, clamped at 1.
+                "confidence": min(float(np.abs(filter_response).mean()), 1.0),
+                "start_frame_index": idx_start,
+                "end_frame_index": idx_end,
+                "index": (idx_start + idx_end) // 2,
             }
-            state = "blink started"
-            counter += 1
-
-        def blink_finished(idx):
-            nonlocal blink
-
-            # get tmp pupil idx
-            start_idx = blink["__start_response_index__"]
-            del blink["__start_response_index__"]
-
-            blink["end_timestamp"] = self.timestamps[idx]
-            blink["timestamp"] = (blink["end_timestamp"] + blink["start_timestamp"]) / 2
-            blink["duration"] = blink["end_timestamp"] - blink["start_timestamp"]
-            blink["base_data"] = pupil_data[start_idx:idx].tolist()
-            blink["filter_response"] = self.filter_response[start_idx:idx].tolist()
-            # blink confidence is the mean of the absolute filter response
-            # during the blink event, clamped at 1.
-            blink["confidence"] = min(
-                float(np.abs(blink["filter_response"]).mean()), 1.0
-            )
-
-            # correlate world indices
-            ts_start, ts_end = blink["start_timestamp"], blink["end_timestamp"]
-
-            idx_start, idx_end = np.searchsorted(
-                self.g_pool.timestamps, [ts_start, ts_end]
-            )
-            # fix `list index out of range` error
-            idx_end = min(idx_end, len(self.g_pool.timestamps) - 1)
-            blink["start_frame_index"] = int(idx_start)
-            blink["end_frame_index"] = int(idx_end)
-            blink["index"] = int((idx_start + idx_end) // 2)
-
             blink_data.append(fm.Serialized_Dict(python_dict=blink))
-            blink_start_ts.append(ts_start)
-            blink_stop_ts.append(ts_end)
-
-        for idx, classification in enumerate(self.response_classification):
-            if state == "no blink" and classification > 0:
-                start_blink(idx)
-            elif state == "blink started" and classification == -1:
-                state = "blink ending"
-            elif state == "blink ending" and classification >= 0:
-                blink_finished(idx - 1)  # blink ended previously
-                if classification > 0:
-                    start_blink(0)
-                else:
-                    blink = None
-                    state = "no blink"
-
-        if state == "blink ending":
-            # only finish blink if it was already ending
-            blink_finished(idx)  # idx is the last possible idx
-
-        self.g_pool.blinks = pm.Affiliator(blink_data, blink_start_ts, blink_stop_ts)
+
+        self.g_pool.blinks = pm.Affiliator(
+            blink_data, start_ts.tolist(), end_ts.tolist()
+        )
         self.notify_all({"subject": "blinks_changed", "delay": 0.2})
 
     def cache_activation(self):
@@ -466,9 +479,6 @@ class Offline_Blink_Detection(Observable, Blink_Detection):
             (t1, -self.offset_confidence_threshold),
         )
 
-        self.cache["response_points"] = tuple(
-            zip(self.timestamps, self.filter_response)
-        )
         if len(self.cache["response_points"]) == 0:
             self.cache["class_points"] = ()
             return
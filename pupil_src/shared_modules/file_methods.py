@@ -12,10 +12,12 @@ import collections
 import collections.abc
 import copy
 import logging
+import mmap
 import os
 import pickle
 import traceback as tb
 import types
+import typing as T
 from glob import iglob
 from pathlib import Path
 
@@ -33,6 +35,11 @@ UnpicklingError = pickle.UnpicklingError
 
 PLData = collections.namedtuple("PLData", ["data", "timestamps", "topics"])
 
+PLData_Index = collections.namedtuple(
+    "PLData_Index", ["offsets", "topics", "topic_idc"]
+)
+PLDATA_INDEX_VERSION = 2
+
 
 class Persistent_Dict(dict):
     """a dict class that uses pickle to save inself to file"""
@@ -181,6 +188,183 @@ def load_pldata_file(directory, topic, track_progress_in_console: bool = True):
     return PLData(data, data_ts, topics)
 
 
+def _pldata_index_path(directory, topic):
+    return os.path.join(directory, topic + "_index.npz")
+
+
+def _pldata_file_stat(directory, topic) -> np.ndarray:
+    """Size and modification time of a .pldata file, used to validate its index"""
+    stat = os.stat(os.path.join(directory, topic + ".pldata"))
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def save_pldata_index(directory, topic, index: PLData_Index):
+    np.savez(
+        _pldata_index_path(directory, topic),
+        version=PLDATA_INDEX_VERSION,
+        file_stat=_pldata_file_stat(directory, topic),
+        offsets=index.offsets,
+        topics=index.topics,
+        topic_idc=index.topic_idc,
+    )
+
+
+def build_pldata_index(directory, topic) -> PLData_Index:
+    """Scan a .pldata file once and record where each record starts.
+
+    Only the outer (topic, payload) pairs are unpacked; payloads are skipped.
+    """
+    msgpack_file = os.path.join(directory, topic + ".pldata")
+    offsets = collections.deque()
+    topic_idc = collections.deque()
+    unique_topics = {}
+    with open(msgpack_file, "rb") as fh:
+        unpacker = msgpack.Unpacker(fh, use_list=False, strict_map_key=False)
+        while True:
+            offset = unpacker.tell()
+            try:
+                unpacker.read_array_header()
+            except msgpack.OutOfData:
+                break
+            record_topic = unpacker.unpack()
+            unpacker.skip()
+            offsets.append(offset)
+            topic_idc.append(unique_topics.setdefault(record_topic, len(unique_topics)))
+        offsets.append(unpacker.tell())
+    return PLData_Index(
+        offsets=np.array(offsets, dtype=np.int64),
+        topics=np.array(list(unique_topics.keys()), dtype=str),
+        topic_idc=np.array(topic_idc, dtype=np.int32),
+    )
+
+
+def load_pldata_index(directory, topic) -> PLData_Index:
+    """Load the byte-offset index of a .pldata file.
+
+    Recordings made before the index existed, or whose .pldata file changed since
+    the index was written, get a fresh index which is saved next to the file if
+    the directory is writable.
+    """
+    msgpack_file = os.path.join(directory, topic + ".pldata")
+    file_stat = _pldata_file_stat(directory, topic)
+    try:
+        with np.load(_pldata_index_path(directory, topic)) as index_file:
+            assert index_file["version"] == PLDATA_INDEX_VERSION
+            assert np.array_equal(index_file["file_stat"], file_stat)
+            index = PLData_Index(
+                offsets=index_file["offsets"],
+                topics=index_file["topics"],
+                topic_idc=index_file["topic_idc"],
+            )
+        # The last offset marks the end of the last record
+        assert index.offsets[-1] == file_stat[0]
+        return index
+    except (FileNotFoundError, AssertionError, KeyError, ValueError, OSError):
+        logger.debug(f"Building index for `{msgpack_file}`")
+
+    index = build_pldata_index(directory, topic)
+    try:
+        save_pldata_index(directory, topic, index)
+    except OSError as err:
+        logger.debug(f"Could not save index for `{msgpack_file}`: {err}")
+    return index
+
+
+class PLData_Memory_Map:
+    """Random access to the records of a .pldata file.
+
+    The file is memory-mapped and records are only unpacked once they are
+    accessed, i.e. opening a file does not load its data into memory. Pickling only
+    stores the location of the file, which is opened again when unpickled, e.g. in
+    a background process.
+    """
+
+    def __init__(self, directory, topic, index: T.Optional[PLData_Index] = None):
+        if index is None:
+            index = load_pldata_index(directory, topic)
+        self.directory = directory
+        self.topic = topic
+        self.index = index
+        self._buffer = b""
+        if len(self):
+            # empty files can not be memory-mapped
+            with open(os.path.join(directory, topic + ".pldata"), "rb") as fh:
+                self._buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.index.topic_idc)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} len={len(self)}>"
+
+    @property
+    def topics(self) -> np.ndarray:
+        return self.index.topics[self.index.topic_idc]
+
+    def record(self, idx):
+        """Returns `(topic, Serialized_Dict)` for record at `idx`"""
+        start, stop = self.index.offsets[idx], self.index.offsets[idx + 1]
+        topic, payload = msgpack.unpackb(
+            self._buffer[start:stop], use_list=False, strict_map_key=False
+        )
+        return topic, Serialized_Dict(msgpack_bytes=payload)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError(f"record index {key} out of range")
+            return self.record(key)[1]
+        if isinstance(key, slice):
+            key = range(*key.indices(len(self)))
+        return [self.record(idx)[1] for idx in key]
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.record(idx)[1]
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._buffer = b""
+
+    def __getstate__(self):
+        return {"directory": self.directory, "topic": self.topic}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"], state["topic"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_pldata_file_memory_mapped(directory, topic) -> PLData:
+    """Memory-mapped alternative to `load_pldata_file`
+
+    `data` is a `PLData_Memory_Map` instead of a deque of `Serialized_Dict`s, i.e.
+    payloads are only read from disk when they are accessed.
+    """
+    ts_file = os.path.join(directory, topic + "_timestamps.npy")
+    try:
+        data = PLData_Memory_Map(directory, topic)
+    except FileNotFoundError as err:
+        logger.debug(err)
+        return PLData([], [], [])
+    try:
+        data_ts = np.load(ts_file)
+    except FileNotFoundError:
+        logger.warning(
+            f"Timestamp file not found at expected location `{ts_file}`."
+            " Attempting to fallback to msgpack-serialized timestamps."
+        )
+        data_ts = np.array([datum["timestamp"] for datum in data])
+    return PLData(data, data_ts, data.topics)
+
+
 class PLData_Writer:
     """docstring for PLData_Writer"""
 
@@ -189,17 +373,28 @@ class PLData_Writer:
         self.directory = directory
         self.name = name
         self.ts_queue = collections.deque()
+        self.offsets = collections.deque()
+        self.topic_idc = collections.deque()
+        self._unique_topics = {}
+        self._num_bytes_written = 0
         file_name = name + ".pldata"
         self.file_handle = open(os.path.join(directory, file_name), "wb")
 
     def append(self, datum):
-        datum_serialized = msgpack.packb(datum, use_bin_type=True)
+        # Serialized_Dict and unmodified Serialized_Payload_Dict keep their payload
+        datum_serialized = getattr(datum, "serialized", None)
+        if datum_serialized is None:
+            datum_serialized = msgpack.packb(datum, use_bin_type=True)
         self.append_serialized(datum["timestamp"], datum["topic"], datum_serialized)
 
     def append_serialized(self, timestamp, topic, datum_serialized):
         self.ts_queue.append(timestamp)
         pair = msgpack.packb((topic, datum_serialized), use_bin_type=True)
         self.file_handle.write(pair)
+        self.offsets.append(self._num_bytes_written)
+        self._num_bytes_written += len(pair)
+        topic_idx = self._unique_topics.setdefault(topic, len(self._unique_topics))
+        self.topic_idc.append(topic_idx)
 
     def extend(self, data):
         for datum in data:
@@ -214,6 +409,16 @@ class PLData_Writer:
         np.save(ts_path, self.ts_queue)
         self.ts_queue = None
 
+        self.offsets.append(self._num_bytes_written)
+        index = PLData_Index(
+            offsets=np.array(self.offsets, dtype=np.int64),
+            topics=np.array(list(self._unique_topics.keys()), dtype=str),
+            topic_idc=np.array(self.topic_idc, dtype=np.int32),
+        )
+        save_pldata_index(self.directory, self.name, index)
+        self.offsets = None
+        self.topic_idc = None
+
     def __enter__(self):
         return self
 
@@ -234,6 +439,42 @@ def next_export_sub_dir(root_export_dir):
     return os.path.join(root_export_dir, next_sub_dir)
 
 
+class Serialized_Payload_Dict(dict):
+    """Dictionary that keeps the msgpack payload it was deserialized from
+
+    `PLData_Writer` writes the payload as it is instead of serializing the
+    dictionary again. Modifying the dictionary itself, e.g. via `__setitem__` or
+    `update()`, discards the payload.
+
+    Nested values are not tracked. Modifying them in place, e.g. the `ellipse` dict
+    of pupil data or the `base_data` of gaze, keeps the original payload and the
+    change is not recorded. Plugins must replace the top-level value instead:
+    `datum["ellipse"] = {**datum["ellipse"], "angle": angle}`.
+    """
+
+    __slots__ = ("serialized",)
+
+    def __init__(self, payload: dict, serialized: T.Optional[bytes]):
+        super().__init__(payload)
+        self.serialized = serialized
+
+    def _discard_serialized(method):
+        def wrapper(self, *args, **kwargs):
+            self.serialized = None
+            return method(self, *args, **kwargs)
+
+        return wrapper
+
+    __setitem__ = _discard_serialized(dict.__setitem__)
+    __delitem__ = _discard_serialized(dict.__delitem__)
+    clear = _discard_serialized(dict.clear)
+    pop = _discard_serialized(dict.pop)
+    popitem = _discard_serialized(dict.popitem)
+    setdefault = _discard_serialized(dict.setdefault)
+    update = _discard_serialized(dict.update)
+    del _discard_serialized
+
+
 class _Empty:
     def purge_cache(self):
         pass
@@ -28,10 +28,10 @@ Terms
 import csv
 import enum
 import logging
+import multiprocessing as mp
 import os
 import typing as T
 from bisect import bisect_left, bisect_right
-from collections import deque
 from types import SimpleNamespace
 
 import background_helper as bh
@@ -73,8 +73,28 @@ def fixation_from_data(
     method: FixationDetectionMethod,
     base_data: T.Iterable,
     timestamps=None,
+    base_data_columns: T.Optional[T.Mapping[str, T.Sequence]] = None,
 ):
-    norm_pos = np.mean([gp["norm_pos"] for gp in base_data], axis=0).tolist()
+    """Creates a fixation datum from its base data.
+
+    `base_data_columns` can provide the "timestamp", "confidence", "norm_pos" and
+    (for 3d fixations) "gaze_point_3d" values of `base_data`. Otherwise they are
+    read from `base_data` itself.
+    """
+    if base_data_columns is None:
+        base_data_columns = {
+            "timestamp": [base_data[0]["timestamp"], base_data[-1]["timestamp"]],
+            "confidence": [gp["confidence"] for gp in base_data],
+            "norm_pos": [gp["norm_pos"] for gp in base_data],
+        }
+        if method == FixationDetectionMethod.GAZE_3D:
+            base_data_columns["gaze_point_3d"] = [
+                gp["gaze_point_3d"] for gp in base_data if "gaze_point_3d" in gp
+            ]
+    start_ts = base_data_columns["timestamp"][0]
+    end_ts = base_data_columns["timestamp"][-1]
+
+    norm_pos = np.mean(base_data_columns["norm_pos"], axis=0).tolist()
     dispersion = np.rad2deg(dispersion)  # in degrees
 
     fix = {
@@ -83,17 +103,16 @@ def fixation_from_data(
         "dispersion": dispersion,
         "method": method.value,
         "base_data": list(base_data),
-        "timestamp": base_data[0]["timestamp"],
-        "duration": (base_data[-1]["timestamp"] - base_data[0]["timestamp"]) * 1000,
-        "confidence": float(np.mean([gp["confidence"] for gp in base_data])),
+        "timestamp": start_ts,
+        "duration": (end_ts - start_ts) * 1000,
+        "confidence": float(np.mean(base_data_columns["confidence"])),
     }
     if method == FixationDetectionMethod.GAZE_3D:
         fix["gaze_point_3d"] = np.mean(
-            [gp["gaze_point_3d"] for gp in base_data if "gaze_point_3d" in gp], axis=0
+            base_data_columns["gaze_point_3d"], axis=0
         ).tolist()
     if timestamps is not None:
-        start, end = base_data[0]["timestamp"], base_data[-1]["timestamp"]
-        start, end = np.searchsorted(timestamps, [start, end])
+        start, end = np.searchsorted(timestamps, [start_ts, end_ts])
         end = min(end, len(timestamps) - 1)  # fix `list index out of range` error
         fix["start_frame_index"] = int(start)
         fix["end_frame_index"] = int(end)
@@ -126,6 +145,14 @@ class Fixation_Result_Factory:
         )
         return fixation_serialized
 
+    @staticmethod
+    def with_id(fixation_serialized: bytes, fixation_id: int) -> bytes:
+        """Changes the id of a serialized fixation, e.g. after merging chunks"""
+        # Base data stays packed as msgpack extension type
+        fixation = msgpack.unpackb(fixation_serialized, strict_map_key=False)
+        fixation["id"] = fixation_id
+        return msgpack.packb(fixation, use_bin_type=True)
+
 
 def vector_dispersion(vectors):
     distances = pdist(vectors, metric="cosine")
@@ -133,22 +160,29 @@ def vector_dispersion(vectors):
     return dispersion
 
 
-def gaze_dispersion(capture, gaze_subset, method: FixationDetectionMethod) -> float:
-    if method is FixationDetectionMethod.GAZE_3D:
-        vectors = np.array([gp["gaze_point_3d"] for gp in gaze_subset])
-    elif method is FixationDetectionMethod.GAZE_2D:
-        locations = np.array([gp["norm_pos"] for gp in gaze_subset])
+def unproject_norm_pos(capture, norm_pos) -> np.ndarray:
+    locations = np.array(norm_pos)
+
+    # denormalize
+    width, height = capture.frame_size
+    locations[:, 0] *= width
+    locations[:, 1] = (1.0 - locations[:, 1]) * height
 
-        # denormalize
-        width, height = capture.frame_size
-        locations[:, 0] *= width
-        locations[:, 1] = (1.0 - locations[:, 1]) * height
+    # undistort onto 3d plane
+    return capture.intrinsics.unprojectPoints(locations)
 
-        # undistort onto 3d plane
-        vectors = capture.intrinsics.unprojectPoints(locations)
+
+def gaze_vectors(capture, gaze_data, method: FixationDetectionMethod) -> np.ndarray:
+    if method is FixationDetectionMethod.GAZE_3D:
+        return np.array([gp["gaze_point_3d"] for gp in gaze_data])
+    elif method is FixationDetectionMethod.GAZE_2D:
+        return unproject_norm_pos(capture, [gp["norm_pos"] for gp in gaze_data])
     else:
         raise ValueError(f"Unknown method '{method}'")
 
+
+def gaze_dispersion(capture, gaze_subset, method: FixationDetectionMethod) -> float:
+    vectors = gaze_vectors(capture, gaze_subset, method)
     dist = vector_dispersion(vectors)
     return dist
 
@@ -157,79 +191,130 @@ def can_use_3d_gaze_mapping(gaze_data) -> bool:
     return all("gaze_point_3d" in gp for gp in gaze_data)
 
 
-def detect_fixations(
-    capture, gaze_data, max_dispersion, min_duration, max_duration, min_data_confidence
-):
-    yield "Detecting fixations...", ()
-    gaze_data = (
-        fm.Serialized_Dict(msgpack_bytes=serialized) for serialized in gaze_data
-    )
-    gaze_data = [
-        datum for datum in gaze_data if datum["confidence"] > min_data_confidence
-    ]
-    if not gaze_data:
-        logger.warning("No data available to find fixations")
-        return "Fixation detection failed", ()
+class Sliding_Window_Dispersion:
+    """Maximum pairwise angle between the vectors of a window `[start, stop)`.
+
+    For every vector in the window the minimum cosine similarity to all later
+    vectors in the window is kept. Growing the window only compares the added
+    vectors to the window; shrinking it from the left is free.
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self._unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._min_cos_to_later = np.full(len(vectors), np.inf)
+        self._stop = 0
+
+    def reset(self, start: int):
+        """Restart with an empty window at `start`"""
+        self._stop = start
+
+    def angle(self, start: int, stop: int) -> float:
+        """Dispersion of `[start, stop)`. `stop` must not move backwards."""
+        if stop < self._stop:
+            raise ValueError("Window can only grow to the right. Call reset() first.")
+        if stop > self._stop:
+            self._grow(start, stop)
+        min_cos = self._min_cos_to_later[start:stop].min()
+        return float(np.arccos(np.clip(min_cos, -1.0, 1.0)))
+
+    def prefix_angles(self, start: int, stop: int) -> np.ndarray:
+        """Dispersions of all windows `[start, start + n)` for `n` in `1..stop-start`"""
+        unit = self._unit[start:stop]
+        cos = unit @ unit.T
+        # only compare each vector to earlier vectors
+        cos[np.tri(len(unit), dtype=bool).T] = np.inf
+        min_cos = np.minimum.accumulate(cos.min(axis=1))
+        return np.arccos(np.clip(min_cos, -1.0, 1.0))
+
+    def _grow(self, start: int, stop: int):
+        added_start = max(self._stop, start)
+        added = self._unit[added_start:stop]
+        cos = added @ added.T
+        cos[np.tri(len(added), dtype=bool)] = np.inf
+        self._min_cos_to_later[added_start:stop] = cos.min(axis=1)
+        if added_start > start:
+            cos = self._unit[start:added_start] @ added.T
+            np.minimum(
+                self._min_cos_to_later[start:added_start],
+                cos.min(axis=1),
+                out=self._min_cos_to_later[start:added_start],
+            )
+        self._stop = stop
+
+
+# Dispersions closer to the threshold than this are verified with `vector_dispersion`
+# such that classification does not depend on numerical differences.
+_DISPERSION_VERIFICATION_MARGIN = 1e-6
 
-    method = (
-        FixationDetectionMethod.GAZE_3D
-        if can_use_3d_gaze_mapping(gaze_data)
-        else FixationDetectionMethod.GAZE_2D
-    )
-    logger.info(f"Starting fixation detection using {method.value} data...")
-    fixation_result = Fixation_Result_Factory()
 
-    working_queue = deque()
-    remaining_gaze = deque(gaze_data)
+def fixation_windows(
+    timestamps: np.ndarray,
+    vectors: np.ndarray,
+    max_dispersion: float,
+    min_duration: float,
+    max_duration: float,
+    stop_before: T.Optional[int] = None,
+) -> T.Iterator[T.Tuple[int, int]]:
+    """Yields the `(start, stop)` index windows of all fixations in `vectors`.
 
-    while remaining_gaze:
-        # check if working_queue contains enough data
+    If `stop_before` is given, detection ends as soon as the working window starts
+    at or after this index.
+    """
+    window_dispersion = Sliding_Window_Dispersion(vectors)
+
+    def verified(dispersion, start, stop):
+        if abs(dispersion - max_dispersion) > _DISPERSION_VERIFICATION_MARGIN:
+            return dispersion
+        return vector_dispersion(vectors[start:stop])
+
+    num_gaze = len(timestamps)
+    if stop_before is None:
+        stop_before = num_gaze
+    timestamps_list = timestamps.tolist()
+    start = stop = 0
+    while stop < num_gaze and start < stop_before:
+        # check if working window contains enough data
         if (
-            len(working_queue) < 2
-            or (working_queue[-1]["timestamp"] - working_queue[0]["timestamp"])
-            < min_duration
+            stop - start < 2
+            or (timestamps_list[stop - 1] - timestamps_list[start]) < min_duration
         ):
-            datum = remaining_gaze.popleft()
-            working_queue.append(datum)
+            stop += 1
             continue
 
         # min duration reached, check for fixation
-        dispersion = gaze_dispersion(capture, working_queue, method)
-        if dispersion > max_dispersion:
+        dispersion = window_dispersion.angle(start, stop)
+        if verified(dispersion, start, stop) > max_dispersion:
             # not a fixation, move forward
-            working_queue.popleft()
+            start += 1
             continue
 
-        left_idx = len(working_queue)
+        left_idx = stop - start
 
         # minimal fixation found. collect maximal data
         # to perform binary search for fixation end
-        while remaining_gaze:
-            datum = remaining_gaze[0]
-            if datum["timestamp"] > working_queue[0]["timestamp"] + max_duration:
-                break  # maximum data found
-            working_queue.append(remaining_gaze.popleft())
+        max_stop = np.searchsorted(
+            timestamps, timestamps_list[start] + max_duration, side="right"
+        )
+        stop = max(stop, int(max_stop))
 
         # check for fixation with maximum duration
-        dispersion = gaze_dispersion(capture, working_queue, method)
-        if dispersion <= max_dispersion:
-            fixation = fixation_result.from_data(
-                dispersion, method, working_queue, capture.timestamps
-            )
-            yield "Detecting fixations...", fixation
-            working_queue.clear()  # discard old Q
+        dispersion = window_dispersion.angle(start, stop)
+        if verified(dispersion, start, stop) <= max_dispersion:
+            yield start, stop
+            start = stop
+            window_dispersion.reset(start)
             continue
 
-        slicable = list(working_queue)  # deque does not support slicing
-        right_idx = len(working_queue)
+        right_idx = stop - start
+        prefix_dispersions = window_dispersion.prefix_angles(start, stop)
 
         # binary search
         while left_idx < right_idx - 1:
             middle_idx = (left_idx + right_idx) // 2
-            dispersion = gaze_dispersion(
-                capture,
-                slicable[: middle_idx + 1],
-                method,
+            dispersion = verified(
+                prefix_dispersions[middle_idx], start, start + middle_idx + 1
             )
             if dispersion <= max_dispersion:
                 left_idx = middle_idx
@@ -237,16 +322,141 @@ def detect_fixations(
                 right_idx = middle_idx
 
         # left_idx-1 is last valid base datum
-        final_base_data = slicable[:left_idx]
-        to_be_placed_back = slicable[left_idx:]
-        dispersion_result = gaze_dispersion(capture, final_base_data, method)
+        yield start, start + left_idx
+        # data after the fixation is placed back
+        start = stop = start + left_idx
+        window_dispersion.reset(start)
+
+
+# Consecutive gaze vectors need to be this much further apart than the maximum
+# dispersion to split the detection, such that numerical differences do not matter.
+_CHUNK_SPLIT_MARGIN = 1e-5
+
+
+def fixation_detection_chunks(
+    timestamps: np.ndarray,
+    vectors: np.ndarray,
+    max_dispersion: float,
+    min_duration: float,
+    max_duration: float,
+    num_chunks: int,
+) -> T.List[T.Tuple[int, int, int]]:
+    """Splits gaze data into chunks that can be classified independently.
+
+    No fixation can contain two consecutive gaze vectors whose angle exceeds the
+    maximum dispersion. Splitting at such saccades yields the same fixations as
+    classifying all data at once. Returns `(start, stop, data_stop)` index tuples:
+    fixations starting in `[start, stop)` are detected using the data up to
+    `data_stop`.
+    """
+    num_gaze = len(timestamps)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        unit_vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    if num_chunks < 2 or num_gaze < 2 or not np.isfinite(unit_vectors).all():
+        return [(0, num_gaze, num_gaze)]
+
+    cos_angles = np.einsum("ij,ij->i", unit_vectors[:-1], unit_vectors[1:])
+    angles = np.arccos(np.clip(cos_angles, -1.0, 1.0))
+    split_idc = np.flatnonzero(angles > max_dispersion + _CHUNK_SPLIT_MARGIN) + 1
+    if split_idc.size == 0:
+        return [(0, num_gaze, num_gaze)]
+
+    # pick the saccades closest after evenly spaced split targets
+    targets = np.arange(1, num_chunks) * num_gaze / num_chunks
+    closest = np.minimum(np.searchsorted(split_idc, targets), split_idc.size - 1)
+    bounds = [0, *np.unique(split_idc[closest]).tolist(), num_gaze]
+
+    # windows starting before `stop` never grow beyond this duration
+    lookahead = max(min_duration, max_duration)
+    data_stops = np.searchsorted(
+        timestamps, timestamps[np.array(bounds[1:]) - 1] + lookahead, side="right"
+    )
+    return [
+        (start, stop, min(int(data_stop) + 2, num_gaze))
+        for start, stop, data_stop in zip(bounds[:-1], bounds[1:], data_stops)
+    ]
+
+
+def detect_fixations(
+    capture,
+    gaze_data,
+    max_dispersion,
+    min_duration,
+    max_duration,
+    min_data_confidence,
+    method: T.Optional[FixationDetectionMethod] = None,
+    chunk_stop: T.Optional[int] = None,
+):
+    """Dispersion-duration-based fixation detection
 
-        fixation = fixation_result.from_data(
-            dispersion_result, method, final_base_data, capture.timestamps
+    Instead of a working queue of gaze data, whose dispersion is recomputed for
+    every step, the queue is a window `[start, stop)` over arrays of timestamps and
+    gaze vectors, whose dispersion is maintained incrementally.
+    `gaze_data` is expected to be sorted by timestamp.
+
+    `method` and `chunk_stop` are used to classify a chunk of a larger recording,
+    see `fixation_detection_chunks`. By default, the method is inferred from the
+    data.
+    """
+    yield "Detecting fixations...", ()
+    # Extract all required fields while each datum is deserialized anyway
+    confident_data, timestamps, confidences, norm_pos = [], [], [], []
+    gaze_points_3d = None if method is FixationDetectionMethod.GAZE_2D else []
+    for serialized in gaze_data:
+        datum = fm.Serialized_Dict(msgpack_bytes=serialized)
+        if datum["confidence"] > min_data_confidence:
+            confident_data.append(datum)
+            timestamps.append(datum["timestamp"])
+            confidences.append(datum["confidence"])
+            norm_pos.append(datum["norm_pos"])
+            if gaze_points_3d is not None and "gaze_point_3d" in datum:
+                gaze_points_3d.append(datum["gaze_point_3d"])
+            else:
+                gaze_points_3d = None
+    gaze_data = confident_data
+    if not gaze_data:
+        logger.warning("No data available to find fixations")
+        return "Fixation detection failed", ()
+
+    if method is None:
+        method = (
+            FixationDetectionMethod.GAZE_3D
+            if gaze_points_3d is not None
+            else FixationDetectionMethod.GAZE_2D
+        )
+    logger.info(f"Starting fixation detection using {method.value} data...")
+    fixation_result = Fixation_Result_Factory()
+
+    columns = {
+        "timestamp": timestamps,
+        "confidence": np.array(confidences),
+        "norm_pos": np.array(norm_pos),
+    }
+    if method is FixationDetectionMethod.GAZE_3D:
+        vectors = columns["gaze_point_3d"] = np.array(gaze_points_3d)
+    else:
+        vectors = unproject_norm_pos(capture, norm_pos)
+
+    def fixation(start, stop):
+        dispersion = vector_dispersion(vectors[start:stop])
+        return fixation_result.from_data(
+            dispersion,
+            method,
+            gaze_data[start:stop],
+            capture.timestamps,
+            base_data_columns={k: v[start:stop] for k, v in columns.items()},
         )
-        yield "Detecting fixations...", fixation
-        working_queue.clear()  # clear queue
-        remaining_gaze.extendleft(reversed(to_be_placed_back))
+
+    windows = fixation_windows(
+        np.array(timestamps),
+        vectors,
+        max_dispersion,
+        min_duration,
+        max_duration,
+        stop_before=chunk_stop,
+    )
+    for start, stop in windows:
+        yield "Detecting fixations...", fixation(start, stop)
 
     yield "Fixation detection complete", ()
 
@@ -270,6 +480,8 @@ class Offline_Fixation_Detector(Observable, Fixation_Detector_Base):
     """
 
     CACHE_VERSION = 1
+    # Detection is split into one chunk per worker, but not into smaller chunks
+    MIN_GAZE_PER_CHUNK = 10000
 
     class VersionMismatchError(ValueError):
         pass
@@ -309,7 +521,9 @@ class Offline_Fixation_Detector(Observable, Fixation_Detector_Base):
         self.current_fixation_details = None
         self.fixation_data = []
         self.prev_index = -1
-        self.bg_task = None
+        self.bg_tasks = []
+        self._chunk_results = []
+        self._merged_chunk_count = 0
         self.status = ""
         self.data_dir = os.path.join(g_pool.rec_dir, "offline_data")
         self._gaze_changed_listener = data_changed.Listener(
@@ -473,9 +687,12 @@ class Offline_Fixation_Detector(Observable, Fixation_Detector_Base):
         self.prev_fix_button = None
 
     def cleanup(self):
-        if self.bg_task:
-            self.bg_task.cancel()
-            self.bg_task = None
+        self._cancel_detection()
+
+    def _cancel_detection(self):
+        for task in self.bg_tasks:
+            task.cancel()
+        self.bg_tasks = []
 
     def get_init_dict(self):
         return {
@@ -501,54 +718,108 @@ class Offline_Fixation_Detector(Observable, Fixation_Detector_Base):
         if self.g_pool.app == "exporter":
             return
 
-        if self.bg_task:
-            self.bg_task.cancel()
+        self._cancel_detection()
 
-        gaze_data = [gp.serialized for gp in self.g_pool.gaze_positions]
+        # Skip low-confidence data early. `detect_fixations` would discard it anyway.
+        gaze_positions = self.g_pool.gaze_positions
+        is_confident = (
+            gaze_positions.column("confidence") > self.g_pool.min_data_confidence
+        )
+        gaze_data = [gp.serialized for gp in gaze_positions[is_confident]]
 
         cap = SimpleNamespace()
         cap.frame_size = self.g_pool.capture.frame_size
         cap.intrinsics = self.g_pool.capture.intrinsics
         cap.timestamps = self.g_pool.capture.timestamps
         generator_args = (
-            cap,
-            gaze_data,
             np.deg2rad(self.max_dispersion),
             self.min_duration / 1000,
             self.max_duration / 1000,
             self.g_pool.min_data_confidence,
         )
+        chunks, method = self._detection_chunks(
+            gaze_positions, is_confident, cap, *generator_args[:3]
+        )
 
         self.fixation_data = []
         self.fixation_start_ts = []
         self.fixation_stop_ts = []
-        self.bg_task = bh.IPC_Logging_Task_Proxy(
-            "Fixation detection", detect_fixations, args=generator_args
-        )
+        self._chunk_results = [[] for _ in chunks]
+        self._merged_chunk_count = 0
+        for start, stop, data_stop in chunks:
+            args = (cap, gaze_data[start:data_stop], *generator_args)
+            kwargs = {"method": method, "chunk_stop": stop - start}
+            task = bh.IPC_Logging_Task_Proxy(
+                "Fixation detection", detect_fixations, args=args, kwargs=kwargs
+            )
+            self.bg_tasks.append(task)
         self.publish_empty()
 
-    def recent_events(self, events):
-        if self.bg_task:
-            for progress, fixation_result in self.bg_task.fetch():
-                self.status = progress
-                if fixation_result:
-                    serialized, start_ts, stop_ts = fixation_result
-                    self.fixation_data.append(
-                        fm.Serialized_Dict(msgpack_bytes=serialized)
-                    )
-                    self.fixation_start_ts.append(start_ts)
-                    self.fixation_stop_ts.append(stop_ts)
+    def _detection_chunks(
+        self,
+        gaze_positions,
+        is_confident,
+        cap,
+        max_dispersion,
+        min_duration,
+        max_duration,
+    ):
+        """Splits confident gaze into chunks for parallel detection.
 
-                if self.fixation_data:
-                    current_ts = self.fixation_stop_ts[-1]
-                    progress = (current_ts - self.g_pool.timestamps[0]) / (
-                        self.g_pool.timestamps[-1] - self.g_pool.timestamps[0]
-                    )
-                    self.menu_icon.indicator_stop = progress
-            if self.bg_task.completed:
+        Returns a list of `(start, stop, data_stop)` tuples and the detection method.
+        Without a unique method, the data is classified in a single chunk.
+        """
+        timestamps = gaze_positions.column("timestamp")[is_confident]
+        num_gaze = len(timestamps)
+        num_chunks = min(
+            max(1, mp.cpu_count() - 1), num_gaze // self.MIN_GAZE_PER_CHUNK
+        )
+        if num_chunks < 2:
+            return [(0, num_gaze, num_gaze)], None
+
+        gaze_points_3d = gaze_positions.column("gaze_point_3d")[is_confident]
+        is_missing_3d = np.isnan(gaze_points_3d).any(axis=1)
+        if not is_missing_3d.any():
+            method = FixationDetectionMethod.GAZE_3D
+            vectors = gaze_points_3d
+        elif is_missing_3d.all() and not can_use_3d_gaze_mapping(
+            [gaze_positions[int(np.flatnonzero(is_confident)[0])]]
+        ):
+            method = FixationDetectionMethod.GAZE_2D
+            norm_pos = gaze_positions.column("norm_pos")[is_confident]
+            vectors = unproject_norm_pos(cap, norm_pos)
+        else:
+            return [(0, num_gaze, num_gaze)], None
+
+        chunks = fixation_detection_chunks(
+            timestamps,
+            vectors,
+            max_dispersion,
+            min_duration,
+            max_duration,
+            num_chunks,
+        )
+        return chunks, method
+
+    def recent_events(self, events):
+        if self.bg_tasks:
+            for chunk_results, task in zip(self._chunk_results, self.bg_tasks):
+                for progress, fixation_result in task.fetch():
+                    self.status = progress
+                    if fixation_result:
+                        chunk_results.append(fixation_result)
+            self._merge_chunk_results()
+
+            if self.fixation_data:
+                current_ts = self.fixation_stop_ts[-1]
+                progress = (current_ts - self.g_pool.timestamps[0]) / (
+                    self.g_pool.timestamps[-1] - self.g_pool.timestamps[0]
+                )
+                self.menu_icon.indicator_stop = progress
+            if all(task.completed for task in self.bg_tasks):
                 self.status = f"{len(self.fixation_data)} fixations detected"
                 self.correlate_and_publish_new()
-                self.bg_task = None
+                self.bg_tasks = []
                 self.menu_icon.indicator_stop = 0.0
 
         frame = events.get("frame")
@@ -623,6 +894,24 @@ class Offline_Fixation_Detector(Observable, Fixation_Detector_Base):
             self.current_fixation_details.text = info
             self.prev_index = frame.index
 
+    def _merge_chunk_results(self):
+        """Appends detected fixations in timestamp order with consecutive ids"""
+        while self._merged_chunk_count < len(self.bg_tasks):
+            chunk_results = self._chunk_results[self._merged_chunk_count]
+            for serialized, start_ts, stop_ts in chunk_results:
+                fixation_id = len(self.fixation_data)
+                if self._merged_chunk_count > 0:
+                    serialized = Fixation_Result_Factory.with_id(
+                        serialized, fixation_id
+                    )
+                self.fixation_data.append(fm.Serialized_Dict(msgpack_bytes=serialized))
+                self.fixation_start_ts.append(start_ts)
+                self.fixation_stop_ts.append(stop_ts)
+            chunk_results.clear()
+            if not self.bg_tasks[self._merged_chunk_count].completed:
+                break
+            self._merged_chunk_count += 1
+
     def correlate_and_publish_new(self):
         self.g_pool.fixations = pm.Affiliator(
             self.fixation_data, self.fixation_start_ts, self.fixation_stop_ts
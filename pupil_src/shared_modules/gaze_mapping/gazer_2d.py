@@ -13,7 +13,13 @@ import logging
 import typing as T
 
 import numpy as np
-from gaze_mapping.gazer_base import GazerBase, Model, NotEnoughDataError
+from gaze_mapping.gazer_base import (
+    GazerBase,
+    Model,
+    NotEnoughDataError,
+    _match_indices_by_model,
+    _match_means,
+)
 from sklearn.linear_model import LinearRegression
 
 logger = logging.getLogger(__name__)
@@ -242,6 +248,58 @@ class Gazer2D(GazerBase):
                 }
                 yield gaze_datum
 
+    def predict_batch(
+        self, matched_pupil_data: T.Sequence[T.List["Pupil"]]
+    ) -> T.Iterator["Gaze"]:
+        matches = list(matched_pupil_data)
+        binocular_idc, right_idc, left_idc = _match_indices_by_model(matches)
+        predictions = [None] * len(matches)  # (topic, gaze_pos) per match
+
+        if binocular_idc:
+            if self.binocular_model.is_fitted:
+                right = self._extract_pupil_features(
+                    [matches[i][0] for i in binocular_idc]
+                )
+                left = self._extract_pupil_features(
+                    [matches[i][1] for i in binocular_idc]
+                )
+                X = np.hstack([left, right])
+                gaze_positions = self.binocular_model.predict(X).tolist()
+                for idx, gaze_pos in zip(binocular_idc, gaze_positions):
+                    predictions[idx] = "gaze.2d.01.", gaze_pos
+            else:
+                logger.debug("Prediction failed because binocular model is not fitted")
+
+        for model, indices, topic, model_name in (
+            (self.right_model, right_idc, "gaze.2d.0.", "right"),
+            (self.left_model, left_idc, "gaze.2d.1.", "left"),
+        ):
+            if not indices:
+                continue
+            if not model.is_fitted:
+                logger.debug(
+                    f"Prediction failed because {model_name} model is not fitted"
+                )
+                continue
+            X = self._extract_pupil_features([matches[i][0] for i in indices])
+            gaze_positions = model.predict(X).tolist()
+            for idx, gaze_pos in zip(indices, gaze_positions):
+                predictions[idx] = topic, gaze_pos
+
+        confidences = _match_means(matches, "confidence")
+        timestamps = _match_means(matches, "timestamp")
+        for idx, (pupil_match, prediction) in enumerate(zip(matches, predictions)):
+            if prediction is None:
+                continue  # Prediction failed and the reason was logged
+            topic, gaze_pos = prediction
+            yield {
+                "topic": topic,
+                "norm_pos": gaze_pos,
+                "confidence": confidences[idx],
+                "timestamp": timestamps[idx],
+                "base_data": pupil_match,
+            }
+
     def filter_pupil_data(
         self, pupil_data: T.Iterable, confidence_threshold: T.Optional[float] = None
     ) -> T.Iterable:
@@ -20,6 +20,8 @@ from gaze_mapping.gazer_base import (
     GazerBase,
     Model,
     NotEnoughDataError,
+    _match_indices_by_model,
+    _match_means,
 )
 from methods import normalize
 
@@ -52,9 +54,16 @@ class Model3D(Model):
         pass
 
     @abc.abstractmethod
-    def _predict_single(self, x):
+    def predict_batch(self, X) -> T.List[T.Optional[dict]]:
+        """Predict gaze for all samples of `X` in a vectorized pass
+
+        Returns a list with one result per sample, None if the prediction failed.
+        """
         pass
 
+    def _predict_single(self, x):
+        return self.predict_batch(x[np.newaxis])[0]
+
     def __init__(self, *, intrinsics: T.Optional[T.Any], initial_depth: float):
         self.intrinsics = intrinsics
         self.initial_depth = initial_depth
@@ -79,6 +88,19 @@ class Model3D(Model):
         predictions = filter(bool, predictions)
         return predictions
 
+    def _norm_pos_batch(self, image_points):
+        image_points = image_points.reshape(-1, 2)
+        width, height = self.intrinsics.resolution
+        norm_pos = np.empty_like(image_points)
+        norm_pos[:, 0] = image_points[:, 0] / float(width)
+        norm_pos[:, 1] = 1 - image_points[:, 1] / float(height)
+        # see _clamp_norm_point()
+        return np.clip(norm_pos, -100.0, 100.0)
+
+    @staticmethod
+    def _transform_batch(matrix, points):
+        return points @ matrix[:3, :3].T + matrix[:3, 3]
+
     def set_params(self, **params):
         self._params = params
         self._is_fitted = True
@@ -181,6 +203,49 @@ class Model3D_Monocular(Model3D):
 
         return g
 
+    def predict_batch(self, X, gaze_distances=None) -> T.List[T.Optional[dict]]:
+        """Vectorized `_predict_single()`
+
+        `gaze_distances` optionally overwrites `gaze_distance` per sample.
+        """
+        assert X.ndim == 2, X
+        assert X.shape[1] == _MONOCULAR_FEATURE_COUNT, X
+        pupil_normals = X[:, _MONOCULAR_PUPIL_NORMAL]
+        sphere_centers = X[:, _MONOCULAR_SPHERE_CENTER]
+        if gaze_distances is None:
+            gaze_distances = np.full(len(X), self.gaze_distance)
+        gaze_points = pupil_normals * gaze_distances[:, np.newaxis] + sphere_centers
+
+        eye_centers = self._transform_batch(
+            self.eye_camera_to_world_matrix, sphere_centers
+        )
+        gaze_3d = self._transform_batch(self.eye_camera_to_world_matrix, gaze_points)
+        normals_3d = pupil_normals @ self.rotation_matrix.T
+
+        # Check if gaze is in front of camera. If it is not, flip direction.
+        gaze_3d[gaze_3d[:, -1] < 0] *= -1.0
+
+        predictions = [
+            {
+                "eye_center_3d": eye_center,
+                "gaze_normal_3d": normal_3d,
+                "gaze_point_3d": gaze_point_3d,
+            }
+            for eye_center, normal_3d, gaze_point_3d in zip(
+                eye_centers.tolist(), normals_3d.tolist(), gaze_3d.tolist()
+            )
+        ]
+
+        if self.intrinsics is not None and len(X) > 0:
+            image_points = self.intrinsics.projectPoints(
+                gaze_points, self.rotation_vector, self.translation_vector
+            )
+            norm_positions = self._norm_pos_batch(image_points)
+            for g, norm_pos in zip(predictions, norm_positions.tolist()):
+                g["norm_pos"] = tuple(norm_pos)
+
+        return predictions
+
     def _toWorld(self, p):
         point = np.ones(4)
         point[:3] = p[:3]
@@ -324,6 +389,73 @@ class Model3D_Binocular(Model3D):
 
         return g
 
+    def predict_batch(self, X) -> T.List[T.Optional[dict]]:
+        """Vectorized `_predict_single()`
+
+        Updates `last_gaze_distance` to the one of the last sample. The gaze
+        distances of all samples are stored in `batch_gaze_distances`, NaN for
+        samples that do not update `last_gaze_distance`.
+        """
+        assert X.ndim == 2, X
+        assert X.shape[1] == _BINOCULAR_FEATURE_COUNT, X
+        eye0_matrix, eye1_matrix = self.eye_camera_to_world_matricies
+        # eye ball centers in world coords
+        s1_center = self._transform_batch(eye1_matrix, X[:, _MONOCULAR_SPHERE_CENTER])
+        s0_center = self._transform_batch(eye0_matrix, X[:, _BINOCULAR_SPHERE_CENTER])
+        # eye line of sight in world coords
+        s1_normal = X[:, _MONOCULAR_PUPIL_NORMAL] @ self.rotation_matricies[1].T
+        s0_normal = X[:, _BINOCULAR_PUPIL_NORMAL] @ self.rotation_matricies[0].T
+
+        # see _predict_single()
+        cyclop_normal = (s0_normal + s1_normal) / 2.0
+        cyclop_center = (s0_center + s1_center) / 2.0
+
+        gaze_plane = np.cross(cyclop_normal, s1_center - s0_center)
+        gaze_plane /= np.linalg.norm(gaze_plane, axis=1, keepdims=True)
+
+        def project_on_plane(normals):
+            distances = np.einsum("ij,ij->i", gaze_plane, normals)
+            return normals - distances[:, np.newaxis] * gaze_plane
+
+        s0_norm_on_plane = project_on_plane(s0_normal)
+        s1_norm_on_plane = project_on_plane(s1_normal)
+
+        gaze_lines0 = s0_center, s0_center + s0_norm_on_plane
+        gaze_lines1 = s1_center, s1_center + s1_norm_on_plane
+        intersection_points, _ = math_helper.nearest_intersections(
+            gaze_lines0, gaze_lines1
+        )
+
+        # Check if gaze is in front of camera. If it is not, flip direction.
+        intersection_points[intersection_points[:, -1] < 0] *= -1.0
+
+        predictions = [
+            {
+                "eye_centers_3d": {"0": center0, "1": center1},
+                "gaze_normals_3d": {"0": normal0, "1": normal1},
+                "gaze_point_3d": gaze_point_3d,
+            }
+            for center0, center1, normal0, normal1, gaze_point_3d in zip(
+                s0_center.tolist(),
+                s1_center.tolist(),
+                s0_normal.tolist(),
+                s1_normal.tolist(),
+                intersection_points.tolist(),
+            )
+        ]
+
+        self.batch_gaze_distances = np.full(len(X), np.nan)
+        if self.intrinsics is not None and len(X) > 0:
+            cyclop_gaze = intersection_points - cyclop_center
+            self.batch_gaze_distances = np.linalg.norm(cyclop_gaze, axis=1)
+            self.last_gaze_distance = self.batch_gaze_distances[-1]
+            image_points = self.intrinsics.projectPoints(intersection_points)
+            norm_positions = self._norm_pos_batch(image_points)
+            for g, norm_pos in zip(predictions, norm_positions.tolist()):
+                g["norm_pos"] = tuple(norm_pos)
+
+        return predictions
+
     def _eye0_to_World(self, p):
         point = np.ones(4)
         point[:3] = p[:3]
@@ -452,6 +584,77 @@ class Gazer3D(GazerBase):
                 )
                 yield gaze_pos
 
+    def predict_batch(
+        self, matched_pupil_data: T.Sequence[T.List["Pupil"]]
+    ) -> T.Iterator["Gaze"]:
+        matches = list(matched_pupil_data)
+        binocular_idc, right_idc, left_idc = _match_indices_by_model(matches)
+        predictions = [None] * len(matches)  # (topic, gaze_datum) per match
+
+        # Monocular models use the gaze distance of the most recent binocular
+        # prediction. Keep track of it per match to reproduce `predict()`.
+        last_gaze_distance = getattr(self.binocular_model, "last_gaze_distance", None)
+        # positions of the matches that updated the gaze distance, and their distances
+        distance_idc = np.empty(0, dtype=int)
+        distances = np.empty(0)
+        if binocular_idc:
+            if self.binocular_model.is_fitted:
+                right = self._extract_pupil_features(
+                    [matches[i][0] for i in binocular_idc]
+                )
+                left = self._extract_pupil_features(
+                    [matches[i][1] for i in binocular_idc]
+                )
+                X = np.hstack([left, right])
+                gaze_data = self.binocular_model.predict_batch(X)
+                distances = self.binocular_model.batch_gaze_distances
+                updated = ~np.isnan(distances)
+                distance_idc = np.asarray(binocular_idc)[updated]
+                distances = distances[updated]
+                for idx, gaze_datum in zip(binocular_idc, gaze_data):
+                    predictions[idx] = "gaze.3d.01.", gaze_datum
+            else:
+                logger.debug("Prediction failed because binocular model is not fitted")
+
+        for model, indices, topic, model_name in (
+            (self.right_model, right_idc, "gaze.3d.0.", "right"),
+            (self.left_model, left_idc, "gaze.3d.1.", "left"),
+        ):
+            if not indices:
+                continue
+            if not model.is_fitted:
+                logger.debug(
+                    f"Prediction failed because {model_name} model is not fitted"
+                )
+                continue
+            X = self._extract_pupil_features([matches[i][0] for i in indices])
+            gaze_distances = None
+            binocular_model = model.binocular_model
+            if binocular_model is not None and binocular_model.is_fitted:
+                previous = np.searchsorted(distance_idc, indices) - 1
+                has_previous = previous >= 0
+                gaze_distances = np.full(len(indices), last_gaze_distance, dtype=float)
+                gaze_distances[has_previous] = distances[previous[has_previous]]
+            gaze_data = model.predict_batch(X, gaze_distances=gaze_distances)
+            for idx, gaze_datum in zip(indices, gaze_data):
+                predictions[idx] = topic, gaze_datum
+
+        confidences = _match_means(matches, "confidence")
+        timestamps = _match_means(matches, "timestamp")
+        for idx, (pupil_match, prediction) in enumerate(zip(matches, predictions)):
+            if prediction is None or not prediction[1]:
+                continue  # Prediction failed and the reason was logged
+            topic, gaze_datum = prediction
+            gaze_datum.update(
+                {
+                    "topic": topic,
+                    "confidence": confidences[idx],
+                    "timestamp": timestamps[idx],
+                    "base_data": pupil_match,
+                }
+            )
+            yield gaze_datum
+
     def filter_pupil_data(
         self, pupil_data: T.Iterable, confidence_threshold: T.Optional[float] = None
     ) -> T.Iterable:
@@ -122,6 +122,16 @@ class GazerBase(abc.ABC, Plugin):
     ) -> T.Iterator["Gaze"]:
         pass
 
+    def predict_batch(
+        self, matched_pupil_data: T.Sequence[T.List["Pupil"]]
+    ) -> T.Iterator["Gaze"]:
+        """Predicts gaze for a batch of pupil matches
+
+        Yields the same gaze as `predict()`. Overwrite to predict the whole batch in a
+        vectorized pass.
+        """
+        yield from self.predict(matched_pupil_data)
+
     def filter_pupil_data(
         self, pupil_data: T.Iterable, confidence_threshold: T.Optional[float] = None
     ) -> T.Iterable:
@@ -358,15 +368,62 @@ class GazerBase(abc.ABC, Plugin):
         X = self._extract_pupil_features(pupil)
         return X, Y
 
-    def map_pupil_to_gaze(self, pupil_data, sort_by_creation_time=True):
+    def map_pupil_to_gaze(
+        self,
+        pupil_data,
+        sort_by_creation_time=True,
+        batch_size: T.Optional[int] = None,
+    ):
+        """Maps pupil data to gaze
+
+        If `batch_size` is given, pupil data is matched at once with
+        `matcher.map_batch()`, starting with empty matcher caches, and predicted in
+        batches of this size with `predict_batch()`. Use this for mapping many pupil
+        data at once.
+        """
         pupil_data = self.filter_pupil_data(pupil_data)
         if sort_by_creation_time:
             pupil_data.sort(key=lambda p: p["timestamp"])
 
-        matches = (self.matcher.on_pupil_datum(datum) for datum in pupil_data)
-        matches = itertools.chain.from_iterable(matches)
+        if batch_size is None:
+            matches = (self.matcher.on_pupil_datum(datum) for datum in pupil_data)
+            yield from self.predict(itertools.chain.from_iterable(matches))
+            return
+
+        matches = iter(self.matcher.map_batch(pupil_data))
+        while True:
+            batch = list(itertools.islice(matches, batch_size))
+            if not batch:
+                break
+            yield from self.predict_batch(batch)
+
+
+def _match_indices_by_model(
+    matched_pupil_data: T.Sequence[T.List["Pupil"]],
+) -> T.Tuple[T.List[int], T.List[int], T.List[int]]:
+    """Positions of the binocular, right (eye0) and left (eye1) pupil matches"""
+    binocular, right, left = [], [], []
+    for idx, pupil_match in enumerate(matched_pupil_data):
+        num_matched = len(pupil_match)
+        if num_matched == 2:
+            binocular.append(idx)
+        elif num_matched == 1:
+            eye_id = pupil_match[0]["id"]
+            if eye_id == 0:
+                right.append(idx)
+            elif eye_id == 1:
+                left.append(idx)
+        else:
+            raise ValueError(f"Unexpected number of matched pupil_data: {num_matched}")
+    return binocular, right, left
+
 
-        yield from self.predict(matches)
+def _match_means(matched_pupil_data: T.Sequence[T.List["Pupil"]], key: str):
+    """Mean of `key` per pupil match, equal to `np.mean()` of each match"""
+    first = np.fromiter((m[0][key] for m in matched_pupil_data), dtype=np.float64)
+    last = np.fromiter((m[-1][key] for m in matched_pupil_data), dtype=np.float64)
+    # a monocular match is averaged with itself, which is exact
+    return (first + last) / 2
 
 
 class Matches(T.NamedTuple):
@@ -11,8 +11,6 @@ See COPYING and COPYING.LESSER for license details.
 import typing as T
 from collections import deque
 
-import numpy as np
-
 
 class RealtimeMatcher:
     def __init__(self):
@@ -26,7 +24,8 @@ class RealtimeMatcher:
         return len(cache) >= 2
 
     def estimate_frame_rate_raw(self, cache):
-        return np.mean(np.diff([d["timestamp"] for d in cache]))
+        # mean of the timestamp differences, without computing all of them
+        return (cache[-1]["timestamp"] - cache[0]["timestamp"]) / (len(cache) - 1)
 
     def estimate_framerate_smoothed(self, eye0_cache, eye1_cache):
         if self.is_cache_valid(eye0_cache) and self.is_cache_valid(eye1_cache):
@@ -46,14 +45,97 @@ class RealtimeMatcher:
         return self.recently_estimated_framerate
 
     def map_batch(self, pupil_list):
-        current_caches = self._caches
-        self._caches = (deque(), deque())
-        results = []
+        """Matches a batch of pupil data, starting with empty caches
+
+        Returns the same matches as passing the data one by one to `on_pupil_datum()`
+        with empty caches. Instead of queueing the data, the caches are tracked as
+        ranges into per-eye lists of timestamps and confidences, which is much faster
+        for large batches.
+        """
+        data_by_eye = ([], [])
+        eye_ids = []
         for p in pupil_list:
-            results.extend(self.on_pupil_datum(p))
+            data_by_eye[p["id"]].append(p)
+            eye_ids.append(p["id"])
+
+        timestamps = [[p["timestamp"] for p in data] for data in data_by_eye]
+        confidences = [[p["confidence"] for p in data] for data in data_by_eye]
+
+        matches = []
+        for eye_id, idx0, idx1 in self._match_indices(eye_ids, timestamps, confidences):
+            if eye_id is None:
+                matches.append([data_by_eye[0][idx0], data_by_eye[1][idx1]])
+            else:
+                matches.append([data_by_eye[eye_id][idx0 if eye_id == 0 else idx1]])
+        return matches
+
+    def _match_indices(self, eye_ids, timestamps, confidences):
+        """Replays `on_pupil_datum()` on the per-eye timestamps and confidences
+
+        Yields `(eye_id, idx0, idx1)` for each match, where `eye_id` is None for
+        binocular matches and `idx0`/`idx1` are the positions in the eye0/eye1 lists.
+        """
+        ts0, ts1 = timestamps
+        conf0, conf1 = confidences
+        min_confidence = self.min_pupil_confidence
+        sample_cutoff = self.sample_cutoff
+        smoothing_factor = self.framerate_estimation_smoothing_factor
+        framerate = self.recently_estimated_framerate
+        # the caches are ts0[head0:end0] and ts1[head1:end1]
+        head0 = end0 = head1 = end1 = 0
+
+        try:
+            for eye_id in eye_ids:
+                if eye_id == 0:
+                    end0 += 1
+                else:
+                    end1 += 1
+                len0 = end0 - head0
+                len1 = end1 - head1
+
+                # estimate_framerate_smoothed()
+                if len0 >= 2 and len1 >= 2:
+                    framerate_raw = max(
+                        (ts0[end0 - 1] - ts0[head0]) / (len0 - 1),
+                        (ts1[end1 - 1] - ts1[head1]) / (len1 - 1),
+                    )
+                    framerate += (framerate_raw - framerate) * smoothing_factor
+                elif len0 >= 2:
+                    framerate_raw = (ts0[end0 - 1] - ts0[head0]) / (len0 - 1)
+                    framerate += (framerate_raw - framerate) * smoothing_factor
+                elif len1 >= 2:
+                    framerate_raw = (ts1[end1 - 1] - ts1[head1]) / (len1 - 1)
+                    framerate += (framerate_raw - framerate) * smoothing_factor
 
-        self._caches = current_caches
-        return results
+                # map low confidence pupil data monocularly
+                if len0 and conf0[head0] < min_confidence:
+                    yield 0, head0, None
+                    head0 += 1
+                elif len1 and conf1[head1] < min_confidence:
+                    yield 1, None, head1
+                    head1 += 1
+                # map high confidence data binocularly if available
+                elif len0 and len1:
+                    if abs(ts0[head0] - ts1[head1]) < 2 * framerate:
+                        yield None, head0, head1
+                        if ts0[head0] < ts1[head1]:
+                            head0 += 1
+                        else:
+                            head1 += 1
+                    elif ts0[head0] < ts1[head1]:
+                        yield 0, head0, None
+                        head0 += 1
+                    else:
+                        yield 1, None, head1
+                        head1 += 1
+                elif len0 > sample_cutoff:
+                    yield 0, head0, None
+                    head0 += 1
+                elif len1 > sample_cutoff:
+                    yield 1, None, head1
+                    head1 += 1
+        finally:
+            self.recently_estimated_framerate = framerate
 
     def on_pupil_datum(self, p) -> T.Iterator:
         """Returns a list with either zero, one or two pupil datums.
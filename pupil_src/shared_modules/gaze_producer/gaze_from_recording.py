@@ -8,9 +8,12 @@ Lesser General Public License (LGPL v3.0).
 See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
+import os
+
 import file_methods as fm
 import player_methods as pm
 from gaze_producer.gaze_producer_base import GazeProducerBase
+from pldata_columns import PLData_Columns
 from pupil_recording import PupilRecording, RecordingInfo
 from pyglui import ui
 
@@ -39,13 +42,27 @@ class GazeFromRecording(GazeProducerBase):
 
     def __init__(self, g_pool):
         super().__init__(g_pool)
-        self.g_pool.gaze_positions = self._load_gaze_data()
+        self._gaze_data = self._load_gaze_data()
+        self.g_pool.gaze_positions = self._gaze_data
         self._gaze_changed_announcer.announce_existing()
 
     def _load_gaze_data(self):
-        gaze = fm.load_pldata_file(self.g_pool.rec_dir, "gaze")
+        rec_dir = self.g_pool.rec_dir
+        gaze = fm.load_pldata_file_memory_mapped(rec_dir, "gaze")
+        if isinstance(gaze.data, fm.PLData_Memory_Map):
+            columns = PLData_Columns(
+                gaze.data, rec_dir, "gaze", os.path.join(rec_dir, "offline_data")
+            )
+            return pm.Memory_Mapped_Bisector(
+                gaze.data, gaze.timestamps, columns=columns
+            )
         return pm.Bisector(gaze.data, gaze.timestamps)
 
     def init_ui(self):
         super().init_ui()
         self.menu.append(ui.Info_Text("Using gaze data recorded by Pupil Capture."))
+
+    def cleanup(self):
+        super().cleanup()
+        if isinstance(self._gaze_data, pm.Memory_Mapped_Bisector):
+            self._gaze_data.close()
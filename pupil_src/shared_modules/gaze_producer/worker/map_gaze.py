@@ -17,6 +17,9 @@ from .fake_gpool import FakeGPool
 
 g_pool = None  # set by the plugin
 
+# Number of pupil matches that are mapped to gaze in a single vectorized pass
+MAP_GAZE_BATCH_SIZE = 1000
+
 
 class NotEnoughPupilData(ValueError):
     pass
@@ -71,7 +74,10 @@ def _map_gaze(
     ts_span = last_ts - first_ts
     curr_ts = first_ts
 
-    for gaze_datum in gazer.map_pupil_to_gaze(pupil_pos_in_mapping_range):
+    gaze_data = gazer.map_pupil_to_gaze(
+        pupil_pos_in_mapping_range, batch_size=MAP_GAZE_BATCH_SIZE
+    )
+    for gaze_datum in gaze_data:
         _apply_manual_correction(gaze_datum, manual_correction_x, manual_correction_y)
 
         # gazer.map_pupil_to_gaze does not yield gaze with monotonic timestamps.
@@ -9,6 +9,7 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 import logging
+import multiprocessing as mp
 
 import tasklib
 from head_pose_tracker import worker
@@ -33,12 +34,14 @@ class OfflineDetectionController(Observable):
         self._get_current_trim_mark_range = get_current_trim_mark_range
         self._all_timestamps = all_timestamps
         self._source_path = source_path
-        self._task = None
+        self._tasks = []
 
     def calculate(self):
         self._create_detection_task()
 
     def _create_detection_task(self):
+        """Detects markers in consecutive chunks of the frame range in parallel tasks"""
+
         def on_yield(data_pairs):
             if data_pairs is None:
                 # first yield (None), for instant update on menu and timeline
@@ -47,29 +50,45 @@ class OfflineDetectionController(Observable):
                 self._insert_markers_bisector(data_pairs)
 
         def on_completed(_):
+            if not all(task.completed for task in self._tasks):
+                return
             self._detection_storage.save_pldata_to_disk()
             logger.info("marker detection completed")
             self.on_detection_ended()
 
         def on_canceled_or_killed():
+            if any(task.running for task in self._tasks):
+                return
             self._detection_storage.save_pldata_to_disk()
             logger.info("marker detection canceled")
             self.on_detection_ended()
 
-        self._task = self._create_task()
-        self._task.add_observer("on_yield", on_yield)
-        self._task.add_observer("on_completed", on_completed)
-        self._task.add_observer("on_canceled_or_killed", on_canceled_or_killed)
-        self._task.add_observer("on_exception", tasklib.raise_exception)
-        self._task.add_observer("on_started", self.on_detection_started)
+        calculated_frame_indices = set(
+            self._detection_storage.frame_index_to_num_markers.keys()
+        )
+        chunks = worker.detection_chunks(
+            self._general_settings.detection_frame_index_range,
+            calculated_frame_indices,
+            num_chunks=max(1, mp.cpu_count() - 1),
+        )
+        self._tasks = [
+            self._create_task(chunk, calculated_frame_indices) for chunk in chunks
+        ]
+        for task in self._tasks:
+            task.add_observer("on_yield", on_yield)
+            task.add_observer("on_completed", on_completed)
+            task.add_observer("on_canceled_or_killed", on_canceled_or_killed)
+            task.add_observer("on_exception", tasklib.raise_exception)
+        self._tasks[0].add_observer("on_started", self.on_detection_started)
         logger.info("Start marker detection")
 
-    def _create_task(self):
+    def _create_task(self, frame_index_range, calculated_frame_indices):
+        start, end = frame_index_range
         args = (
             self._source_path,
             self._all_timestamps,
-            self._general_settings.detection_frame_index_range,
-            set(self._detection_storage.frame_index_to_num_markers.keys()),
+            frame_index_range,
+            {idx for idx in calculated_frame_indices if start <= idx <= end},
         )
         return self._task_manager.create_background_task(
             name="marker detection",
@@ -79,25 +98,31 @@ class OfflineDetectionController(Observable):
         )
 
     def _insert_markers_bisector(self, data_pairs):
+        markers_ts = []
+        all_markers = []
         for timestamp, markers, frame_index in data_pairs:
-            for marker in markers:
-                self._detection_storage.markers_bisector.insert(timestamp, marker)
+            markers_ts.extend([timestamp] * len(markers))
+            all_markers.extend(markers)
             self._detection_storage.frame_index_to_num_markers[frame_index] = len(
                 markers
             )
+        self._detection_storage.markers_bisector.insert_many(markers_ts, all_markers)
         self.on_detection_yield()
 
     def cancel_task(self):
-        if self.is_running_task:
-            self._task.kill(None)
+        for task in self._tasks:
+            if task.running:
+                task.kill(None)
 
     @property
     def is_running_task(self):
-        return self._task is not None and self._task.running
+        return any(task.running for task in self._tasks)
 
     @property
     def progress(self):
-        return self._task.progress if self.is_running_task else 0.0
+        if not self.is_running_task:
+            return 0.0
+        return sum(task.progress for task in self._tasks) / len(self._tasks)
 
     def set_range_from_current_trim_marks(self):
         self._general_settings.detection_frame_index_range = (
@@ -9,6 +9,7 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 import logging
+import multiprocessing as mp
 
 import tasklib
 from head_pose_tracker import worker
@@ -39,7 +40,7 @@ class OfflineLocalizationController(Observable):
         self._get_current_trim_mark_range = get_current_trim_mark_range
         self._all_timestamps = all_timestamps
 
-        self._task = None
+        self._tasks = []
 
         if self._localization_storage.calculated:
             self.status = "calculated"
@@ -99,34 +100,45 @@ class OfflineLocalizationController(Observable):
         self.status = self._default_status
 
     def _create_localization_task(self):
+        """Localizes consecutive chunks of the frame range in parallel tasks"""
+
         def on_yield(data_pairs):
             self._insert_pose_bisector(data_pairs)
-            self.status = f"{self._task.progress * 100:.0f}% completed"
+            self.status = f"{self.progress * 100:.0f}% completed"
 
         def on_completed(_):
+            if not all(task.completed for task in self._tasks):
+                return
             self.status = "successfully completed"
             self._localization_storage.save_pldata_to_disk()
             logger.info("camera localization completed")
             self.on_localization_ended()
 
         def on_canceled_or_killed():
+            if any(task.running for task in self._tasks):
+                return
             self._localization_storage.save_pldata_to_disk()
             logger.info("camera localization canceled")
             self.on_localization_ended()
 
-        self._task = self._create_task()
-        self._task.add_observer("on_yield", on_yield)
-        self._task.add_observer("on_completed", on_completed)
-        self._task.add_observer("on_canceled_or_killed", on_canceled_or_killed)
-        self._task.add_observer("on_exception", tasklib.raise_exception)
-        self._task.add_observer("on_started", self.on_localization_started)
+        chunks = worker.localization_chunks(
+            self._general_settings.localization_frame_index_range,
+            num_chunks=max(1, mp.cpu_count() - 1),
+        )
+        self._tasks = [self._create_task(*chunk) for chunk in chunks]
+        for task in self._tasks:
+            task.add_observer("on_yield", on_yield)
+            task.add_observer("on_completed", on_completed)
+            task.add_observer("on_canceled_or_killed", on_canceled_or_killed)
+            task.add_observer("on_exception", tasklib.raise_exception)
+        self._tasks[0].add_observer("on_started", self.on_localization_started)
         logger.info("Start camera localization")
         self.status = "0% completed"
 
-    def _create_task(self):
+    def _create_task(self, seam_start, start, end):
         args = (
             self._all_timestamps,
-            self._general_settings.localization_frame_index_range,
+            (seam_start, end),
             self._detection_storage.markers_bisector,
             self._detection_storage.frame_index_to_num_markers,
             self._optimization_storage.marker_id_to_extrinsics,
@@ -137,24 +149,29 @@ class OfflineLocalizationController(Observable):
             routine_or_generator_function=worker.offline_localization,
             pass_shared_memory=True,
             args=args,
+            kwargs={"first_yielded_frame_index": start},
         )
 
     def _insert_pose_bisector(self, data_pairs):
-        for timestamp, pose in data_pairs:
-            self._localization_storage.pose_bisector.insert(timestamp, pose)
+        if data_pairs:
+            timestamps, poses = zip(*data_pairs)
+            self._localization_storage.pose_bisector.insert_many(timestamps, poses)
         self.on_localization_yield()
 
     def cancel_task(self):
-        if self.is_running_task:
-            self._task.kill(None)
+        for task in self._tasks:
+            if task.running:
+                task.kill(None)
 
     @property
     def is_running_task(self):
-        return self._task is not None and self._task.running
+        return any(task.running for task in self._tasks)
 
     @property
     def progress(self):
-        return self._task.progress if self.is_running_task else 0.0
+        if not self.is_running_task:
+            return 0.0
+        return sum(task.progress for task in self._tasks) / len(self._tasks)
 
     def set_range_from_current_trim_marks(self):
         self._general_settings.localization_frame_index_range = (
@@ -70,10 +70,12 @@ class OnlineController:
 
     def _save_key_markers(self):
         if self._general_settings.optimize_markers_3d_model:
-            self._optimization_storage.all_key_markers += pick_key_markers.run(
+            key_markers = pick_key_markers.run(
                 self._detection_storage.current_markers,
                 self._optimization_storage.all_key_markers,
+                key_marker_index=self._optimization_storage.key_marker_index,
             )
+            self._optimization_storage.all_key_markers.extend(key_markers)
 
     def _calculate_markers_3d_model(self):
         if (
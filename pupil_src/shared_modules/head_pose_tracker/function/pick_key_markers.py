@@ -30,18 +30,61 @@ _bins_y = np.linspace(0, 1, n_bins_y + 1)[1:-1]
 _n_frames_passed = 0
 
 
-def run(markers_in_frame, all_key_markers, select_key_markers_interval=2):
+class KeyMarkerIndex:
+    """Number of key markers per `(marker_id, bin)`.
+
+    Maintained alongside a list of key markers, such that checking the availability
+    of bins does not need to scan all key markers.
+    """
+
+    def __init__(self, key_markers=()):
+        self._counts = collections.Counter()
+        self.add(key_markers)
+
+    def add(self, key_markers):
+        self._counts.update((marker.marker_id, marker.bin) for marker in key_markers)
+
+    def count(self, marker_id, bin) -> int:
+        return self._counts[marker_id, bin]
+
+
+def run(
+    markers_in_frame,
+    all_key_markers,
+    select_key_markers_interval=2,
+    key_marker_index=None,
+):
+    """Returns the markers in frame if they should be added to the key markers.
+
+    If `key_marker_index` is given, it needs to index `all_key_markers` and is
+    updated with the returned key markers. Otherwise `all_key_markers` are indexed
+    on demand.
+    """
     assert select_key_markers_interval >= 1
 
+    bins = _get_bins(markers_in_frame)
     if _decide_key_markers(
-        markers_in_frame, all_key_markers, select_key_markers_interval
+        markers_in_frame,
+        bins,
+        all_key_markers,
+        key_marker_index,
+        select_key_markers_interval,
     ):
-        return _get_key_markers(markers_in_frame)
+        key_markers = _get_key_markers(markers_in_frame, bins)
+        if key_marker_index is not None:
+            key_marker_index.add(key_markers)
+        return key_markers
     else:
         return []
 
 
-def _decide_key_markers(markers_in_frame, all_key_markers, select_key_markers_interval):
+def _decide_key_markers(
+    markers_in_frame,
+    bins,
+    all_key_markers,
+    key_marker_index,
+    select_key_markers_interval,
+):
     global _n_frames_passed
 
     _n_frames_passed += 1
@@ -49,21 +92,16 @@ def _decide_key_markers(markers_in_frame, all_key_markers, select_key_markers_in
         _n_frames_passed = 0
 
         if len(markers_in_frame) >= min_n_markers_per_frame:
-            if _check_bins_availability(markers_in_frame, all_key_markers):
+            if key_marker_index is None:
+                key_marker_index = KeyMarkerIndex(all_key_markers)
+            if _check_bins_availability(markers_in_frame, bins, key_marker_index):
                 return True
     return False
 
 
-def _check_bins_availability(markers_in_frame, all_key_markers):
-    for marker in markers_in_frame:
-        n_same_markers_in_bin = len(
-            [
-                key_marker
-                for key_marker in all_key_markers
-                if key_marker.marker_id == marker["id"]
-                and key_marker.bin == _get_bin(marker)
-            ]
-        )
+def _check_bins_availability(markers_in_frame, bins, key_marker_index):
+    for marker, bin in zip(markers_in_frame, bins):
+        n_same_markers_in_bin = key_marker_index.count(marker["id"], bin)
         # when there is one marker whose bin is available,
         # all markers in this frame are regarded as key_markers
         if n_same_markers_in_bin < max_n_same_markers_per_bin:
@@ -72,15 +110,18 @@ def _check_bins_availability(markers_in_frame, all_key_markers):
     return False
 
 
-def _get_key_markers(markers_in_frame):
+def _get_key_markers(markers_in_frame, bins):
     return [
-        KeyMarker(marker["timestamp"], marker["id"], marker["verts"], _get_bin(marker))
-        for marker in markers_in_frame
+        KeyMarker(marker["timestamp"], marker["id"], marker["verts"], bin)
+        for marker, bin in zip(markers_in_frame, bins)
     ]
 
 
-def _get_bin(detection):
-    centroid = detection["centroid"]
-    bin_x = int(np.digitize(centroid[0], _bins_x))
-    bin_y = int(np.digitize(centroid[1], _bins_y))
-    return bin_x, bin_y
+def _get_bins(detections):
+    """Bins of the centroids of all detections at once"""
+    centroids = np.array(
+        [detection["centroid"] for detection in detections], dtype=np.float64
+    ).reshape(-1, 2)
+    bins_x = np.digitize(centroids[:, 0], _bins_x).tolist()
+    bins_y = np.digitize(centroids[:, 1], _bins_y).tolist()
+    return list(zip(bins_x, bins_y))
@@ -14,7 +14,7 @@ import re
 
 import file_methods as fm
 import numpy as np
-from head_pose_tracker.function import utils
+from head_pose_tracker.function import pick_key_markers, utils
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +35,21 @@ class Markers3DModel:
         self.frame_id_to_extrinsics = {}
         self.all_key_markers = []
 
+    @property
+    def all_key_markers(self):
+        """Key markers, indexed by `key_marker_index`.
+
+        Assigning the key markers rebuilds the index. When extending the list in
+        place, pass `key_marker_index` to `pick_key_markers.run()` to keep it up to
+        date.
+        """
+        return self._all_key_markers
+
+    @all_key_markers.setter
+    def all_key_markers(self, all_key_markers):
+        self._all_key_markers = all_key_markers
+        self.key_marker_index = pick_key_markers.KeyMarkerIndex(all_key_markers)
+
     def load_model(self, marker_id_to_extrinsics):
         self.origin_marker_id = utils.find_origin_marker_id(marker_id_to_extrinsics)
         if self.origin_marker_id is None:
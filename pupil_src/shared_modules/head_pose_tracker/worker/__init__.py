@@ -9,11 +9,13 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 from head_pose_tracker.worker.detection_worker import (
+    detection_chunks,
     offline_detection,
     online_detection,
 )
 from head_pose_tracker.worker.export_worker import export_routine
 from head_pose_tracker.worker.localization_worker import (
+    localization_chunks,
     offline_localization,
     online_localization,
 )
@@ -9,6 +9,7 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 import logging
+import time
 from types import SimpleNamespace
 
 import cv2
@@ -66,6 +67,42 @@ def _detect(frame):
     ]
 
 
+# Chunks are not split further, such that seeking and decoder setup do not
+# outweigh the parallel detection
+MIN_FRAMES_PER_CHUNK = 500
+
+
+def uncalculated_frame_indices(frame_index_range, calculated_frame_indices):
+    """Sorted frame indices in the inclusive range without calculated frames"""
+    frame_start, frame_end = frame_index_range
+    calculated = np.fromiter(
+        calculated_frame_indices, dtype=np.int64, count=len(calculated_frame_indices)
+    )
+    return np.setdiff1d(
+        np.arange(frame_start, frame_end + 1), calculated, assume_unique=True
+    )
+
+
+def detection_chunks(frame_index_range, calculated_frame_indices, num_chunks):
+    """Splits the frame index range into consecutive chunks of similar work.
+
+    Returns list of `(start, end)` tuples with inclusive frame indices, each with a
+    similar amount of uncalculated frames.
+    """
+    frame_indices = uncalculated_frame_indices(
+        frame_index_range, calculated_frame_indices
+    )
+    num_chunks = min(num_chunks, len(frame_indices) // MIN_FRAMES_PER_CHUNK)
+    if num_chunks < 2:
+        return [tuple(frame_index_range)]
+    chunk_starts = [
+        int(chunk[0]) for chunk in np.array_split(frame_indices, num_chunks)[1:]
+    ]
+    starts = [frame_index_range[0]] + chunk_starts
+    ends = [start - 1 for start in chunk_starts] + [frame_index_range[1]]
+    return list(zip(starts, ends))
+
+
 def offline_detection(
     source_path,
     all_timestamps,
@@ -73,16 +110,19 @@ def offline_detection(
     calculated_frame_indices,
     shared_memory,
 ):
+    """Yields batches of `(timestamp, serialized markers, frame index)` tuples.
+
+    Sequential runs of uncalculated frames are decoded without seeking. Progress is
+    reported as the share of the uncalculated frames in `frame_index_range` that
+    were processed.
+    """
     batch_size = 30
-    frame_start, frame_end = frame_index_range
-    frame_indices = sorted(
-        set(range(frame_start, frame_end + 1)) - calculated_frame_indices
+    frame_indices = uncalculated_frame_indices(
+        frame_index_range, calculated_frame_indices
     )
-    if not frame_indices:
+    if not len(frame_indices):
         return
 
-    frame_count = frame_end - frame_start + 1
-    shared_memory.progress = (frame_indices[0] - frame_start + 1) / frame_count
     yield None
 
     src = video_capture.File_Source(
@@ -90,14 +130,25 @@ def offline_detection(
     )
     timestamps_no_gaps = src.timestamps
     uncalculated_timestamps = all_timestamps[frame_indices]
+    # frames that are not in the video, e.g. gaps, have no exactly matching timestamp
     seek_poses = np.searchsorted(timestamps_no_gaps, uncalculated_timestamps)
+    is_in_video = seek_poses < len(timestamps_no_gaps)
+    is_in_video[is_in_video] = (
+        timestamps_no_gaps[seek_poses[is_in_video]]
+        == uncalculated_timestamps[is_in_video]
+    )
 
+    start_time = time.perf_counter()
     queue = []
-    for frame_index, timestamp, target_frame_idx in zip(
-        frame_indices, uncalculated_timestamps, seek_poses
+    for processed_count, frame_index, timestamp, target_frame_idx, in_video in zip(
+        range(1, len(frame_indices) + 1),
+        frame_indices.tolist(),
+        uncalculated_timestamps.tolist(),
+        seek_poses.tolist(),
+        is_in_video.tolist(),
     ):
         detections = []
-        if timestamp in timestamps_no_gaps:
+        if in_video:
             if target_frame_idx != src.target_frame_idx:
                 src.seek_to_frame(target_frame_idx)  # only seek frame if necessary
             frame = src.get_frame()
@@ -107,12 +158,17 @@ def offline_detection(
         queue.append((timestamp, serialized_dicts, frame_index))
 
         if len(queue) >= batch_size:
-            shared_memory.progress = (frame_index - frame_start + 1) / frame_count
+            shared_memory.progress = processed_count / len(frame_indices)
 
             data = queue[:batch_size]
             del queue[:batch_size]
             yield data
 
+    duration = time.perf_counter() - start_time
+    logger.debug(
+        f"Detected markers in {len(frame_indices)} frames"
+        f" at {len(frame_indices) / max(duration, 1e-9):.1f} frames per second"
+    )
     yield queue
 
 
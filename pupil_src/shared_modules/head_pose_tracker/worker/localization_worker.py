@@ -38,6 +38,33 @@ def get_pose_data(extrinsics, timestamp):
         }
 
 
+# Chunks are not split further, such that the seams do not outweigh the parallel
+# localization
+MIN_FRAMES_PER_CHUNK = 1000
+
+# Frames before each chunk that are localized again to warm-start its first frames
+SEAM_FRAMES = 30
+
+
+def localization_chunks(frame_index_range, num_chunks):
+    """Splits the frame index range into consecutive chunks of similar size.
+
+    Returns list of `(seam_start, start, end)` tuples with inclusive frame indices.
+    The frames in `[seam_start, start)` overlap with the previous chunk and are only
+    localized to warm-start the chunk, see `offline_localization()`.
+    """
+    frame_start, frame_end = frame_index_range
+    frame_count = frame_end - frame_start + 1
+    num_chunks = min(num_chunks, frame_count // MIN_FRAMES_PER_CHUNK)
+    if num_chunks < 2:
+        return [(frame_start, frame_start, frame_end)]
+    bounds = np.linspace(frame_start, frame_end + 1, num_chunks + 1).astype(int)
+    return [
+        (max(start - SEAM_FRAMES, frame_start), start, stop - 1)
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+    ]
+
+
 def offline_localization(
     timestamps,
     frame_index_range,
@@ -46,27 +73,44 @@ def offline_localization(
     marker_id_to_extrinsics,
     camera_intrinsics,
     shared_memory,
+    first_yielded_frame_index=None,
 ):
-    batch_size = 300
+    """Yields batches of `(timestamp, Serialized_Dict)` camera poses.
 
-    def find_markers_in_frame(index):
-        window = pm.enclosing_window(timestamps, index)
-        return markers_bisector.by_ts_window(window)
+    The pose of each frame is warm-started with the pose of the previous frame. Poses
+    of frames before `first_yielded_frame_index` only warm-start the following frames
+    and are not yielded, e.g. for the seams of `localization_chunks()`.
+    """
+    batch_size = 300
 
     camera_extrinsics_prv = None
     not_localized_count = 0
 
     frame_start, frame_end = frame_index_range
+    if first_yielded_frame_index is None:
+        first_yielded_frame_index = frame_start
     frame_count = frame_end - frame_start + 1
     frame_indices = sorted(
         set(range(frame_start, frame_end + 1)) & set(frame_index_to_num_markers.keys())
     )
+    frames_with_markers = [
+        frame_index
+        for frame_index in frame_indices
+        if frame_index_to_num_markers[frame_index]
+    ]
+    # markers of all frames at once instead of a bisection per frame
+    frame_windows = pm.enclosing_windows(timestamps, frames_with_markers)
+    start_idc, stop_idc = markers_bisector.index_ranges_for_windows(frame_windows)
+    marker_idc_by_frame = dict(
+        zip(frames_with_markers, zip(start_idc.tolist(), stop_idc.tolist()))
+    )
 
     queue = []
     for frame_index in frame_indices:
         shared_memory.progress = (frame_index - frame_start + 1) / frame_count
-        if frame_index_to_num_markers[frame_index]:
-            markers_in_frame = find_markers_in_frame(frame_index)
+        if frame_index in marker_idc_by_frame:
+            start_idx, stop_idx = marker_idc_by_frame[frame_index]
+            markers_in_frame = markers_bisector.data[start_idx:stop_idx]
             camera_extrinsics = solvepnp.calculate(
                 camera_intrinsics,
                 markers_in_frame,
@@ -78,6 +122,9 @@ def offline_localization(
                 camera_extrinsics_prv = camera_extrinsics
                 not_localized_count = 0
 
+                if frame_index < first_yielded_frame_index:
+                    continue
+
                 timestamp = timestamps[frame_index]
                 pose_data = get_pose_data(camera_extrinsics, timestamp)
                 serialized_dict = fm.Serialized_Dict(pose_data)
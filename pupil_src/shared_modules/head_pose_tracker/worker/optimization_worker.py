@@ -75,10 +75,6 @@ def offline_optimization(
     camera_intrinsics,
     shared_memory,
 ):
-    def find_markers_in_frame(index):
-        window = pm.enclosing_window(timestamps, index)
-        return markers_bisector.by_ts_window(window)
-
     frame_start, frame_end = frame_index_range
     frame_indices_with_marker = [
         frame_index
@@ -93,11 +89,19 @@ def offline_optimization(
     bg_storage = storage.Markers3DModel(user_defined_origin_marker_id)
     bundle_adjustment = BundleAdjustment(camera_intrinsics, optimize_camera_intrinsics)
 
+    # markers of all frames at once instead of a bisection per frame
+    frame_windows = pm.enclosing_windows(timestamps, frame_indices_valid)
+    start_idc, stop_idc = markers_bisector.index_ranges_for_windows(frame_windows)
+
     all_key_markers = []
-    for idx, frame_index in enumerate(frame_indices_valid):
-        markers_in_frame = find_markers_in_frame(frame_index)
+    key_marker_index = pick_key_markers.KeyMarkerIndex()
+    for start_idx, stop_idx in zip(start_idc.tolist(), stop_idc.tolist()):
+        markers_in_frame = markers_bisector.data[start_idx:stop_idx]
         all_key_markers += pick_key_markers.run(
-            markers_in_frame, all_key_markers, select_key_markers_interval=1
+            markers_in_frame,
+            all_key_markers,
+            select_key_markers_interval=1,
+            key_marker_index=key_marker_index,
         )
 
     all_key_markers = sorted(
@@ -28,6 +28,7 @@ from pupil_recording import PupilRecording, RecordingInfo
 from pyglui import pyfontstash, ui
 from pyglui.cygl import utils as cygl_utils
 from raw_data_exporter import _Base_Positions_Exporter
+from timeline_pyramid import Min_Max_Pyramid, draw_envelope
 
 logger = logging.getLogger(__name__)
 
@@ -40,10 +41,10 @@ def glfont_generator():
     return glfont
 
 
-def get_limits(data, keys):
+def get_limits(pyramids: T.Sequence[Min_Max_Pyramid]):
     limits = (
-        min(data[key].min() if data[key].shape[0] else 0 for key in keys),
-        max(data[key].max() if data[key].shape[0] else 1 for key in keys),
+        min(pyramid.limits[0] for pyramid in pyramids),
+        max(pyramid.limits[1] for pyramid in pyramids),
     )
     # If the difference between the lower and upper bound is too small,
     # OpenGL will start throwing errors.
@@ -291,7 +292,6 @@ class IMUTimeline(Plugin):
         "pitch": cygl_utils.RGBA(0.12156, 0.46666, 0.70588, 1.0),
         "roll": cygl_utils.RGBA(1.0, 0.49803, 0.05490, 1.0),
     }
-    NUMBER_SAMPLES_TIMELINE = 4000
     TIMELINE_LINE_HEIGHT = 16
     icon_chr = chr(0xEC22)
     icon_font = "pupil_icons"
@@ -366,6 +366,8 @@ class IMUTimeline(Plugin):
         self.orient_timeline = None
         self.glfont_raw = None
         self.glfont_orient = None
+        # key -> (data the pyramid was built from, pyramid)
+        self._timeline_pyramids = {}
 
         self.data_raw = np.concatenate([rec.raw for rec in imu_recs])
         self.data_ts = np.concatenate([rec.ts for rec in imu_recs])
@@ -569,40 +571,35 @@ class IMUTimeline(Plugin):
         del self.glfont_orient
 
     def draw_raw_gyro(self, width, height, scale):
-        y_limits = get_limits(self.data_raw, self.gyro_keys)
-        self._draw_grouped(
-            self.data_raw, self.gyro_keys, y_limits, width, height, scale
-        )
+        self._draw_grouped(self.data_raw, self.gyro_keys, width, height, scale)
 
     def draw_raw_accel(self, width, height, scale):
-        y_limits = get_limits(self.data_raw, self.accel_keys)
-        self._draw_grouped(
-            self.data_raw, self.accel_keys, y_limits, width, height, scale
-        )
+        self._draw_grouped(self.data_raw, self.accel_keys, width, height, scale)
 
     def draw_orient(self, width, height, scale):
-        y_limits = get_limits(self.data_orient, self.orient_keys)
-        self._draw_grouped(
-            self.data_orient, self.orient_keys, y_limits, width, height, scale
-        )
-
-    def _draw_grouped(self, data, keys, y_limits, width, height, scale):
+        self._draw_grouped(self.data_orient, self.orient_keys, width, height, scale)
+
+    def _timeline_pyramid(self, data, key) -> Min_Max_Pyramid:
+        """Pyramid of `data[key]`, rebuilt only if `data` was replaced"""
+        cached_data, pyramid = self._timeline_pyramids.get(key, (None, None))
+        if cached_data is not data:
+            ts_min = self.g_pool.timestamps[0]
+            ts_max = self.g_pool.timestamps[-1]
+            values = data[key]
+            # orientation data is empty until fusion completes
+            timestamps = self.data_ts if len(values) else values
+            pyramid = Min_Max_Pyramid.from_signal(ts_min, ts_max, timestamps, values)
+            self._timeline_pyramids[key] = data, pyramid
+        return pyramid
+
+    def _draw_grouped(self, data, keys, width, height, scale):
         ts_min = self.g_pool.timestamps[0]
         ts_max = self.g_pool.timestamps[-1]
-        data_raw = data[keys]
-        sub_samples = np.linspace(
-            0,
-            self.data_len - 1,
-            min(self.NUMBER_SAMPLES_TIMELINE, self.data_len),
-            dtype=int,
-        )
+        pyramids = [self._timeline_pyramid(data, key) for key in keys]
+        y_limits = get_limits(pyramids)
         with gl_utils.Coord_System(ts_min, ts_max, *y_limits):
-            for key in keys:
-                data_keyed = data_raw[key]
-                if data_keyed.shape[0] == 0:
-                    continue
-                points = list(zip(self.data_ts[sub_samples], data_keyed[sub_samples]))
-                cygl_utils.draw_points(points, size=1.5 * scale, color=self.CMAP[key])
+            for key, pyramid in zip(keys, pyramids):
+                draw_envelope(pyramid, ts_min, ts_max, width, self.CMAP[key], scale)
 
     def draw_legend_gyro(self, width, height, scale):
         self._draw_legend_grouped(self.gyro_keys, width, height, scale, self.glfont_raw)
@@ -68,6 +68,42 @@ def nearest_intersection(line0, line1):
         return None, None  # parallel lines
 
 
+def nearest_intersections(line0_points, line1_points):
+    """Vectorized `nearest_intersection()` for arrays of lines.
+
+    Lines are given as pairs of point arrays of shape (n, 3). Returns the nearest
+    intersection points and the shortest distances of all line pairs.
+    """
+    p1, p2 = line0_points
+    p3, p4 = line1_points
+
+    def normalise(p):
+        m = np.linalg.norm(p, axis=1, keepdims=True)
+        return np.divide(p, m, out=np.zeros_like(p), where=m != 0)
+
+    d1 = normalise(p2 - p1)
+    d2 = normalise(p4 - p3)
+
+    diff = p1 - p3
+    a01 = -np.einsum("ij,ij->i", d1, d2)
+    b0 = np.einsum("ij,ij->i", diff, d1)
+    b1 = -np.einsum("ij,ij->i", diff, d2)
+
+    # Lines that are not parallel. Parallel lines select any pair of closest points.
+    not_parallel = np.abs(a01) < 1.0
+    det = np.where(not_parallel, 1.0 - a01 * a01, 1.0)
+    s0 = np.where(not_parallel, (a01 * b1 - b0) / det, -b0)
+    s1 = np.where(not_parallel, (a01 * b0 - b1) / det, 0.0)
+
+    closest_points0 = p1 + s0[:, np.newaxis] * d1
+    closest_points1 = p3 + s1[:, np.newaxis] * d2
+    intersection_dist = np.linalg.norm(closest_points1 - closest_points0, axis=1)
+    return (
+        closest_points1 + (closest_points0 - closest_points1) * 0.5,
+        intersection_dist,
+    )
+
+
 def nearest_linepoint_to_point(ref_point, line):
     p1 = line[0]
     p2 = line[1]
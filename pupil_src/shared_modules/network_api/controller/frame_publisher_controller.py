@@ -13,6 +13,7 @@ import typing as T
 
 from network_api.model import FrameFormat
 from observable import Observable
+from shared_frame_buffer import Shared_Frame_Writer
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +22,22 @@ class FramePublisherController(Observable):
     def on_format_changed(self):
         logger.debug(f"on_format_changed({self.__frame_format})")
 
-    def __init__(self, format="jpeg", **kwargs):
+    def __init__(self, format="jpeg", shared_memory=False, **kwargs):
         self.__frame_format = FrameFormat(format)
+        self.__shared_memory = shared_memory
+        self.__shared_frame_writer = None
         self.__did_warn_recently = False
 
     def get_init_dict(self):
-        return {"format": self.__frame_format.value}
+        return {
+            "format": self.__frame_format.value,
+            "shared_memory": self.__shared_memory,
+        }
+
+    def cleanup(self):
+        if self.__shared_frame_writer is not None:
+            self.__shared_frame_writer.close()
+            self.__shared_frame_writer = None
 
     @property
     def frame_format(self):
@@ -37,6 +48,16 @@ class FramePublisherController(Observable):
         self.__frame_format = FrameFormat(value)
         self.on_format_changed()
 
+    @property
+    def shared_memory(self) -> bool:
+        """Publish frames via shared memory, only readable by local subscribers"""
+        return self.__shared_memory
+
+    @shared_memory.setter
+    def shared_memory(self, value: bool):
+        self.__shared_memory = bool(value)
+        self.on_format_changed()
+
     def create_world_frame_dicts_from_frame(self, frame) -> T.List[dict]:
         if not frame:
             return []
@@ -64,19 +85,21 @@ class FramePublisherController(Observable):
         else:
             self.__did_warn_recently = False
 
-        # Create serializable object.
-        # Not necessary if __raw_data__ key is used.
-        # blob = memoryview(np.asarray(data).data)
-        blob = data
-
-        return [
-            {
-                "topic": "frame.world",
-                "width": frame.width,
-                "height": frame.height,
-                "index": frame.index,
-                "timestamp": frame.timestamp,
-                "format": self.__frame_format.value,
-                "__raw_data__": [blob],
-            }
-        ]
+        frame_dict = {
+            "topic": "frame.world",
+            "width": frame.width,
+            "height": frame.height,
+            "index": frame.index,
+            "timestamp": frame.timestamp,
+            "format": self.__frame_format.value,
+        }
+        if self.__shared_memory:
+            if self.__shared_frame_writer is None:
+                self.__shared_frame_writer = Shared_Frame_Writer("world")
+            frame_dict["shared_memory"] = self.__shared_frame_writer.write(data)
+        else:
+            # Create serializable object.
+            # Not necessary if __raw_data__ key is used.
+            # blob = memoryview(np.asarray(data).data)
+            frame_dict["__raw_data__"] = [data]
+        return [frame_dict]
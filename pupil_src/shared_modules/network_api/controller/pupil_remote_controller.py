@@ -35,6 +35,8 @@ class PupilRemoteController(Observable):
         'T 1234.56' Timesync: make timestamps count form 1234.56 from now on.
         't' get pupil capture timestamp returns a float as string.
         'v' get pupil software version string
+        'PLUGIN_TIMING' request plugin timing reports from all processes, which are
+            published as `plugin_timing.report` notifications
 
         # IPC Backbone communication
         'PUB_PORT' return the current pub port of the IPC Backbone
@@ -269,6 +271,9 @@ class PupilRemoteController(Observable):
             response = self.g_pool.ipc_sub_url.split(":")[-1]
         elif msg == "PUB_PORT":
             response = self.g_pool.ipc_pub_url.split(":")[-1]
+        elif msg == "PLUGIN_TIMING":
+            ipc_pub.notify({"subject": "plugin_timing.should_report"})
+            response = "OK"
         elif msg[0] == "R":
             try:
                 ipc_pub.notify(
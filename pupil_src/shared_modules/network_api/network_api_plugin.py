@@ -61,6 +61,7 @@ class NetworkApiPlugin(Plugin):
 
     def cleanup(self):
         self.frame_publisher_announce_stop()
+        self.__frame_publisher.cleanup()
         self.__frame_publisher = None
         self.__pupil_remote.cleanup()
         self.__pupil_remote = None
@@ -89,6 +90,7 @@ class NetworkApiPlugin(Plugin):
         Reacts to notifications:
             ``eye_process.started``: Re-emits ``frame_publishing.started``
             ``frame_publishing.set_format``: Sets image format specified in ``format`` field
+                and optionally enables shared memory if ``shared_memory`` is true
 
         Emits notifications:
             ``frame_publishing.started``: Frame publishing started
@@ -104,6 +106,8 @@ class NetworkApiPlugin(Plugin):
             self.frame_publisher_announce_current_format()
         elif notification["subject"] == "frame_publishing.set_format":
             # update format and trigger notification
+            if "shared_memory" in notification:
+                self.__frame_publisher.shared_memory = notification["shared_memory"]
             self.__frame_publisher.frame_format = notification["format"]
 
     def frame_publisher_announce_current_format(self, *_):
@@ -111,6 +115,7 @@ class NetworkApiPlugin(Plugin):
             {
                 "subject": "frame_publishing.started",
                 "format": self.__frame_publisher.frame_format.value,
+                "shared_memory": self.__frame_publisher.shared_memory,
             }
         )
 
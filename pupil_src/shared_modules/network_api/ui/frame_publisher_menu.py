@@ -61,5 +61,12 @@ class FramePublisherMenu(Observable):
             labels=format_labels,
         )
 
+        ui_switch_shared_memory = ui.Switch(
+            "shared_memory",
+            self.__frame_publisher_controller,
+            label="Shared memory (local subscribers only)",
+        )
+
         self.__sub_menu.append(ui_info_text)
         self.__sub_menu.append(ui_selector_format)
+        self.__sub_menu.append(ui_switch_shared_memory)
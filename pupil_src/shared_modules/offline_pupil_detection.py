@@ -0,0 +1,297 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import importlib.util
+import logging
+import os
+import time
+import types
+import typing as T
+
+import background_helper as bh
+import msgpack
+import numpy as np
+from file_methods import Persistent_Dict
+from version_utils import parse_version
+
+logger = logging.getLogger(__name__)
+
+# Chunks are not split further, such that seeking and detector setup do not
+# outweigh the parallel detection
+MIN_FRAMES_PER_CHUNK = 1000
+
+# Number of results that are sent to the foreground at once
+RESULTS_PER_BATCH = 100
+
+
+class Detection_Settings(T.NamedTuple):
+    """Detector settings of an eye process, see `load_detection_settings()`"""
+
+    properties_2d: T.Dict[str, T.Any] = {}
+    roi_frame_size: T.Tuple[int, int] = (0, 0)
+    roi_bounds: T.Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+    def roi_bounds_for_frame_size(self, width, height):
+        """ROI bounds if they were set for this frame size, else the full frame"""
+        if tuple(self.roi_frame_size) == (width, height):
+            return tuple(self.roi_bounds)
+        return 0, 0, width - 1, height - 1
+
+
+def load_detection_settings(user_dir, eye_id, version) -> Detection_Settings:
+    """2D detector properties and ROI from the eye process session settings.
+
+    These are adjusted in the eye windows and, like in the eye process, are only
+    used if they were saved by the same `version` of the app.
+    """
+    session_settings = Persistent_Dict(
+        os.path.join(user_dir, f"user_settings_eye{eye_id}")
+    )
+    if parse_version(session_settings.get("version", "0.0")) != version:
+        return Detection_Settings()
+
+    plugin_settings = dict(session_settings.get("loaded_plugins", ()))
+    detector_2d_settings = plugin_settings.get("Detector2DPlugin", {})
+    roi_settings = plugin_settings.get("Roi", {})
+    return Detection_Settings(
+        properties_2d=detector_2d_settings.get("properties") or {},
+        roi_frame_size=tuple(roi_settings.get("frame_size", (0, 0))),
+        roi_bounds=tuple(roi_settings.get("bounds", (0, 0, 0, 0))),
+    )
+
+
+def is_3d_detection_available() -> bool:
+    return importlib.util.find_spec("pye3d") is not None
+
+
+def detection_chunks(frame_count: int, num_chunks: int) -> T.List[T.Tuple[int, int]]:
+    """Splits frames into consecutive chunks of similar size.
+
+    Returns list of `(start, stop)` frame index tuples.
+    """
+    num_chunks = min(num_chunks, frame_count // MIN_FRAMES_PER_CHUNK)
+    if num_chunks < 2:
+        return [(0, frame_count)]
+    bounds = np.linspace(0, frame_count, num_chunks + 1).astype(int).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class Eye_Video_Detection:
+    """Post-hoc pupil detection of one eye video in background processes.
+
+    The 2D detector runs on consecutive chunks of the video in `num_workers`
+    processes. The 3D detector builds its eye model from all previous frames and
+    therefore runs in a single process after the 2D detection, using its results.
+
+    `fetch()` returns `(topic, timestamp, serialized pupil datum)` tuples and
+    starts the 3D detection once the 2D detection is complete. Not fetching pauses
+    the detection as soon as the pipes to the background processes are full.
+    """
+
+    def __init__(
+        self,
+        video_path,
+        eye_id: int,
+        frame_count: int,
+        settings: Detection_Settings,
+        num_workers: int = 1,
+        detect_3d: bool = True,
+        mp_context=...,
+    ):
+        self.video_path = video_path
+        self.eye_id = eye_id
+        self.frame_count = frame_count
+        self.detect_3d = detect_3d
+        self.mp_context = mp_context
+        self.num_stages = 2 if detect_3d else 1
+        self.processed_count = 0
+        self._pupil_data_2d = {}
+        self._stage = "2d"
+        self._task = bh.Task_Proxy_Group(
+            bh.IPC_Logging_Task_Proxy(
+                f"Pupil Detection 2D eye{eye_id}",
+                detect_2d_generator,
+                args=(video_path, eye_id, settings, start, stop),
+                context=mp_context,
+            )
+            for start, stop in detection_chunks(frame_count, num_workers)
+        )
+
+    @property
+    def progress(self) -> float:
+        if not self.frame_count:
+            return 1.0 if self.completed else 0.0
+        return min(self.processed_count / (self.frame_count * self.num_stages), 1.0)
+
+    @property
+    def completed(self) -> bool:
+        return self._task is None
+
+    def fetch(self, timeout: float = 1 / 50):
+        """Yields available results, for at most `timeout` seconds"""
+        if self._task is None:
+            return
+        topic = f"pupil.{self.eye_id}.{self._stage}"
+        start_time = time.perf_counter()
+        for batch in self._task.fetch():
+            for frame_index, timestamp, payload in batch:
+                if self._stage == "2d" and self.detect_3d:
+                    self._pupil_data_2d[frame_index] = payload
+                yield topic, timestamp, payload
+            self.processed_count += len(batch)
+            if time.perf_counter() - start_time > timeout:
+                return
+        if self._task.completed:
+            self._start_next_stage()
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _start_next_stage(self):
+        if self._stage == "2d" and self.detect_3d:
+            self._stage = "3d"
+            self._task = bh.IPC_Logging_Task_Proxy(
+                f"Pupil Detection 3D eye{self.eye_id}",
+                detect_3d_generator,
+                args=(self.video_path, self.eye_id, self._pupil_data_2d),
+                context=self.mp_context,
+            )
+            self._pupil_data_2d = {}
+        else:
+            self._task = None
+
+
+def detect_2d_generator(video_path, eye_id, settings, start, stop):
+    """Yields batches of 2D results for the frames in `[start, stop)`"""
+    from methods import normalize
+    from pupil_detectors import Detector2D, Roi
+
+    detector = Detector2D(settings.properties_2d)
+    roi = None
+    roi_frame_size = None
+
+    batch = []
+    for frame in _decode_frames(_file_source(video_path), start, stop):
+        frame_size = frame.width, frame.height
+        if frame_size != roi_frame_size:
+            roi = Roi(*settings.roi_bounds_for_frame_size(*frame_size))
+            roi_frame_size = frame_size
+
+        result = detector.detect(gray_img=frame.gray, roi=roi)
+        datum = _pupil_datum(
+            eye_id,
+            detection_identifier="2d",
+            detection_method="2d c++",
+            norm_pos=normalize(result["location"], frame_size, flip_y=True),
+            diameter=result["diameter"],
+            confidence=result["confidence"],
+            timestamp=frame.timestamp,
+        )
+        datum["ellipse"] = {
+            "axes": result["ellipse"]["axes"],
+            "angle": result["ellipse"]["angle"],
+            "center": result["ellipse"]["center"],
+        }
+        batch.append(_result(frame.index, datum))
+        if len(batch) >= RESULTS_PER_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def detect_3d_generator(video_path, eye_id, pupil_data_2d):
+    """Yields batches of 3D results of all frames with serialized 2D results"""
+    import pye3d
+    from methods import normalize
+    from pye3d.detector_3d import CameraModel, Detector3D, DetectorMode
+
+    cap = _file_source(video_path)
+    intrinsics = cap.intrinsics
+    camera = CameraModel(
+        focal_length=intrinsics.focal_length, resolution=intrinsics.resolution
+    )
+    detector = Detector3D(camera=camera, long_term_mode=DetectorMode.blocking)
+    detection_method = f"pye3d {pye3d.__version__} post-hoc"
+
+    batch = []
+    for frame in _decode_frames(cap, 0, cap.get_frame_count()):
+        payload_2d = pupil_data_2d.get(frame.index)
+        if payload_2d is None:
+            continue
+        datum_2d = msgpack.unpackb(payload_2d)
+        result = detector.update_and_detect(datum_2d, frame.gray)
+        datum = _pupil_datum(
+            eye_id,
+            detection_identifier="3d",
+            detection_method=detection_method,
+            norm_pos=normalize(
+                result["location"], (frame.width, frame.height), flip_y=True
+            ),
+            diameter=result["diameter"],
+            confidence=result["confidence"],
+            timestamp=frame.timestamp,
+        )
+        datum.update(result)
+        batch.append(_result(frame.index, datum))
+        if len(batch) >= RESULTS_PER_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _file_source(video_path):
+    import video_capture
+
+    return video_capture.File_Source(
+        types.SimpleNamespace(), source_path=video_path, timing=None
+    )
+
+
+def _decode_frames(cap, start, stop):
+    """Decodes frames `[start, stop)` of a `File_Source`"""
+    import video_capture
+
+    if start > 0:
+        cap.seek_to_frame(start)
+    for _ in range(start, stop):
+        try:
+            yield cap.get_frame()
+        except video_capture.EndofVideoError:
+            break
+
+
+def _pupil_datum(
+    eye_id,
+    detection_identifier,
+    detection_method,
+    norm_pos,
+    diameter,
+    confidence,
+    timestamp,
+):
+    """Basic pupil datum, like `PupilDetectorPlugin.create_pupil_datum()`"""
+    return {
+        "id": eye_id,
+        "topic": f"pupil.{eye_id}.{detection_identifier}",
+        "method": detection_method,
+        "norm_pos": norm_pos,
+        "diameter": diameter,
+        "confidence": confidence,
+        "timestamp": timestamp,
+    }
+
+
+def _result(frame_index, datum):
+    payload = msgpack.packb(datum, use_bin_type=True)
+    return frame_index, datum["timestamp"], payload
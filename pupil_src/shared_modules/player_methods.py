@@ -18,6 +18,7 @@ from itertools import chain
 import cv2
 import file_methods as fm
 import numpy as np
+import pldata_columns
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,20 @@ def enclosing_window(timestamps, idx):
     return (now + before) / 2.0, (after + now) / 2.0
 
 
+def enclosing_windows(timestamps, indices) -> np.ndarray:
+    """`enclosing_window()` for each of the `indices`, with shape (N, 2)"""
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    indices = np.asarray(indices, dtype=np.int64)
+    before = np.full(len(indices), -np.inf)
+    after = np.full(len(indices), np.inf)
+    has_before = indices > 0
+    has_after = indices < len(timestamps) - 1
+    before[has_before] = timestamps[indices[has_before] - 1]
+    after[has_after] = timestamps[indices[has_after] + 1]
+    now = timestamps[indices]
+    return np.column_stack(((now + before) / 2.0, (after + now) / 2.0))
+
+
 def exact_window(timestamps, index_range):
     end_index = min(index_range[1], len(timestamps) - 1)
     return (timestamps[index_range[0]], timestamps[end_index])
@@ -37,6 +52,8 @@ def exact_window(timestamps, index_range):
 class Bisector:
     """Stores data with associated timestamps, both sorted by the timestamp."""
 
+    _column_cache = None
+
     def __init__(self, data=(), data_ts=()):
         if len(data) != len(data_ts):
             raise ValueError(
@@ -91,6 +108,12 @@ class Bisector:
     def _start_stop_idc_for_window(self, ts_window):
         return np.searchsorted(self.data_ts, ts_window)
 
+    def index_ranges_for_windows(self, ts_windows) -> T.Tuple[np.ndarray, np.ndarray]:
+        """Start and stop indices of `by_ts_window()` for each of the (N, 2) windows"""
+        ts_windows = np.asarray(ts_windows, dtype=np.float64).reshape(-1, 2)
+        start_idc, stop_idc = self._start_stop_idc_for_window(ts_windows.T)
+        return start_idc, np.maximum(stop_idc, start_idc)
+
     def __getitem__(self, key):
         return self.data[key]
 
@@ -114,12 +137,173 @@ class Bisector:
             "data_ts": self.data_ts[start_idx:stop_idx],
         }
 
+    def column(self, key: str) -> np.ndarray:
+        """Values of field `key` for all data, sorted by timestamp.
+
+        The column is extracted once and cached. Use `column_for_window` to get the
+        values for a time window.
+        """
+        if self._column_cache is None:
+            self._column_cache = {}
+        try:
+            return self._column_cache[key]
+        except KeyError:
+            pass
+        column = self._extract_column(key)
+        column.flags.writeable = False
+        self._column_cache[key] = column
+        return column
+
+    def column_for_window(self, key: str, ts_window) -> np.ndarray:
+        start_idx, stop_idx = self._start_stop_idc_for_window(ts_window)
+        return self.column(key)[start_idx:stop_idx]
+
+    def _extract_column(self, key: str) -> np.ndarray:
+        if pldata_columns.is_column(key):
+            columns = pldata_columns.columns_from_data(self.data, count=len(self))
+            return columns[key]
+        return np.array([datum[key] for datum in self.data])
+
 
 class Mutable_Bisector(Bisector):
     def insert(self, timestamp, datum):
         insert_idx = np.searchsorted(self.data_ts, timestamp)
         self.data_ts = np.insert(self.data_ts, insert_idx, timestamp)
         self.data = np.insert(self.data, insert_idx, datum)
+        self._column_cache = None
+
+    def insert_many(self, timestamps, data):
+        """Inserts multiple data at once, like `insert()` for each datum"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        sorted_data = np.empty(len(order), dtype=object)
+        sorted_data[:] = [data[idx] for idx in order.tolist()]
+        insert_idc = np.searchsorted(self.data_ts, timestamps)
+        self.data_ts = np.insert(self.data_ts, insert_idc, timestamps)
+        self.data = np.insert(self.data, insert_idc, sorted_data)
+        self._column_cache = None
+
+
+class Memory_Mapped_Bisector(Bisector):
+    """Bisector over the records of a `fm.PLData_Memory_Map`.
+
+    Only timestamps and record indices are held in memory. Data is read from the
+    memory-mapped file on access, e.g. only for the records inside the window
+    requested via `by_ts_window`. Prefer indexing or iterating over `data`, which
+    unpacks all records once and keeps them in memory.
+    """
+
+    def __init__(
+        self,
+        records=(),
+        data_ts=(),
+        record_idc=None,
+        columns: T.Optional[pldata_columns.PLData_Columns] = None,
+    ):
+        data_ts = np.asarray(data_ts, dtype=np.float64)
+        if record_idc is None:
+            record_idc = np.arange(len(data_ts))
+        record_idc = np.asarray(record_idc, dtype=np.int64)
+        if len(record_idc) != len(data_ts):
+            raise ValueError(
+                "Each element in `record_idc` requires a corresponding"
+                " timestamp in `data_ts`"
+            )
+        self.records = records
+        self.columns = columns
+        self.sorted_idc = np.argsort(data_ts)
+        self.data_ts = data_ts[self.sorted_idc]
+        self.record_idc = record_idc[self.sorted_idc]
+        self._data = None
+
+    def copy(self):
+        return type(self)(
+            self.records, self.data_ts.copy(), self.record_idc.copy(), self.columns
+        )
+
+    def __getstate__(self):
+        # unpacked data is not pickled, see `fm.PLData_Memory_Map` for the records
+        state = self.__dict__.copy()
+        state["_data"] = None
+        state["_column_cache"] = None
+        return state
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self._data_for_slice(slice(None))
+        return self._data
+
+    def _data_for_slice(self, key):
+        if self._data is not None:
+            return self._data[key]
+        record_idc = self.record_idc[key]
+        data = np.empty(len(record_idc), dtype=object)
+        data[:] = self.records[record_idc]
+        return data
+
+    def _extract_column(self, key: str) -> np.ndarray:
+        if self.columns is not None and pldata_columns.is_column(key):
+            return self.columns.array[key][self.record_idc]
+        return super()._extract_column(key)
+
+    def by_ts(self, ts):
+        found_index = np.searchsorted(self.data_ts, ts)
+        if found_index >= len(self.data_ts) or self.data_ts[found_index] != ts:
+            raise ValueError
+        return self[found_index]
+
+    def by_ts_window(self, ts_window):
+        start_idx, stop_idx = self._start_stop_idc_for_window(ts_window)
+        return self._data_for_slice(slice(start_idx, stop_idx))
+
+    def init_dict_for_window(self, ts_window):
+        start_idx, stop_idx = self._start_stop_idc_for_window(ts_window)
+        return {
+            "data": self._data_for_slice(slice(start_idx, stop_idx)),
+            "data_ts": self.data_ts[start_idx:stop_idx],
+        }
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.records[self.record_idc[key]]
+        return self._data_for_slice(key)
+
+    def __len__(self):
+        return len(self.data_ts)
+
+    def __iter__(self):
+        for record_idx in self.record_idc:
+            yield self.records[record_idx]
+
+    def __bool__(self):
+        return bool(len(self.data_ts))
+
+    def close(self):
+        """Releases the memory map. Data can not be accessed afterwards."""
+        self._data = None
+        close_records = getattr(self.records, "close", None)
+        if close_records is not None:
+            close_records()
+
+    @staticmethod
+    def can_combine(bisectors: T.Sequence[Bisector]) -> bool:
+        return (
+            len(bisectors) > 0
+            and all(isinstance(b, Memory_Mapped_Bisector) for b in bisectors)
+            and len({id(b.records) for b in bisectors}) == 1
+        )
+
+    @staticmethod
+    def combine(bisectors: T.Sequence["Memory_Mapped_Bisector"]):
+        """Combine bisectors over the same records without reading any data"""
+        return Memory_Mapped_Bisector(
+            bisectors[0].records,
+            np.concatenate([b.data_ts for b in bisectors]),
+            np.concatenate([b.record_idc for b in bisectors]),
+            bisectors[0].columns,
+        )
 
 
 class Affiliator(Bisector):
@@ -264,13 +448,17 @@ class PupilDataBisector:
         self,
         data: T.Optional[fm.PLData] = None,
         bisectors: T.Optional[T.Dict[str, Bisector]] = None,
+        columns: T.Optional[pldata_columns.PLData_Columns] = None,
     ):
         if bisectors is not None:
             self._bisectors = bisectors
         else:
             if data is None:
                 data = fm.PLData([], [], [])
-            self._bisectors = self._bisectors_from_data(data)
+            if isinstance(data.data, fm.PLData_Memory_Map):
+                self._bisectors = self._bisectors_from_memory_map(data, columns)
+            else:
+                self._bisectors = self._bisectors_from_data(data)
 
     def __repr__(self) -> str:
         return f"<{type(self).__name__} topics={list(self._bisectors.keys())}>"
@@ -284,6 +472,31 @@ class PupilDataBisector:
             _bisectors[pupil_topic] = bisector
         return _bisectors
 
+    def _bisectors_from_memory_map(
+        self, data: fm.PLData, columns: T.Optional[pldata_columns.PLData_Columns]
+    ) -> T.Dict[str, Memory_Mapped_Bisector]:
+        records = data.data
+        timestamps = np.asarray(data.timestamps)
+        raw_topics = np.asarray(data.topics)
+        assert len(raw_topics) == len(records) == len(timestamps)
+        pupil_topics = np.empty(len(raw_topics), dtype=object)
+        for raw_topic in np.unique(raw_topics):
+            topic_mask = raw_topics == raw_topic
+            if PupilTopic.match(raw_topic):
+                pupil_topics[topic_mask] = raw_topic
+            else:
+                # Pre-v2 topics depend on the detection method of each datum
+                for idx in np.flatnonzero(topic_mask):
+                    pupil_topics[idx] = PupilTopic.create(raw_topic, records[idx])
+
+        _bisectors: T.Dict[str, Memory_Mapped_Bisector] = {}
+        for pupil_topic in dict.fromkeys(pupil_topics):
+            record_idc = np.flatnonzero(pupil_topics == pupil_topic)
+            _bisectors[pupil_topic] = Memory_Mapped_Bisector(
+                records, timestamps[record_idc], record_idc, columns
+            )
+        return _bisectors
+
     def init_dict_for_window(self, ts_window):
         init_dict = collections.defaultdict(list)
         for topic, bisector in self._bisectors.items():
@@ -333,21 +546,50 @@ class PupilDataBisector:
         all_bisectors = self._bisectors.values()
         return iter(self.combine_bisectors(all_bisectors))
 
+    def close(self):
+        """Releases memory-mapped data, see `Memory_Mapped_Bisector.close()`"""
+        self.__getitem__.cache_clear()
+        for bisector in self._bisectors.values():
+            if isinstance(bisector, Memory_Mapped_Bisector):
+                bisector.close()
+
     @staticmethod
     def combine_bisectors(bisectors: T.Iterable[Bisector]) -> Bisector:
+        bisectors = list(bisectors)
+        if Memory_Mapped_Bisector.can_combine(bisectors):
+            return Memory_Mapped_Bisector.combine(bisectors)
         data = list(chain.from_iterable(b.data for b in bisectors))
         data_ts = list(chain.from_iterable(b.data_ts for b in bisectors))
         return Bisector(data, data_ts)
 
     @classmethod
-    def load_from_file(cls, dir_path, filename) -> "PupilDataBisector":
-        data = fm.load_pldata_file(dir_path, filename)
-        return cls(data=data)
+    def load_from_file(
+        cls, dir_path, filename, memory_mapped: bool = False, columns_cache_dir=None
+    ) -> "PupilDataBisector":
+        """Load pupil data from `<dir_path>/<filename>.pldata`
+
+        Use `memory_mapped=True` to read data lazily. Only do so for files that are
+        not overwritten while the returned bisector is in use. If `columns_cache_dir`
+        is set, columns of memory-mapped data are cached in this directory.
+        """
+        if not memory_mapped:
+            data = fm.load_pldata_file(dir_path, filename)
+            return cls(data=data)
+
+        data = fm.load_pldata_file_memory_mapped(dir_path, filename)
+        columns = None
+        if columns_cache_dir is not None and isinstance(
+            data.data, fm.PLData_Memory_Map
+        ):
+            columns = pldata_columns.PLData_Columns(
+                data.data, dir_path, filename, columns_cache_dir
+            )
+        return cls(data=data, columns=columns)
 
     def save_to_file(self, dir_path, filename):
         with fm.PLData_Writer(dir_path, filename) as writer:
             for topic, bisector in self._bisectors.items():
-                for timestamp, datum in zip(bisector.timestamps, bisector.data):
+                for timestamp, datum in zip(bisector.timestamps, bisector):
                     writer.append_serialized(timestamp, topic, datum.serialized)
 
     ### PRIVATE
@@ -0,0 +1,129 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import logging
+import os
+import typing as T
+
+import file_methods as fm
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COLUMNS_DTYPE = np.dtype(
+    [
+        ("timestamp", np.float64),
+        ("confidence", np.float64),
+        ("norm_pos", np.float64, (2,)),
+        ("diameter", np.float64),
+        ("diameter_3d", np.float64),
+        ("gaze_point_3d", np.float64, (3,)),
+    ]
+)
+
+
+def _missing_value(name: str):
+    shape = COLUMNS_DTYPE[name].shape
+    return np.full(shape, np.nan).tolist() if shape else np.nan
+
+
+_MISSING_VALUES = {name: _missing_value(name) for name in COLUMNS_DTYPE.names}
+
+
+def is_column(key: str) -> bool:
+    return key in COLUMNS_DTYPE.names
+
+
+def columns_from_data(data: T.Iterable, count: T.Optional[int] = None) -> np.ndarray:
+    """Extracts the hot fields of pupil or gaze data in a single pass.
+
+    Returns a structured array with dtype `COLUMNS_DTYPE`. Fields that are missing
+    in a datum are filled with NaN.
+    """
+    values = {name: [] for name in COLUMNS_DTYPE.names}
+    for datum in data:
+        for name, missing in _MISSING_VALUES.items():
+            values[name].append(datum.get(name, missing))
+
+    count = len(values["timestamp"]) if count is None else count
+    columns = np.empty(count, dtype=COLUMNS_DTYPE)
+    for name, column_values in values.items():
+        columns[name] = column_values
+    return columns
+
+
+class PLData_Columns:
+    """Columns of the hot fields of a .pldata file, persisted in `cache_dir`.
+
+    The columns are built lazily on first access and cached as
+    `<topic>_columns.npy` in record order of the source file. The cache is rebuilt
+    if the source file changed since it was written.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, records, source_dir, topic, cache_dir):
+        self.records = records
+        self.source_path = os.path.join(source_dir, topic + ".pldata")
+        self.cache_path = os.path.join(cache_dir, topic + "_columns.npy")
+        self.meta_path = os.path.join(cache_dir, topic + "_columns.meta")
+        self._array = None
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} source={self.source_path}>"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if isinstance(self._array, np.memmap):
+            # loaded again on access instead of pickling the mapped file content
+            state["_array"] = None
+        return state
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = self._load_cache()
+        if self._array is None:
+            self._array = self._build_cache()
+        return self._array
+
+    def _expected_meta(self) -> dict:
+        stat = os.stat(self.source_path)
+        return {
+            "version": self.CACHE_VERSION,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "num_records": len(self.records),
+            "fields": list(COLUMNS_DTYPE.names),
+        }
+
+    def _load_cache(self) -> T.Optional[np.ndarray]:
+        try:
+            meta = fm.load_object(self.meta_path, allow_legacy=False)
+            if meta != self._expected_meta():
+                logger.debug(f"Columns cache outdated: {self.cache_path}")
+                return None
+            array = np.load(self.cache_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if array.dtype != COLUMNS_DTYPE or len(array) != len(self.records):
+            return None
+        return array
+
+    def _build_cache(self) -> np.ndarray:
+        logger.debug(f"Building columns cache for {self.source_path}")
+        array = columns_from_data(self.records, count=len(self.records))
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            np.save(self.cache_path, array)
+            fm.save_object(self._expected_meta(), self.meta_path)
+        except OSError as err:
+            logger.debug(f"Could not save columns cache {self.cache_path}: {err}")
+        return array
@@ -13,7 +13,9 @@ import logging
 import os
 import sys
 import types
-from time import time
+from time import perf_counter, time
+
+from plugin_timing import Plugin_Timing
 
 logger = logging.getLogger(__name__)
 """
@@ -363,6 +365,7 @@ class Plugin_List:
     def __init__(self, g_pool, plugin_initializers):
         self._plugins = []
         self.g_pool = g_pool
+        self.timing = Plugin_Timing()
         plugin_by_name = g_pool.plugin_by_name
 
         # add self as g_pool.plguins object to allow plugins to call the plugins list
@@ -414,6 +417,16 @@ class Plugin_List:
     def __iter__(self):
         yield from self._plugins
 
+    def call(self, method_name, *args):
+        """Calls `method_name` of each plugin in order and records its wall time"""
+        timing = self.timing
+        for p in self._plugins:
+            start = perf_counter()
+            getattr(p, method_name)(*args)
+            timing.add_plugin_duration(
+                method_name, p.class_name, perf_counter() - start
+            )
+
     def __str__(self):
         return f"Plugin List: {self._plugins}"
 
@@ -0,0 +1,172 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import typing as T
+from bisect import bisect_right
+
+
+class Timing_Histogram:
+    """Histogram of durations in seconds with logarithmically spaced bins.
+
+    Bins range from 10 µs to 1 s with four bins per decade. The first bin counts
+    shorter durations and the last bin counts longer durations.
+    """
+
+    BIN_EDGES = tuple(10 ** (exponent / 4) for exponent in range(-20, 1))
+
+    __slots__ = ("counts", "count", "total", "max", "last")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BIN_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, duration: float):
+        self.counts[bisect_right(self.BIN_EDGES, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        if duration > self.max:
+            self.max = duration
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Upper bin edge of the given percentile, or `max` for the last bin"""
+        if not self.count:
+            return 0.0
+        remaining = self.count * percent / 100
+        for bin_idx, bin_count in enumerate(self.counts):
+            remaining -= bin_count
+            if remaining <= 0:
+                break
+        if bin_idx < len(self.BIN_EDGES):
+            return min(self.BIN_EDGES[bin_idx], self.max)
+        return self.max
+
+    def to_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.mean * 1e3,
+            "p50_ms": self.percentile(50) * 1e3,
+            "p95_ms": self.percentile(95) * 1e3,
+            "max_ms": self.max * 1e3,
+            "total_s": self.total,
+            "bin_edges_ms": [edge * 1e3 for edge in self.BIN_EDGES],
+            "counts": list(self.counts),
+        }
+
+
+class Value_Stats:
+    """Running statistics of a sampled value, e.g. a queue depth"""
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.last = 0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class Plugin_Timing:
+    """Wall time of plugin calls, event loop iterations and other durations.
+
+    - `plugins[method_name][plugin_class_name]`: durations of plugin method calls
+    - `durations[name]`: other durations, e.g. of whole event loop iterations
+    - `values[name]`: other sampled values, e.g. queue depths
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.plugins = {}
+        self.durations = {}
+        self.values = {}
+
+    def add_plugin_duration(self, method_name: str, plugin_name: str, duration):
+        try:
+            histogram = self.plugins[method_name][plugin_name]
+        except KeyError:
+            histogram = Timing_Histogram()
+            self.plugins.setdefault(method_name, {})[plugin_name] = histogram
+        histogram.add(duration)
+
+    def add_duration(self, name: str, duration: float):
+        try:
+            histogram = self.durations[name]
+        except KeyError:
+            histogram = self.durations[name] = Timing_Histogram()
+        histogram.add(duration)
+
+    def add_value(self, name: str, value):
+        try:
+            stats = self.values[name]
+        except KeyError:
+            stats = self.values[name] = Value_Stats()
+        stats.add(value)
+
+    def slowest_plugins(
+        self, method_name: str, count: int = 1
+    ) -> T.List[T.Tuple[str, Timing_Histogram]]:
+        """Plugins with the longest mean duration of `method_name` calls"""
+        histograms = self.plugins.get(method_name, {}).items()
+        return sorted(histograms, key=lambda item: item[1].mean, reverse=True)[:count]
+
+    def report(self) -> T.Dict[str, T.Any]:
+        """Serializable summary, e.g. for `plugin_timing.report` notifications"""
+        return {
+            "plugins": {
+                method_name: {
+                    plugin_name: histogram.to_dict()
+                    for plugin_name, histogram in histograms.items()
+                }
+                for method_name, histograms in self.plugins.items()
+            },
+            "durations": {
+                name: histogram.to_dict() for name, histogram in self.durations.items()
+            },
+            "values": {name: stats.to_dict() for name, stats in self.values.items()},
+        }
+
+    def report_notification(self, actor: str, reset: bool = False) -> dict:
+        """`plugin_timing.report` notification in reply to `plugin_timing.should_report`"""
+        notification = {
+            "subject": "plugin_timing.report",
+            "actor": actor,
+            "timing": self.report(),
+        }
+        if reset:
+            self.reset()
+        return notification
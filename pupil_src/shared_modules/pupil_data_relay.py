@@ -10,6 +10,7 @@ See COPYING and COPYING.LESSER for license details.
 """
 
 import zmq_tools
+from file_methods import Serialized_Payload_Dict
 from plugin import System_Plugin_Base
 
 
@@ -30,15 +31,20 @@ class Pupil_Data_Relay(System_Plugin_Base):
         recent_pupil_data = []
         recent_gaze_data = []
         while self.pupil_sub.new_data:
-            topic, pupil_datum = self.pupil_sub.recv()
+            # keep the serialized data for recording it without serializing it again,
+            # see `Serialized_Payload_Dict` for how plugins may modify the datum
+            topic, pupil_datum, pupil_serialized = self.pupil_sub.recv_serialized()
+            pupil_datum = Serialized_Payload_Dict(pupil_datum, pupil_serialized)
             recent_pupil_data.append(pupil_datum)
 
             gazer = self.g_pool.active_gaze_mapping_plugin
             if gazer is None:
                 continue
             for gaze_datum in gazer.map_pupil_to_gaze([pupil_datum]):
-                self.gaze_pub.send(gaze_datum)
-                recent_gaze_data.append(gaze_datum)
+                gaze_serialized = self.gaze_pub.send(gaze_datum)
+                recent_gaze_data.append(
+                    Serialized_Payload_Dict(gaze_datum, gaze_serialized)
+                )
 
         events["pupil"] = recent_pupil_data
         events["gaze"] = recent_gaze_data
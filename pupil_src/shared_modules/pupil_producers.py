@@ -10,16 +10,17 @@ See COPYING and COPYING.LESSER for license details.
 """
 import abc
 import logging
+import multiprocessing as mp
 import os
 import typing as T
 from contextlib import contextmanager
-from itertools import chain
 
 import data_changed
 import file_methods as fm
 import gl_utils
 import numpy as np
 import OpenGL.GL as gl
+import offline_pupil_detection
 import player_methods as pm
 import pyglui.cygl.utils as cygl_utils
 import zmq
@@ -29,13 +30,13 @@ from plugin import System_Plugin_Base
 from pupil_recording import PupilRecording, RecordingInfo
 from pyglui import ui
 from pyglui.pyfontstash import fontstash as fs
+from timeline_pyramid import Min_Max_Pyramid, draw_envelope
 from video_capture.utils import VideoSet
 
 logger = logging.getLogger(__name__)
 
 COLOR_LEGEND_EYE_RIGHT = cygl_utils.RGBA(0.9844, 0.5938, 0.4023, 1.0)
 COLOR_LEGEND_EYE_LEFT = cygl_utils.RGBA(0.668, 0.6133, 0.9453, 1.0)
-NUMBER_SAMPLES_TIMELINE = 4000
 
 DATA_KEY_CONFIDENCE = "confidence"
 DATA_KEY_DIAMETER = "diameter_3d"
@@ -176,63 +177,53 @@ class Pupil_Producer_Base(Observable, System_Plugin_Base):
         fallback_detector_tag: T.Optional[str] = None,
     ):
         world_start_stop_ts = [self.g_pool.timestamps[0], self.g_pool.timestamps[-1]]
-        if not self.g_pool.pupil_positions:
-            self.cache[key] = {
-                "left": [],
-                "right": [],
-                "xlim": world_start_stop_ts,
-                "ylim": [0, 1],
-            }
+        previous_cache = self.cache.get(key)
+        if previous_cache is None or previous_cache["xlim"] != world_start_stop_ts:
+            # pyramids are kept for incremental updates as long as the range matches
+            pyramids_right_left = [
+                Min_Max_Pyramid(*world_start_stop_ts) for _ in range(2)
+            ]
         else:
-            ts_data_pairs_right_left = [], []
-            for eye_id in (0, 1):
+            pyramids_right_left = [previous_cache["right"], previous_cache["left"]]
+
+        values_right_left = []
+        for eye_id in (0, 1):
+            timestamps, values = np.empty(0), np.empty(0)
+            if self.g_pool.pupil_positions:
                 pupil_positions = self.g_pool.pupil_positions[eye_id, detector_tag]
                 if not pupil_positions and fallback_detector_tag is not None:
                     pupil_positions = self.g_pool.pupil_positions[
                         eye_id, fallback_detector_tag
                     ]
                 if pupil_positions:
-                    t0, t1 = (
-                        pupil_positions.timestamps[0],
-                        pupil_positions.timestamps[-1],
-                    )
-                    timestamps_target = np.linspace(
-                        t0, t1, NUMBER_SAMPLES_TIMELINE, dtype=np.float32
-                    )
-
-                    data_indeces = pm.find_closest(
-                        pupil_positions.timestamps, timestamps_target
-                    )
-                    data_indeces = np.unique(data_indeces)
-                    for idx in data_indeces:
-                        ts_data_pair = (
-                            pupil_positions.timestamps[idx],
-                            pupil_positions[idx][key],
-                        )
-                        ts_data_pairs_right_left[eye_id].append(ts_data_pair)
-
-            if ylim is None:
-                # max_val must not be 0, else gl will crash
-                all_pupil_data_chained = chain.from_iterable(ts_data_pairs_right_left)
-                try:
-                    # Outlier removal based on:
-                    # https://en.wikipedia.org/wiki/Outlier#Tukey's_fences
-                    min_val, max_val = np.quantile(
-                        [pd[1] for pd in all_pupil_data_chained], [0.25, 0.75]
-                    )
-                    iqr = max_val - min_val
-                    min_val -= 1.5 * iqr
-                    max_val += 1.5 * iqr
-                    ylim = min_val, max_val
-                except IndexError:  # no pupil data available
-                    ylim = 0.0, 1.0
-
-            self.cache[key] = {
-                "right": ts_data_pairs_right_left[0],
-                "left": ts_data_pairs_right_left[1],
-                "xlim": world_start_stop_ts,
-                "ylim": ylim,
-            }
+                    timestamps = pupil_positions.timestamps
+                    values = pupil_positions.column(key)
+            pyramids_right_left[eye_id].update(timestamps, values)
+            values_right_left.append(values)
+
+        if not self.g_pool.pupil_positions:
+            ylim = [0, 1]
+        elif ylim is None:
+            # max_val must not be 0, else gl will crash
+            all_values = np.concatenate(values_right_left)
+            all_values = all_values[np.isfinite(all_values)]
+            if len(all_values):
+                # Outlier removal based on:
+                # https://en.wikipedia.org/wiki/Outlier#Tukey's_fences
+                min_val, max_val = np.quantile(all_values, [0.25, 0.75])
+                iqr = max_val - min_val
+                min_val -= 1.5 * iqr
+                max_val += 1.5 * iqr
+                ylim = min_val, max_val
+            else:  # no pupil data available
+                ylim = 0.0, 1.0
+
+        self.cache[key] = {
+            "right": pyramids_right_left[0],
+            "left": pyramids_right_left[1],
+            "xlim": world_start_stop_ts,
+            "ylim": ylim,
+        }
 
     def draw_pupil_diameter(self, width, height, scale):
         self.draw_pupil_data(DATA_KEY_DIAMETER, width, height, scale)
@@ -243,12 +234,11 @@ class Pupil_Producer_Base(Observable, System_Plugin_Base):
     def draw_pupil_data(self, key, width, height, scale):
         right = self.cache[key]["right"]
         left = self.cache[key]["left"]
+        xlim = self.cache[key]["xlim"]
 
-        with gl_utils.Coord_System(*self.cache[key]["xlim"], *self.cache[key]["ylim"]):
-            cygl_utils.draw_points(
-                right, size=2.0 * scale, color=COLOR_LEGEND_EYE_RIGHT
-            )
-            cygl_utils.draw_points(left, size=2.0 * scale, color=COLOR_LEGEND_EYE_LEFT)
+        with gl_utils.Coord_System(*xlim, *self.cache[key]["ylim"]):
+            draw_envelope(right, *xlim, width, COLOR_LEGEND_EYE_RIGHT, scale)
+            draw_envelope(left, *xlim, width, COLOR_LEGEND_EYE_LEFT, scale)
 
     def draw_dia_legend(self, width, height, scale):
         self.draw_legend(self.dia_timeline.label, width, height, scale)
@@ -376,8 +366,13 @@ class Pupil_From_Recording(Pupil_Producer_Base):
     def __init__(self, g_pool):
         super().__init__(g_pool)
 
-        pupil_data = pm.PupilDataBisector.load_from_file(g_pool.rec_dir, "pupil")
-        g_pool.pupil_positions = pupil_data
+        self._pupil_data = pm.PupilDataBisector.load_from_file(
+            g_pool.rec_dir,
+            "pupil",
+            memory_mapped=True,
+            columns_cache_dir=os.path.join(g_pool.rec_dir, "offline_data"),
+        )
+        g_pool.pupil_positions = self._pupil_data
         self._pupil_changed_announcer.announce_existing()
         logger.debug("pupil positions changed")
 
@@ -385,9 +380,19 @@ class Pupil_From_Recording(Pupil_Producer_Base):
         super().init_ui()
         self.menu.append(ui.Info_Text("Using pupil data recorded by Pupil Capture."))
 
+    def cleanup(self):
+        super().cleanup()
+        self._pupil_data.close()
+
 
 class Offline_Pupil_Detection(Pupil_Producer_Base):
-    """docstring for Offline_Pupil_Detection"""
+    """Detects pupil positions in the eye videos of a recording.
+
+    By default, detection runs in background processes with the detector settings
+    of the eye windows, see `offline_pupil_detection.Eye_Video_Detection`. With
+    `detect_in_eye_windows`, eye processes play back the eye videos instead, such
+    that detector settings can be adjusted while detecting.
+    """
 
     session_data_version = 4
     session_data_name = "offline_pupil"
@@ -413,9 +418,10 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
     def pupil_data_source_selection_order(cls) -> float:
         return 2.0
 
-    def __init__(self, g_pool):
+    def __init__(self, g_pool, detect_in_eye_windows=False):
         super().__init__(g_pool)
         self._detection_paused = False
+        self.detect_in_eye_windows = detect_in_eye_windows
 
         zmq_ctx = zmq.Context()
         self.data_sub = zmq_tools.Msg_Receiver(
@@ -448,13 +454,17 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
         self.eye_video_loc = [None, None]
         self.eye_frame_num = [0, 0]
         self.eye_frame_idx = [-1, -1]
+        self.eye_video_detections = [None, None]
 
         # start processes
         for eye_id in range(2):
             if self.detection_status[eye_id] != "complete":
-                self.start_eye_process(eye_id)
+                self.start_detection(eye_id)
 
-    def start_eye_process(self, eye_id):
+    def get_init_dict(self):
+        return {"detect_in_eye_windows": self.detect_in_eye_windows}
+
+    def start_detection(self, eye_id):
         potential_locs = [
             os.path.join(self.g_pool.rec_dir, f"eye{eye_id}{ext}")
             for ext in (".mjpeg", ".mp4", ".mkv")
@@ -477,6 +487,29 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
         self.eye_frame_num[eye_id] = n_valid_frames
         self.eye_frame_idx = [-1, -1]
 
+        if self.detect_in_eye_windows:
+            self.start_eye_process(eye_id, video_loc)
+        else:
+            self.start_eye_video_detection(eye_id, video_loc)
+        self.eye_video_loc[eye_id] = video_loc
+        self.detection_status[eye_id] = "Detecting..."
+
+    def start_eye_video_detection(self, eye_id, video_loc):
+        settings = offline_pupil_detection.load_detection_settings(
+            self.g_pool.user_dir, eye_id, self.g_pool.version
+        )
+        # share the cores between both eyes and the Player process
+        num_workers = max(1, (mp.cpu_count() - 1) // 2)
+        self.eye_video_detections[eye_id] = offline_pupil_detection.Eye_Video_Detection(
+            video_loc,
+            eye_id,
+            self.eye_frame_num[eye_id],
+            settings,
+            num_workers=num_workers,
+            detect_3d=offline_pupil_detection.is_3d_detection_available(),
+        )
+
+    def start_eye_process(self, eye_id, video_loc):
         capure_settings = "File_Source", {"source_path": video_loc, "timing": None}
         self.notify_all(
             {
@@ -485,8 +518,6 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
                 "overwrite_cap_settings": capure_settings,
             }
         )
-        self.eye_video_loc[eye_id] = video_loc
-        self.detection_status[eye_id] = "Detecting..."
 
     @property
     def detection_progress(self) -> float:
@@ -497,7 +528,10 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
 
         for eye_id in (0, 1):
             total_frames = self.eye_frame_num[eye_id]
-            if total_frames > 0:
+            eye_video_detection = self.eye_video_detections[eye_id]
+            if eye_video_detection is not None:
+                progress = eye_video_detection.progress
+            elif total_frames > 0:
                 current_index = self.eye_frame_idx[eye_id]
                 progress = (current_index + 1) / total_frames
                 progress = max(0.0, min(progress, 1.0))
@@ -507,16 +541,31 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
 
         return min(progress_by_eye)
 
+    def stop_detection(self, eye_id):
+        eye_video_detection = self.eye_video_detections[eye_id]
+        if eye_video_detection is not None:
+            eye_video_detection.cancel()
+            self.eye_video_detections[eye_id] = None
+            self.eye_video_loc[eye_id] = None
+        elif self.eye_video_loc[eye_id] is not None:
+            self.stop_eye_process(eye_id)
+
     def stop_eye_process(self, eye_id):
         self.notify_all({"subject": "eye_process.should_stop", "eye_id": eye_id})
         self.eye_video_loc[eye_id] = None
 
     def recent_events(self, events):
         super().recent_events(events)
+        if not self.detection_paused:
+            self.fetch_eye_video_detections()
         while self.data_sub.new_data:
             topic = self.data_sub.recv_topic()
             remaining_frames = self.data_sub.recv_remaining_frames()
-            if topic.startswith("pupil."):
+            if not self.detect_in_eye_windows:
+                # drain messages of eye processes that are still shutting down
+                for _ in remaining_frames:
+                    pass
+            elif topic.startswith("pupil."):
                 # pupil data only has one remaining frame
                 payload_serialized = next(remaining_frames)
                 pupil_datum = fm.Serialized_Dict(msgpack_bytes=payload_serialized)
@@ -543,6 +592,23 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
 
         self.menu_icon.indicator_stop = self.detection_progress
 
+    def fetch_eye_video_detections(self):
+        for eye_id, eye_video_detection in enumerate(self.eye_video_detections):
+            if eye_video_detection is None:
+                continue
+            for topic, timestamp, payload in eye_video_detection.fetch():
+                pupil_datum = fm.Serialized_Dict(msgpack_bytes=payload)
+                self._pupil_data_store.append(topic, pupil_datum, timestamp)
+            if eye_video_detection.completed:
+                logger.debug(f"eye {eye_id} detection complete")
+                self.eye_video_detections[eye_id] = None
+                self.eye_video_loc[eye_id] = None
+                self.eye_frame_idx[eye_id] = self.eye_frame_num[eye_id]
+                self.detection_status[eye_id] = "complete"
+                if self.eye_video_loc == [None, None]:
+                    data = self._pupil_data_store.as_pupil_data_bisector()
+                    self.publish_new(pupil_data_bisector=data)
+
     def publish_existing(self, pupil_data_bisector):
         self.g_pool.pupil_positions = pupil_data_bisector
         self._pupil_changed_announcer.announce_existing()
@@ -558,11 +624,16 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
         if notification["subject"] == "eye_process.started":
             pass
         elif notification["subject"] == "eye_process.stopped":
-            self.eye_video_loc[notification["eye_id"]] = None
+            eye_id = notification["eye_id"]
+            if self.eye_video_detections[eye_id] is None:
+                self.eye_video_loc[eye_id] = None
 
     def cleanup(self):
-        self.stop_eye_process(0)
-        self.stop_eye_process(1)
+        for eye_id in range(2):
+            if self.eye_video_detections[eye_id] is not None:
+                self.stop_detection(eye_id)
+            else:
+                self.stop_eye_process(eye_id)
         # close sockets before context is terminated
         self.data_sub = None
         self.save_offline_data()
@@ -583,8 +654,13 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
         self.detection_finished_flag = False
         self.detection_paused = False
         for eye_id in range(2):
-            if self.eye_video_loc[eye_id] is None:
-                self.start_eye_process(eye_id)
+            eye_process_running = (
+                self.eye_video_loc[eye_id] is not None
+                and self.eye_video_detections[eye_id] is None
+            )
+            if not eye_process_running or not self.detect_in_eye_windows:
+                self.stop_detection(eye_id)
+                self.start_detection(eye_id)
             else:
                 self.notify_all(
                     {
@@ -597,6 +673,26 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
     def init_ui(self):
         super().init_ui()
         self.menu.append(ui.Info_Text("Detect pupil positions from eye videos."))
+        self.menu.append(
+            ui.Info_Text(
+                "Detection runs in the background with the detector settings of the "
+                "eye windows. Show the eye windows to adjust the settings while "
+                "detecting."
+            )
+        )
+
+        def set_detect_in_eye_windows(detect_in_eye_windows):
+            self.detect_in_eye_windows = detect_in_eye_windows
+            self.redetect()
+
+        self.menu.append(
+            ui.Switch(
+                "detect_in_eye_windows",
+                self,
+                label="Show eye windows",
+                setter=set_detect_in_eye_windows,
+            )
+        )
         self.menu.append(ui.Switch("detection_paused", self, label="Pause detection"))
         self.menu.append(ui.Button("Redetect", self.redetect))
         self.menu.append(
@@ -633,6 +729,9 @@ class Offline_Pupil_Detection(Pupil_Producer_Base):
     def detection_paused(self, should_pause):
         self._detection_paused = should_pause
         for eye_id in range(2):
+            if self.eye_video_detections[eye_id] is not None:
+                # paused by not fetching results, see `recent_events()`
+                continue
             if self.eye_video_loc[eye_id] is not None:
                 subject = "file_source." + (
                     "should_pause" if should_pause else "should_play"
@@ -15,6 +15,9 @@ import os
 import typing
 
 import csv_utils
+import file_methods as fm
+import msgpack
+import numpy as np
 import player_methods as pm
 from plugin import Plugin
 from pupil_producers import Pupil_Producer_Base
@@ -115,6 +118,7 @@ class Raw_Data_Exporter(Plugin):
         should_export_field_info=True,
         should_export_gaze_positions=True,
         should_include_low_confidence_data=True,
+        should_export_npz=False,
     ):
         super().__init__(g_pool)
 
@@ -126,6 +130,7 @@ class Raw_Data_Exporter(Plugin):
         self.should_export_field_info = should_export_field_info
         self.should_export_gaze_positions = should_export_gaze_positions
         self.should_include_low_confidence_data = should_include_low_confidence_data
+        self.should_export_npz = should_export_npz
 
     def get_init_dict(self):
         return {
@@ -133,6 +138,7 @@ class Raw_Data_Exporter(Plugin):
             "should_export_field_info": self.should_export_field_info,
             "should_export_gaze_positions": self.should_export_gaze_positions,
             "should_include_low_confidence_data": self.should_include_low_confidence_data,
+            "should_export_npz": self.should_export_npz,
         }
 
     @property
@@ -184,6 +190,15 @@ class Raw_Data_Exporter(Plugin):
                 label="Include low confidence data",
             )
         )
+        self.menu.append(
+            ui.Info_Text(
+                "Optionally, pupil and gaze positions are additionally exported as "
+                "compressed numpy .npz files with one array per .csv column."
+            )
+        )
+        self.menu.append(
+            ui.Switch("should_export_npz", self, label="Export .npz columns")
+        )
         self.menu.append(
             ui.Info_Text("Press the export button or type 'e' to start the export.")
         )
@@ -208,6 +223,7 @@ class Raw_Data_Exporter(Plugin):
                     if self.should_include_low_confidence_data
                     else self.g_pool.min_data_confidence
                 ),
+                should_export_npz=self.should_export_npz,
             )
 
         if self.should_export_gaze_positions:
@@ -222,6 +238,7 @@ class Raw_Data_Exporter(Plugin):
                     if self.should_include_low_confidence_data
                     else self.g_pool.min_data_confidence
                 ),
+                should_export_npz=self.should_export_npz,
             )
 
         if self.should_export_field_info:
@@ -231,7 +248,53 @@ class Raw_Data_Exporter(Plugin):
                 info_file.write(self.__doc__)
 
 
+def _unpacked(datum):
+    """Plain mapping of a datum, which is cheaper to access than `Serialized_Dict`"""
+    if isinstance(datum, fm.Serialized_Dict):
+        return msgpack.unpackb(
+            datum.serialized,
+            use_list=False,
+            ext_hook=fm.Serialized_Dict.unpacking_ext_hook,
+            strict_map_key=False,
+        )
+    return datum
+
+
+def _typed_column(values) -> np.ndarray:
+    """Numeric array, with NaN for missing values, if possible, else string array"""
+    if None not in values:
+        column = np.array(values)
+        if column.dtype.kind in "biuf":
+            return column
+    try:
+        return np.array(
+            [np.nan if value is None else value for value in values],
+            dtype=np.float64,
+        )
+    except (TypeError, ValueError):
+        return np.array(["" if value is None else value for value in values], dtype=str)
+
+
+def _concatenate_typed_columns(blocks: typing.List[np.ndarray]) -> np.ndarray:
+    """Concatenates per-block `_typed_column`s like a `_typed_column` of all values"""
+    if not blocks:
+        return _typed_column(())
+    if any(block.dtype.kind == "U" for block in blocks):
+        blocks = [
+            block
+            if block.dtype.kind == "U"
+            else np.array(
+                ["" if value != value else str(value) for value in block.tolist()],
+                dtype=str,
+            )
+            for block in blocks
+        ]
+    return np.concatenate(blocks)
+
+
 class _Base_Positions_Exporter(abc.ABC):
+    CSV_BLOCK_SIZE = 10_000
+
     @classmethod
     @abc.abstractmethod
     def csv_export_filename(cls) -> str:
@@ -249,6 +312,28 @@ class _Base_Positions_Exporter(abc.ABC):
     ) -> dict:
         pass
 
+    @classmethod
+    def row_export(
+        cls, raw_value: csv_utils.CSV_EXPORT_RAW_TYPE, world_index: int
+    ) -> tuple:
+        """Values of `dict_export` in the order of `csv_export_labels`.
+
+        Subclasses should override this instead of `dict_export` for fast exports.
+        """
+        dict_row = cls.dict_export(raw_value=raw_value, world_index=world_index)
+        return tuple(dict_row[label] for label in cls.csv_export_labels())
+
+    @classmethod
+    def csv_export_column_fields(
+        cls,
+    ) -> typing.Dict[str, typing.Tuple[str, typing.Optional[int]]]:
+        """Labels whose values are taken from the cached columns of the bisector.
+
+        Maps labels to a `pldata_columns` field and, for vector fields, the index of
+        the component. Values of these labels returned by `row_export` are ignored.
+        """
+        return {}
+
     def csv_export_write(
         self,
         positions_bisector,
@@ -256,30 +341,86 @@ class _Base_Positions_Exporter(abc.ABC):
         export_window,
         export_dir,
         min_confidence_threshold=0.0,
+        should_export_npz=False,
     ):
+        """Exports data within `export_window` as .csv and optionally .npz file.
+
+        The confidence filter and the fields of `csv_export_column_fields` use the
+        cached columns of the bisector, such that filtered data is never unpacked.
+        The remaining fields are extracted per datum. Data is written in blocks of
+        `CSV_BLOCK_SIZE` columns, which are also collected as typed arrays for the
+        .npz file. It contains one array per .csv column, with NaN for empty
+        numeric values.
+        """
         export_file = type(self).csv_export_filename()
         export_path = os.path.join(export_dir, export_file)
+        labels = type(self).csv_export_labels()
+        column_fields = [
+            (labels.index(label), field)
+            for label, field in type(self).csv_export_column_fields().items()
+        ]
+
+        start_idc, stop_idc = positions_bisector.index_ranges_for_windows(
+            [export_window]
+        )
+        start_idx, stop_idx = int(start_idc[0]), int(stop_idc[0])
+        confidence = positions_bisector.column("confidence")[start_idx:stop_idx]
+        export_idc = start_idx + np.flatnonzero(
+            ~(confidence < min_confidence_threshold)
+        )
+        export_world_idc = pm.find_closest(
+            timestamps, positions_bisector.data_ts[export_idc]
+        )
 
-        export_section = positions_bisector.init_dict_for_window(export_window)
-        export_world_idc = pm.find_closest(timestamps, export_section["data_ts"])
-
+        npz_blocks = [[] for _ in labels]
+        row_export = type(self).row_export
+        block_starts = range(0, len(export_idc), self.CSV_BLOCK_SIZE)
         with open(export_path, "w", encoding="utf-8", newline="") as csvfile:
-            csv_header = type(self).csv_export_labels()
-            dict_writer = csv.DictWriter(csvfile, fieldnames=csv_header)
-            dict_writer.writeheader()
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(labels)
 
-            for g, idx in track(
-                zip(export_section["data"], export_world_idc),
+            for block_start in track(
+                block_starts,
                 description=f"Exporting {export_file}",
-                total=len(export_world_idc),
+                total=len(block_starts),
             ):
-                if g["confidence"] < min_confidence_threshold:
-                    continue
-                dict_row = type(self).dict_export(raw_value=g, world_index=idx)
-                dict_writer.writerow(dict_row)
+                block_stop = block_start + self.CSV_BLOCK_SIZE
+                block_idc = export_idc[block_start:block_stop]
+                block_data = map(_unpacked, positions_bisector[block_idc])
+                block_world_idc = export_world_idc[block_start:block_stop].tolist()
+                block_columns = list(
+                    zip(
+                        *(
+                            row_export(raw_value=raw_value, world_index=world_index)
+                            for raw_value, world_index in zip(
+                                block_data, block_world_idc
+                            )
+                        )
+                    )
+                )
+                for label_idx, (key, component) in column_fields:
+                    column = positions_bisector.column(key)[block_idc]
+                    if component is not None:
+                        column = column[:, component]
+                    block_columns[label_idx] = column.tolist()
+                csv_writer.writerows(zip(*block_columns))
+                if should_export_npz:
+                    for blocks, column in zip(npz_blocks, block_columns):
+                        blocks.append(_typed_column(column))
 
         logger.info(f"Created '{export_file}' file.")
 
+        if should_export_npz:
+            npz_file = os.path.splitext(export_file)[0] + ".npz"
+            np.savez_compressed(
+                os.path.join(export_dir, npz_file),
+                **{
+                    label: _concatenate_typed_columns(blocks)
+                    for label, blocks in zip(labels, npz_blocks)
+                },
+            )
+            logger.info(f"Created '{npz_file}' file.")
+
 
 class Pupil_Positions_Exporter(_Base_Positions_Exporter):
     @classmethod
@@ -328,10 +469,29 @@ class Pupil_Positions_Exporter(_Base_Positions_Exporter):
             "projected_sphere_angle",
         )
 
+    @classmethod
+    def csv_export_column_fields(
+        cls,
+    ) -> typing.Dict[str, typing.Tuple[str, typing.Optional[int]]]:
+        return {
+            "pupil_timestamp": ("timestamp", None),
+            "confidence": ("confidence", None),
+            "norm_pos_x": ("norm_pos", 0),
+            "norm_pos_y": ("norm_pos", 1),
+            "diameter": ("diameter", None),
+        }
+
     @classmethod
     def dict_export(
         cls, raw_value: csv_utils.CSV_EXPORT_RAW_TYPE, world_index: int
     ) -> dict:
+        row = cls.row_export(raw_value=raw_value, world_index=world_index)
+        return dict(zip(cls.csv_export_labels(), row))
+
+    @classmethod
+    def row_export(
+        cls, raw_value: csv_utils.CSV_EXPORT_RAW_TYPE, world_index: int
+    ) -> tuple:
         # 2d data
         pupil_timestamp = str(raw_value["timestamp"])
         eye_id = raw_value["id"]
@@ -382,45 +542,45 @@ class Pupil_Positions_Exporter(_Base_Positions_Exporter):
         # pye3d no longer includes this field. Keeping for backwards-compatibility.
         model_id = raw_value.get("model_id", None)
 
-        return {
+        return (
             # 2d data
-            "pupil_timestamp": pupil_timestamp,
-            "world_index": world_index,
-            "eye_id": eye_id,
-            "confidence": confidence,
-            "norm_pos_x": norm_pos_x,
-            "norm_pos_y": norm_pos_y,
-            "diameter": diameter,
-            "method": method,
+            pupil_timestamp,
+            world_index,
+            eye_id,
+            confidence,
+            norm_pos_x,
+            norm_pos_y,
+            diameter,
+            method,
             # ellipse data
-            "ellipse_center_x": ellipse_center[0],
-            "ellipse_center_y": ellipse_center[1],
-            "ellipse_axis_a": ellipse_axis[0],
-            "ellipse_axis_b": ellipse_axis[1],
-            "ellipse_angle": ellipse_angle,
+            ellipse_center[0],
+            ellipse_center[1],
+            ellipse_axis[0],
+            ellipse_axis[1],
+            ellipse_angle,
             # 3d data
-            "diameter_3d": diameter_3d,
-            "model_confidence": model_confidence,
-            "model_id": model_id,
-            "sphere_center_x": sphere_center[0],
-            "sphere_center_y": sphere_center[1],
-            "sphere_center_z": sphere_center[2],
-            "sphere_radius": sphere_radius,
-            "circle_3d_center_x": circle_3d_center[0],
-            "circle_3d_center_y": circle_3d_center[1],
-            "circle_3d_center_z": circle_3d_center[2],
-            "circle_3d_normal_x": circle_3d_normal[0],
-            "circle_3d_normal_y": circle_3d_normal[1],
-            "circle_3d_normal_z": circle_3d_normal[2],
-            "circle_3d_radius": circle_3d_radius,
-            "theta": theta,
-            "phi": phi,
-            "projected_sphere_center_x": projected_sphere_center[0],
-            "projected_sphere_center_y": projected_sphere_center[1],
-            "projected_sphere_axis_a": projected_sphere_axis[0],
-            "projected_sphere_axis_b": projected_sphere_axis[1],
-            "projected_sphere_angle": projected_sphere_angle,
-        }
+            diameter_3d,
+            model_confidence,
+            model_id,
+            sphere_center[0],
+            sphere_center[1],
+            sphere_center[2],
+            sphere_radius,
+            circle_3d_center[0],
+            circle_3d_center[1],
+            circle_3d_center[2],
+            circle_3d_normal[0],
+            circle_3d_normal[1],
+            circle_3d_normal[2],
+            circle_3d_radius,
+            theta,
+            phi,
+            projected_sphere_center[0],
+            projected_sphere_center[1],
+            projected_sphere_axis[0],
+            projected_sphere_axis[1],
+            projected_sphere_angle,
+        )
 
 
 class Gaze_Positions_Exporter(_Base_Positions_Exporter):
@@ -454,10 +614,28 @@ class Gaze_Positions_Exporter(_Base_Positions_Exporter):
             "gaze_normal1_z",
         )
 
+    @classmethod
+    def csv_export_column_fields(
+        cls,
+    ) -> typing.Dict[str, typing.Tuple[str, typing.Optional[int]]]:
+        return {
+            "gaze_timestamp": ("timestamp", None),
+            "confidence": ("confidence", None),
+            "norm_pos_x": ("norm_pos", 0),
+            "norm_pos_y": ("norm_pos", 1),
+        }
+
     @classmethod
     def dict_export(
         cls, raw_value: csv_utils.CSV_EXPORT_RAW_TYPE, world_index: int
     ) -> dict:
+        row = cls.row_export(raw_value=raw_value, world_index=world_index)
+        return dict(zip(cls.csv_export_labels(), row))
+
+    @classmethod
+    def row_export(
+        cls, raw_value: csv_utils.CSV_EXPORT_RAW_TYPE, world_index: int
+    ) -> tuple:
         gaze_timestamp = str(raw_value["timestamp"])
         confidence = raw_value["confidence"]
         norm_pos = raw_value["norm_pos"]
@@ -519,26 +697,26 @@ class Gaze_Positions_Exporter(_Base_Positions_Exporter):
                         eye_centers1_3d = raw_value["eye_center_3d"]
                         gaze_normals1_3d = raw_value["gaze_normal_3d"]
 
-        return {
-            "gaze_timestamp": gaze_timestamp,
-            "world_index": world_index,
-            "confidence": confidence,
-            "norm_pos_x": norm_pos[0],
-            "norm_pos_y": norm_pos[1],
-            "base_data": base_data,
-            "gaze_point_3d_x": gaze_points_3d[0],
-            "gaze_point_3d_y": gaze_points_3d[1],
-            "gaze_point_3d_z": gaze_points_3d[2],
-            "eye_center0_3d_x": eye_centers0_3d[0],
-            "eye_center0_3d_y": eye_centers0_3d[1],
-            "eye_center0_3d_z": eye_centers0_3d[2],
-            "gaze_normal0_x": gaze_normals0_3d[0],
-            "gaze_normal0_y": gaze_normals0_3d[1],
-            "gaze_normal0_z": gaze_normals0_3d[2],
-            "eye_center1_3d_x": eye_centers1_3d[0],
-            "eye_center1_3d_y": eye_centers1_3d[1],
-            "eye_center1_3d_z": eye_centers1_3d[2],
-            "gaze_normal1_x": gaze_normals1_3d[0],
-            "gaze_normal1_y": gaze_normals1_3d[1],
-            "gaze_normal1_z": gaze_normals1_3d[2],
-        }
+        return (
+            gaze_timestamp,
+            world_index,
+            confidence,
+            norm_pos[0],
+            norm_pos[1],
+            base_data,
+            gaze_points_3d[0],
+            gaze_points_3d[1],
+            gaze_points_3d[2],
+            eye_centers0_3d[0],
+            eye_centers0_3d[1],
+            eye_centers0_3d[2],
+            gaze_normals0_3d[0],
+            gaze_normals0_3d[1],
+            gaze_normals0_3d[2],
+            eye_centers1_3d[0],
+            eye_centers1_3d[1],
+            eye_centers1_3d[2],
+            gaze_normals1_3d[0],
+            gaze_normals1_3d[1],
+            gaze_normals1_3d[2],
+        )
@@ -18,7 +18,12 @@ from time import gmtime, localtime, strftime, time
 
 import csv_utils
 import psutil
-from av_writer import JPEG_Writer, MPEG_Writer, NonMonotonicTimestampError
+from av_writer import (
+    Async_Video_Writer,
+    JPEG_Writer,
+    MPEG_Writer,
+    NonMonotonicTimestampError,
+)
 from file_methods import PLData_Writer, load_object
 from gaze_mapping.notifications import (
     CalibrationResultNotification,
@@ -366,16 +371,18 @@ class Recorder(System_Plugin_Base):
         if self.record_world:
             video_path = os.path.join(self.rec_path, "world.mp4")
             if self.raw_jpeg and self.g_pool.capture.jpeg_support:
-                self.writer = JPEG_Writer(video_path, start_time_synced)
+                writer = JPEG_Writer(video_path, start_time_synced)
             elif hasattr(self.g_pool.capture._recent_frame, "h264_buffer"):
-                self.writer = H264Writer(
+                writer = H264Writer(
                     video_path,
                     self.g_pool.capture.frame_size[0],
                     self.g_pool.capture.frame_size[1],
                     int(self.g_pool.capture.frame_rate),
                 )
             else:
-                self.writer = MPEG_Writer(video_path, start_time_synced)
+                writer = MPEG_Writer(video_path, start_time_synced)
+            # encode in the background, waiting for the encoder if it falls behind
+            self.writer = Async_Video_Writer(writer, max_queued_frames=30)
 
         calibration_data_notification_classes = [
             CalibrationSetupNotification,
@@ -8,6 +8,7 @@ Lesser General Public License (LGPL v3.0).
 See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
+import multiprocessing as mp
 from collections import namedtuple
 
 import numpy as np
@@ -17,8 +18,10 @@ from scan_path.algorithm import ScanPathAlgorithm
 from scan_path.utils import (
     SCAN_PATH_GAZE_DATUM_DTYPE,
     FakeGPool,
+    ScanPathGazeAccumulator,
     generate_frames,
     scan_path_numpy_array_from,
+    scan_path_segments,
     scan_path_zeros_numpy_array,
 )
 
@@ -26,21 +29,26 @@ from .base import _BaseTask
 
 
 class ScanPathBackgroundTask(Observable, _BaseTask):
+    # Segments are not worth their warm-up and process startup below this size
+    MIN_FRAMES_PER_SEGMENT = 1000
+
     def __init__(self, g_pool):
         self.g_pool = g_pool
-        self._bg_task = None
-        self._progress = 0.0
-        self._gaze_data = None
+        self._bg_tasks = []
+        self._segment_progress = []
+        self._segment_data = []
 
     # _BaseTask
 
     @property
     def progress(self) -> float:
-        return self._progress
+        if not self._segment_progress:
+            return 0.0
+        return sum(self._segment_progress) / len(self._segment_progress)
 
     @property
     def is_active(self) -> bool:
-        return self._bg_task is not None
+        return bool(self._bg_tasks)
 
     def start(self, timeframe, preprocessed_data):
         if self.is_active:
@@ -48,49 +56,97 @@ class ScanPathBackgroundTask(Observable, _BaseTask):
 
         g_pool = FakeGPool(self.g_pool)
 
-        self._gaze_data = scan_path_zeros_numpy_array()
-
-        self._bg_task = IPC_Logging_Task_Proxy(
-            "Scan path",
-            generate_frames_with_corrected_gaze,
-            args=(g_pool, timeframe, preprocessed_data),
+        frame_count = len(self.g_pool.timestamps)
+        num_segments = min(
+            mp.cpu_count() - 1, frame_count // self.MIN_FRAMES_PER_SEGMENT
+        )
+        segments = scan_path_segments(
+            preprocessed_data, frame_count, timeframe, max(1, num_segments)
         )
 
+        frame_indices = preprocessed_data.frame_index
+        for segment_idx, (warm_up_start, start, stop) in enumerate(segments):
+            if segment_idx == len(segments) - 1:
+                # let the last segment run until the end of the video
+                stop = None
+            data_start = np.searchsorted(frame_indices, warm_up_start)
+            data_stop = (
+                len(frame_indices)
+                if stop is None
+                else np.searchsorted(frame_indices, stop)
+            )
+            task = IPC_Logging_Task_Proxy(
+                "Scan path",
+                generate_frames_with_corrected_gaze,
+                args=(g_pool, timeframe, preprocessed_data[data_start:data_stop]),
+                kwargs={
+                    "warm_up_start": warm_up_start,
+                    "start": start,
+                    "stop": stop,
+                },
+            )
+            self._bg_tasks.append(task)
+            self._segment_data.append(ScanPathGazeAccumulator())
+            self._segment_progress.append(0.0)
+
     def process(self):
-        if self._bg_task:
+        if not self._bg_tasks:
+            return
+
+        for segment_idx, task in enumerate(self._bg_tasks):
             try:
-                task_data = self._bg_task.fetch()
+                for progress, gaze_data in task.fetch():
+                    gaze_data = scan_path_numpy_array_from(gaze_data)
+                    self._segment_data[segment_idx].append(gaze_data)
+                    self._segment_progress[segment_idx] = progress
+                    self.on_updated(gaze_data)
             except Exception as err:
-                self._bg_task.cancel()
-                self._bg_task = None
+                self._cancel_tasks()
                 self.on_failed(err)
+                return
 
-            for progress, gaze_data in task_data:
-                gaze_data = scan_path_numpy_array_from(gaze_data)
-                self._gaze_data = np.append(self._gaze_data, gaze_data)
-                self._progress = progress
-                self.on_updated(gaze_data)
-
-            if self._bg_task.completed:
-                self._bg_task = None
-                self._gaze_data = scan_path_numpy_array_from(self._gaze_data)
-                self.on_completed(self._gaze_data)
+        if all(task.completed for task in self._bg_tasks):
+            # segments are consecutive in frame index
+            gaze_data = np.concatenate(
+                [segment_data.to_array() for segment_data in self._segment_data]
+            )
+            self._cancel_tasks()
+            self._segment_progress = [1.0]
+            self.on_completed(scan_path_numpy_array_from(gaze_data))
 
     def cancel(self):
-        if self._bg_task is not None:
-            self._bg_task.cancel()
-            self._bg_task = None
+        if self._bg_tasks:
+            self._cancel_tasks()
             self.on_canceled()
-        self._progress = 0.0
+        self._segment_progress = []
 
     def cleanup(self):
         self.cancel()
 
+    def _cancel_tasks(self):
+        for task in self._bg_tasks:
+            task.cancel()
+        self._bg_tasks = []
+        self._segment_data = []
+
 
-def generate_frames_with_corrected_gaze(g_pool, timeframe, preprocessed_data):
+def generate_frames_with_corrected_gaze(
+    g_pool, timeframe, preprocessed_data, warm_up_start=0, start=0, stop=None
+):
+    """
+    Yields the scan path gaze for the frames `[start, stop)`.
+
+    The frames `[warm_up_start, start)` are processed without yielding results to
+    restore the tracked gaze. `preprocessed_data` must be sorted by frame index.
+    """
     sp = ScanPathAlgorithm(timeframe)
+    frame_indices = preprocessed_data.frame_index
 
-    for progress, frame in generate_frames(g_pool):
-        gaze_data = preprocessed_data[preprocessed_data.frame_index == frame.index]
+    for progress, frame in generate_frames(g_pool, warm_up_start, stop):
+        data_start, data_stop = np.searchsorted(
+            frame_indices, [frame.index, frame.index + 1]
+        )
+        gaze_data = preprocessed_data[data_start:data_stop]
         gaze_data = sp.update_from_frame(frame, gaze_data)
-        yield progress, gaze_data
+        if frame.index >= start:
+            yield progress, gaze_data
@@ -15,6 +15,7 @@ import numpy as np
 from observable import Observable
 from scan_path.utils import (
     SCAN_PATH_GAZE_DATUM_DTYPE,
+    ScanPathGazeAccumulator,
     generate_frame_indices_with_deserialized_gaze,
     scan_path_numpy_array_from,
     scan_path_zeros_numpy_array,
@@ -82,7 +83,7 @@ class ScanPathPreprocessingTask(Observable, _BaseTask):
 
         if isinstance(self._state, StartedState):
             self._state = ActiveState(self.g_pool)
-            self._gaze_data = scan_path_zeros_numpy_array()
+            self._gaze_data = ScanPathGazeAccumulator()
 
         assert isinstance(self._state, ActiveState)
 
@@ -92,7 +93,7 @@ class ScanPathPreprocessingTask(Observable, _BaseTask):
         for progress, gaze_data in self._state.generator:
             generator_is_done = False
 
-            self._gaze_data = np.append(self._gaze_data, gaze_data)
+            self._gaze_data.append(gaze_data)
 
             self._progress = progress
             self.on_updated(gaze_data)
@@ -104,8 +105,7 @@ class ScanPathPreprocessingTask(Observable, _BaseTask):
         if generator_is_done:
             self._progress = 1.0
             self._state = CompletedState(self.g_pool)
-            self._gaze_data = scan_path_numpy_array_from(self._gaze_data)
-            self.on_completed(self._gaze_data)
+            self.on_completed(self._gaze_data.to_array())
             self._gaze_data = None
 
     def cancel(self):
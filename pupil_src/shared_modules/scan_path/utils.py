@@ -89,6 +89,85 @@ def scan_path_numpy_array_from(it):
     return new_array
 
 
+class ScanPathGazeAccumulator:
+    """Collects scan path gaze data in preallocated chunks.
+
+    Appending copies each datum once, in contrast to `np.append` which copies all
+    previously collected data on every call.
+    """
+
+    CHUNK_SIZE = 2**16
+
+    def __init__(self):
+        self._chunks = []
+        self._last_chunk_fill = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, gaze_data):
+        gaze_data = scan_path_numpy_array_from(gaze_data)
+        while len(gaze_data) > 0:
+            if not self._chunks or self._last_chunk_fill == len(self._chunks[-1]):
+                chunk_size = max(self.CHUNK_SIZE, len(gaze_data))
+                self._chunks.append(scan_path_zeros_numpy_array(chunk_size))
+                self._last_chunk_fill = 0
+            chunk = self._chunks[-1]
+            count = min(len(chunk) - self._last_chunk_fill, len(gaze_data))
+            chunk[self._last_chunk_fill : self._last_chunk_fill + count] = gaze_data[
+                :count
+            ]
+            self._last_chunk_fill += count
+            self._len += count
+            gaze_data = gaze_data[count:]
+
+    def to_array(self):
+        if not self._chunks:
+            return scan_path_zeros_numpy_array()
+        chunks = self._chunks[:-1] + [self._chunks[-1][: self._last_chunk_fill]]
+        return np.concatenate(chunks).view(np.recarray)
+
+
+def scan_path_segments(preprocessed_data, frame_count, timeframe, num_segments):
+    """
+    Splits the scan path calculation into segments that can be processed independently.
+
+    Returns a list of `(warm_up_start, start, stop)` frame indices. Running a fresh
+    `ScanPathAlgorithm` on the frames `[warm_up_start, stop)` yields the same gaze
+    data for the frames `[start, stop)` as running it on all frames in order.
+    Optical flow tracks each gaze point independently, and all gaze that is still
+    tracked when entering `start` was injected at or after `warm_up_start`. Before
+    that, it would have been trimmed by the last frame with gaze before `start`.
+
+    `preprocessed_data` must be sorted by frame index.
+    """
+    boundaries = np.unique(np.linspace(0, frame_count, num_segments + 1).astype(int))
+    gaze_frames, first_idc = np.unique(
+        preprocessed_data["frame_index"], return_index=True
+    )
+    timestamps = preprocessed_data["timestamp"]
+    # the algorithm trims tracked gaze relative to the first gaze of a frame
+    first_ts = timestamps[first_idc]
+    if len(timestamps) > 0:
+        max_ts = np.maximum.accumulate(np.maximum.reduceat(timestamps, first_idc))
+    else:
+        max_ts = timestamps
+
+    segments = []
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        last_gaze_idx = np.searchsorted(gaze_frames, start, side="left") - 1
+        if last_gaze_idx < 0:
+            # nothing is tracked when entering the segment
+            warm_up_start = start
+        else:
+            cutoff = first_ts[last_gaze_idx] - timeframe
+            first_surviving_idx = np.searchsorted(max_ts, cutoff, side="right")
+            warm_up_start = min(gaze_frames[first_surviving_idx], start)
+        segments.append((int(warm_up_start), int(start), int(stop)))
+    return segments
+
+
 class FakeGPool:
     def __init__(self, g_pool):
         self.rec_dir = g_pool.rec_dir
@@ -146,20 +225,26 @@ def generate_frames_with_gaze(g_pool):
         yield progress, current_frame, gaze_datums
 
 
-def generate_frames(g_pool):
+def generate_frames(g_pool, start_index=0, stop_index=None):
     recording = PupilRecording(g_pool.rec_dir)
     video_path = recording.files().world().videos()[0]
 
     fs = File_Source(g_pool, source_path=video_path, fill_gaps=True)
 
     total_frame_count = fs.get_frame_count()
+    if stop_index is None or stop_index > total_frame_count:
+        stop_index = total_frame_count
+    if start_index > 0:
+        fs.seek_to_frame(start_index)
 
     while True:
         try:
             current_frame = fs.get_frame()
         except EndofVideoError:
             break
+        if current_frame.index >= stop_index:
+            break
 
-        progress = current_frame.index / total_frame_count
+        progress = (current_frame.index - start_index) / (stop_index - start_index)
 
         yield progress, current_frame
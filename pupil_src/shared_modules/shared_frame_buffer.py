@@ -0,0 +1,181 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import collections
+import itertools
+import logging
+import mmap
+import os
+import tempfile
+import typing as T
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOT_COUNT = 8
+
+# Slots start at multiples of this many bytes
+_ALIGNMENT = 64
+# Generation of a slot that is being written
+_WRITING = -1
+
+_file_counter = itertools.count()
+
+
+def shared_memory_dir() -> str:
+    """Directory of the ring buffer files, memory-backed where available"""
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _aligned(size: int) -> int:
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+class _Mapped_Ring_Buffer:
+    """Memory-mapped file with a generation counter and a data slot per frame"""
+
+    def __init__(self, path: str, slot_count: int, slot_size: int, create: bool):
+        self.path = path
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self._header_size = _aligned(8 * slot_count)
+        file_size = self._header_size + slot_count * slot_size
+        mode = "w+b" if create else "r+b"
+        with open(path, mode) as file:
+            if create:
+                file.truncate(file_size)
+            self._mmap = mmap.mmap(file.fileno(), file_size)
+        self.generations = np.ndarray((slot_count,), dtype=np.int64, buffer=self._mmap)
+        if create:
+            self.generations[:] = _WRITING
+
+    def slot(self, slot: int) -> np.ndarray:
+        offset = self._header_size + slot * self.slot_size
+        return np.ndarray(
+            (self.slot_size,), dtype=np.uint8, buffer=self._mmap, offset=offset
+        )
+
+
+class Shared_Frame_Writer:
+    """Writes frames into a shared memory ring buffer of `slot_count` frames.
+
+    `write()` returns a small descriptor, which is sent to local subscribers instead
+    of the frame data, see `Shared_Frame_Reader`. The ring buffer grows if a frame
+    does not fit into its slots.
+    """
+
+    def __init__(self, name: str, slot_count: int = DEFAULT_SLOT_COUNT):
+        self.name = name
+        self.slot_count = slot_count
+        self._buffer = None
+        self._generation = 0
+
+    def write(self, data) -> T.Dict[str, T.Any]:
+        if not isinstance(data, np.ndarray):
+            data = np.frombuffer(data, dtype=np.uint8)
+        data = np.ascontiguousarray(data)
+        if self._buffer is None or data.nbytes > self._buffer.slot_size:
+            self._allocate(_aligned(data.nbytes))
+
+        slot = self._generation % self.slot_count
+        # readers detect partially written slots by the generation
+        self._buffer.generations[slot] = _WRITING
+        self._buffer.slot(slot)[: data.nbytes] = data.reshape(-1).view(np.uint8)
+        self._buffer.generations[slot] = self._generation
+        descriptor = {
+            "path": self._buffer.path,
+            "slot_count": self.slot_count,
+            "slot_size": self._buffer.slot_size,
+            "slot": slot,
+            "generation": self._generation,
+            "shape": list(data.shape),
+            "dtype": data.dtype.str,
+        }
+        self._generation += 1
+        return descriptor
+
+    def close(self):
+        if self._buffer is not None:
+            self._remove_buffer_file()
+            self._buffer = None
+
+    def _allocate(self, slot_size: int):
+        if self._buffer is not None:
+            # mapped by readers until they switch to the new buffer
+            self._remove_buffer_file()
+        file_name = f"pupil_frames_{self.name}_{os.getpid()}_{next(_file_counter)}"
+        path = os.path.join(shared_memory_dir(), file_name)
+        self._buffer = _Mapped_Ring_Buffer(
+            path, self.slot_count, slot_size, create=True
+        )
+        logger.debug(f"Allocated {self.slot_count} frames of {slot_size} B: {path}")
+
+    def _remove_buffer_file(self):
+        try:
+            os.remove(self._buffer.path)
+        except OSError as err:
+            logger.debug(f"Could not remove frame buffer file: {err}")
+
+
+class Shared_Frame_Reader:
+    """Reads frames from the ring buffers of `Shared_Frame_Writer`s.
+
+    Frames are returned as views into the ring buffer without copying. The writer
+    overwrites a slot after `slot_count` further frames, so readers that hold on to a
+    frame need to copy it and check `is_current()` afterwards.
+    """
+
+    # ring buffers that stay mapped, e.g. for multiple writers
+    MAX_MAPPED_BUFFERS = 8
+
+    def __init__(self):
+        self._buffers = collections.OrderedDict()
+
+    def read(self, descriptor) -> T.Optional[np.ndarray]:
+        """Frame view, or None if the frame was overwritten already"""
+        buffer = self._buffer(descriptor)
+        if buffer is None or not self._is_current(buffer, descriptor):
+            return None
+        shape = tuple(descriptor["shape"])
+        dtype = np.dtype(descriptor["dtype"])
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        data = buffer.slot(descriptor["slot"])[:nbytes]
+        return data.view(dtype).reshape(shape)
+
+    def is_current(self, descriptor) -> bool:
+        """True if the frame was not overwritten since `read()`"""
+        buffer = self._buffers.get(descriptor["path"])
+        return buffer is not None and self._is_current(buffer, descriptor)
+
+    def _is_current(self, buffer, descriptor):
+        return buffer.generations[descriptor["slot"]] == descriptor["generation"]
+
+    def _buffer(self, descriptor) -> T.Optional[_Mapped_Ring_Buffer]:
+        path = descriptor["path"]
+        try:
+            self._buffers.move_to_end(path)
+            return self._buffers[path]
+        except KeyError:
+            pass
+        try:
+            buffer = _Mapped_Ring_Buffer(
+                path, descriptor["slot_count"], descriptor["slot_size"], create=False
+            )
+        except (OSError, ValueError) as err:
+            logger.debug(f"Could not open frame buffer: {err}")
+            return None
+        self._buffers[path] = buffer
+        if len(self._buffers) > self.MAX_MAPPED_BUFFERS:
+            # unmapped once the last frame view is released
+            self._buffers.popitem(last=False)
+        return buffer
@@ -9,7 +9,6 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 import csv
-import itertools
 import logging
 import os
 import types
@@ -17,25 +16,72 @@ import types
 import background_helper
 import cv2
 import file_methods
+import numpy as np
 import player_methods
 
+from .cache import Index_Ranges
 from .surface_marker import Surface_Marker
 
 logger = logging.getLogger(__name__)
 
+# Fields of fixations on surfaces in addition to `Events_On_Surface` columns
+FIXATION_KEYS = ("id", "duration", "dispersion")
+
 
 def background_video_processor(
-    video_file_path, callable, visited_list, seek_idx, mp_context
+    video_file_path, callable, visited_list, seek_idx, mp_context, num_workers=1
 ):
-    return background_helper.IPC_Logging_Task_Proxy(
-        "Background Video Processor",
-        video_processing_generator,
-        (video_file_path, callable, seek_idx, visited_list),
-        context=mp_context,
+    """Processes all unvisited frames of a video in `num_workers` processes.
+
+    The video is split into consecutive segments with equal amounts of unvisited
+    frames. Each segment is decoded and processed by its own process.
+    """
+    segments = video_processing_segments(visited_list, num_workers)
+    return background_helper.Task_Proxy_Group(
+        background_helper.IPC_Logging_Task_Proxy(
+            "Background Video Processor",
+            video_processing_generator,
+            (video_file_path, callable, seek_idx, visited_list[start:stop], start),
+            context=mp_context,
+        )
+        for start, stop in segments
+    )
+
+
+# Segments are not split further, such that seeking and decoder setup do not
+# outweigh the parallel processing
+MIN_UNVISITED_FRAMES_PER_SEGMENT = 500
+
+
+def video_processing_segments(visited_list, num_segments):
+    """Splits frames into consecutive segments with similar amounts of work.
+
+    Returns list of `(start, stop)` frame index tuples.
+    """
+    num_frames = len(visited_list)
+    unvisited_count = np.cumsum([x is None for x in visited_list])
+    total_unvisited = int(unvisited_count[-1]) if num_frames else 0
+    num_segments = min(
+        num_segments, total_unvisited // MIN_UNVISITED_FRAMES_PER_SEGMENT
     )
+    if num_segments < 2:
+        return [(0, num_frames)]
+
+    targets = np.arange(1, num_segments) * total_unvisited / num_segments
+    bounds = np.searchsorted(unvisited_count, targets) + 1
+    bounds = np.unique([0, *bounds.tolist(), num_frames])
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
 
 
-def video_processing_generator(video_file_path, callable, seek_idx, visited_list):
+def video_processing_generator(
+    video_file_path, callable, seek_idx, visited_list, segment_start=0
+):
+    """Processes all unvisited frames of a video segment.
+
+    The segment starts at frame `segment_start` and spans `len(visited_list)`
+    frames. Seek requests in `seek_idx` are only handled if they fall into the
+    segment, since other processes work on the other segments.
+    """
     import logging
     import os
 
@@ -52,9 +98,12 @@ def video_processing_generator(video_file_path, callable, seek_idx, visited_list
 
     # Ensure that indiced are not generated beyond video frame count
     frame_count = cap.get_frame_count()
-    visited_list = visited_list[:frame_count]
+    visited_list = visited_list[: max(frame_count - segment_start, 0)]
+    segment_stop = segment_start + len(visited_list)
 
-    visited_list = [x is not None for x in visited_list]
+    visited_ranges = Index_Ranges.from_mask(
+        [x is not None for x in visited_list], offset=segment_start
+    )
 
     def next_unvisited_idx(frame_idx):
         """
@@ -67,27 +116,28 @@ def video_processing_generator(video_file_path, callable, seek_idx, visited_list
         Returns: Next index that requires processing.
 
         """
-        try:
-            visited = visited_list[frame_idx]
-        except IndexError:
-            visited = True  # trigger search from the start
-
-        if not visited:
-            next_unvisited = frame_idx
-        else:
-            # find next unvisited site in the future
-            try:
-                next_unvisited = visited_list.index(False, frame_idx)
-            except ValueError:
-                # any thing in the past?
-                try:
-                    next_unvisited = visited_list.index(False, 0, frame_idx)
-                except ValueError:
-                    # no unvisited sites left. Done!
-                    logger.debug("Caching completed.")
-                    next_unvisited = None
+        # find next unvisited site in the future
+        next_unvisited = visited_ranges.next_missing(
+            max(frame_idx, segment_start), segment_stop
+        )
+        if next_unvisited is None:
+            # any thing in the past?
+            next_unvisited = visited_ranges.next_missing(
+                segment_start, min(frame_idx, segment_stop)
+            )
+            if next_unvisited is None:
+                # no unvisited sites left. Done!
+                logger.debug("Caching completed.")
         return next_unvisited
 
+    def requested_seek_idx():
+        with seek_idx.get_lock():
+            requested_idx = seek_idx.value
+            if segment_start <= requested_idx < segment_stop:
+                seek_idx.value = -1
+                return requested_idx
+        return None
+
     def handle_frame(frame_idx):
         if frame_idx != cap.get_frame_index() + 1:
             # we need to seek:
@@ -96,25 +146,22 @@ def video_processing_generator(video_file_path, callable, seek_idx, visited_list
                 cap.seek_to_frame(frame_idx)
             except video_capture.FileSeekError:
                 logger.warning(f"Could not evaluate frame: {frame_idx}.")
-                visited_list[frame_idx] = True  # this frame is now visited.
+                visited_ranges.add(frame_idx)  # this frame is now visited.
                 return []
 
         try:
             frame = cap.get_frame()
         except video_capture.EndofVideoError:
             logger.warning(f"Could not evaluate frame: {frame_idx}.")
-            visited_list[frame_idx] = True
+            visited_ranges.add(frame_idx)
             return []
         return callable(frame)
 
     while True:
         last_frame_idx = cap.get_frame_index()
-        if seek_idx.value != -1:
-            assert seek_idx.value < len(
-                visited_list
-            ), "The requested seek index is outside of the predefined cache range!"
-            last_frame_idx = seek_idx.value
-            seek_idx.value = -1
+        seek_frame_idx = requested_seek_idx()
+        if seek_frame_idx is not None:
+            last_frame_idx = seek_frame_idx
             logger.debug(
                 f"User required seek. Marker caching at Frame: {last_frame_idx}"
             )
@@ -125,7 +172,7 @@ def video_processing_generator(video_file_path, callable, seek_idx, visited_list
             break
         else:
             res = handle_frame(next_frame_idx)
-            visited_list[next_frame_idx] = True
+            visited_ranges.add(next_frame_idx)
             yield next_frame_idx, res
 
 
@@ -140,7 +187,8 @@ def background_data_processor(data, callable, seek_idx, mp_context):
 
 def data_processing_generator(data, callable, seek_idx):
     # We treat frames without marker detections as already processed from the start.
-    visited_list = [x is None for x in data]
+    visited_ranges = Index_Ranges.from_mask([x is None for x in data])
+    num_samples = len(data)
 
     def next_unvisited_idx(sample_idx):
         """
@@ -153,23 +201,13 @@ def data_processing_generator(data, callable, seek_idx):
         Returns: Next index that requires processing.
 
         """
-        try:
-            visited = visited_list[sample_idx]
-        except IndexError:
-            visited = True  # trigger search from the start
-
-        if visited is False:
-            next_unvisited = sample_idx
-        else:
-            # find next unvisited site in the future
-            try:
-                next_unvisited = visited_list.index(False, sample_idx)
-            except ValueError:
-                # any thing in the past?
-                try:
-                    next_unvisited = visited_list.index(False, 0, sample_idx)
-                except ValueError:
-                    next_unvisited = None
+        # find next unvisited site in the future
+        next_unvisited = visited_ranges.next_missing(sample_idx, num_samples)
+        if next_unvisited is None:
+            # any thing in the past?
+            next_unvisited = visited_ranges.next_missing(
+                0, min(sample_idx, num_samples)
+            )
         return next_unvisited
 
     def handle_sample(sample_idx):
@@ -188,17 +226,27 @@ def data_processing_generator(data, callable, seek_idx):
             break
         else:
             res = handle_sample(next_sample_idx)
-            visited_list[next_sample_idx] = True
+            visited_ranges.add(next_sample_idx)
             yield next_sample_idx, res
             next_sample_idx += 1
 
 
 def gaze_on_surface_generator(
-    surfaces, section, all_world_timestamps, all_gaze_events, camera_model
+    surfaces,
+    section,
+    all_world_timestamps,
+    all_gaze_events,
+    camera_model,
+    extra_keys=(),
 ):
+    """Yields the `Events_On_Surface` of each surface"""
     for surface in surfaces:
         gaze_on_surf = surface.map_section(
-            section, all_world_timestamps, all_gaze_events, camera_model
+            section,
+            all_world_timestamps,
+            all_gaze_events,
+            camera_model,
+            extra_keys=extra_keys,
         )
         yield gaze_on_surf
 
@@ -323,11 +371,9 @@ class Exporter:
         """
         Result: Tuple[events_per_surface, events_per_surface]
         events_per_surface = List[events_surface_0, ..., events_surface_N]
-        events_surface_i = List[events_world_frame_0, ..., events_world_frame_M]
-        events_world_frame_j: List[event, ...]
+        events_surface_i: Events_On_Surface of all world frames
 
         N: Number of surfaces
-        M: Number of world frames
         """
         section = slice(*self.export_range)
         gaze_on_surface = list(
@@ -347,6 +393,7 @@ class Exporter:
                 self.world_timestamps,
                 self.fixations,
                 self.camera_model,
+                extra_keys=FIXATION_KEYS,
             )
         )
 
@@ -461,10 +508,9 @@ class Exporter:
 
             for surf_idx, surface in enumerate(self.surfaces):
                 gaze_on_surf = self.gaze_on_surfaces[surf_idx]
-                gaze_on_surf = list(itertools.chain.from_iterable(gaze_on_surf))
-                gaze_on_surf_ts = {
-                    gp["base_data"][1] for gp in gaze_on_surf if gp["on_surf"]
-                }
+                gaze_on_surf_ts = set(
+                    gaze_on_surf.timestamp[gaze_on_surf.on_surf].tolist()
+                )
                 not_on_any_surf_ts -= gaze_on_surf_ts
                 csv_writer.writerow((surface.name, len(gaze_on_surf_ts)))
 
@@ -606,27 +652,29 @@ class Exporter:
                     "confidence",
                 )
             )
-            for idx, gaze_on_surf in enumerate(gazes_on_surface):
-                idx += self.export_range[0]
-                if gaze_on_surf:
-                    for gp in gaze_on_surf:
-                        csv_writer.writerow(
-                            (
-                                self.world_timestamps[idx],
-                                idx,
-                                gp["timestamp"],
-                                gp["norm_pos"][0],
-                                gp["norm_pos"][1],
-                                gp["norm_pos"][0] * surface.real_world_size["x"],
-                                gp["norm_pos"][1] * surface.real_world_size["y"],
-                                gp["on_surf"],
-                                gp["confidence"],
-                            )
-                        )
+            x_norm = gazes_on_surface.norm_pos[:, 0]
+            y_norm = gazes_on_surface.norm_pos[:, 1]
+            csv_writer.writerows(
+                zip(
+                    self._world_timestamps_for(gazes_on_surface),
+                    gazes_on_surface.world_index.tolist(),
+                    gazes_on_surface.timestamp.tolist(),
+                    x_norm.tolist(),
+                    y_norm.tolist(),
+                    (x_norm * surface.real_world_size["x"]).tolist(),
+                    (y_norm * surface.real_world_size["y"]).tolist(),
+                    gazes_on_surface.on_surf.tolist(),
+                    gazes_on_surface.confidence.tolist(),
+                )
+            )
+
+    def _world_timestamps_for(self, events_on_surface):
+        return np.asarray(self.world_timestamps)[events_on_surface.world_index].tolist()
 
     def _export_fixations_on_surface(self, fixations_on_surf, surface, surface_name):
         """
-        fixations_on_surf structure: fixations_on_surf[world_frame_idx][event_idx]
+        fixations_on_surf: Events_On_Surface with FIXATION_KEYS, one row per fixation
+        and world frame
         """
         with open(
             os.path.join(
@@ -652,22 +700,20 @@ class Exporter:
                     "on_surf",
                 )
             )
-            for world_idx, fixs_for_frame in enumerate(fixations_on_surf):
-                world_idx += self.export_range[0]
-                if fixs_for_frame:
-                    for fix in fixs_for_frame:
-                        csv_writer.writerow(
-                            (
-                                self.world_timestamps[world_idx],
-                                world_idx,
-                                fix["id"],
-                                fix["timestamp"],
-                                fix["duration"],
-                                fix["dispersion"],
-                                fix["norm_pos"][0],
-                                fix["norm_pos"][1],
-                                fix["norm_pos"][0] * surface.real_world_size["x"],
-                                fix["norm_pos"][1] * surface.real_world_size["y"],
-                                fix["on_surf"],
-                            )
-                        )
+            x_norm = fixations_on_surf.norm_pos[:, 0]
+            y_norm = fixations_on_surf.norm_pos[:, 1]
+            csv_writer.writerows(
+                zip(
+                    self._world_timestamps_for(fixations_on_surf),
+                    fixations_on_surf.world_index.tolist(),
+                    fixations_on_surf.extra["id"].tolist(),
+                    fixations_on_surf.timestamp.tolist(),
+                    fixations_on_surf.extra["duration"].tolist(),
+                    fixations_on_surf.extra["dispersion"].tolist(),
+                    x_norm.tolist(),
+                    y_norm.tolist(),
+                    (x_norm * surface.real_world_size["x"]).tolist(),
+                    (y_norm * surface.real_world_size["y"]).tolist(),
+                    fixations_on_surf.on_surf.tolist(),
+                )
+            )
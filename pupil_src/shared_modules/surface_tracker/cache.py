@@ -9,19 +9,146 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 import logging
+import typing as T
+from bisect import bisect_left, bisect_right
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
-import itertools
+
+
+class Index_Ranges:
+    """Set of indices, stored as sorted, disjoint and non-touching ranges.
+
+    Ranges are inclusive `[start, end]` pairs. Testing membership and finding the
+    next index that is not contained are O(log n) in the number of ranges. Adding or
+    removing an index is O(log n) if it extends or shrinks an existing range, and
+    O(n) if it creates, splits, merges or deletes a range, which shifts the list of
+    ranges after it. Iterating yields the ranges as `[start, end]` lists.
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self, ranges: T.Iterable[T.Sequence[int]] = ()):
+        self._starts = []
+        self._ends = []
+        for start, end in ranges:
+            self._starts.append(int(start))
+            self._ends.append(int(end))
+
+    @classmethod
+    def from_mask(cls, mask, offset: int = 0) -> "Index_Ranges":
+        """Ranges of all indices where `mask` is True, shifted by `offset`"""
+        edges = np.diff(np.asarray(mask, dtype=np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1) + offset
+        ends = np.flatnonzero(edges == -1) - 1 + offset
+        return cls(zip(starts.tolist(), ends.tolist()))
+
+    def __getstate__(self):
+        return self._starts, self._ends
+
+    def __setstate__(self, state):
+        self._starts, self._ends = state
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)})"
+
+    def __iter__(self):
+        for start, end in zip(self._starts, self._ends):
+            yield [start, end]
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __eq__(self, other):
+        if isinstance(other, Index_Ranges):
+            return self._starts == other._starts and self._ends == other._ends
+        return list(self) == other
+
+    def _range_idx(self, index: int) -> int:
+        """Position of the last range starting at or before `index`, or -1"""
+        return bisect_right(self._starts, index) - 1
+
+    def __contains__(self, index: int) -> bool:
+        range_idx = self._range_idx(index)
+        return range_idx >= 0 and self._ends[range_idx] >= index
+
+    def add(self, index: int):
+        range_idx = self._range_idx(index)
+        if range_idx >= 0 and self._ends[range_idx] >= index:
+            return  # already contained
+
+        extends_left = range_idx >= 0 and self._ends[range_idx] == index - 1
+        next_idx = range_idx + 1
+        extends_right = (
+            next_idx < len(self._starts) and self._starts[next_idx] == index + 1
+        )
+        if extends_left and extends_right:
+            # merge touching ranges
+            self._ends[range_idx] = self._ends[next_idx]
+            del self._starts[next_idx]
+            del self._ends[next_idx]
+        elif extends_left:
+            self._ends[range_idx] = index
+        elif extends_right:
+            self._starts[next_idx] = index
+        else:
+            self._starts.insert(next_idx, index)
+            self._ends.insert(next_idx, index)
+
+    def remove(self, index: int):
+        range_idx = self._range_idx(index)
+        if range_idx < 0 or self._ends[range_idx] < index:
+            return  # not contained
+
+        start, end = self._starts[range_idx], self._ends[range_idx]
+        if start == end:
+            del self._starts[range_idx]
+            del self._ends[range_idx]
+        elif index == start:
+            self._starts[range_idx] = index + 1
+        elif index == end:
+            self._ends[range_idx] = index - 1
+        else:
+            # split range
+            self._ends[range_idx] = index - 1
+            self._starts.insert(range_idx + 1, index + 1)
+            self._ends.insert(range_idx + 1, end)
+
+    def next_missing(self, index: int, stop: int) -> T.Optional[int]:
+        """First index in `[index, stop)` that is not contained, or None"""
+        range_idx = self._range_idx(index)
+        if range_idx >= 0 and self._ends[range_idx] >= index:
+            index = self._ends[range_idx] + 1
+        return index if index < stop else None
+
+    def overlapping(self, start: int, stop: int) -> T.Iterator[T.List[int]]:
+        """Ranges that overlap with `[start, stop)`, clipped to it"""
+        first_idx = bisect_left(self._ends, start)
+        last_idx = bisect_left(self._starts, stop)
+        for range_idx in range(first_idx, last_idx):
+            range_start = max(self._starts[range_idx], start)
+            range_end = min(self._ends[range_idx], stop - 1)
+            yield [range_start, range_end]
+
+    def as_array(self) -> np.ndarray:
+        """Ranges as array of shape (n, 2)"""
+        return np.array([self._starts, self._ends], dtype=np.int64).T.reshape(-1, 2)
+
+    def count(self, start: int, stop: int) -> int:
+        """Number of contained indices in `[start, stop)`"""
+        ranges = self.overlapping(start, stop)
+        return sum(range_end - range_start + 1 for range_start, range_end in ranges)
 
 
 class Cache(list):
-    """Cache list is a list of False
-    [False,False,False]
-    with update() 'False' can be overwritten with a result (anything not 'False')
-    self.visited_ranges show ranges where the cache content is False
-    self.positive_ranges show ranges where the cache does not evaluate as 'False' using eval_fn
+    """Cache list is a list of None
+    [None,None,None]
+    with update() 'None' can be overwritten with a result (anything not 'None')
+    self.visited_ranges show ranges where the cache content is not None
+    self.positive_ranges show ranges where the cache does evaluate as 'True' using eval_fn
     this allows to use ranges a a way of showing where no caching has happed (default) or whatever you do with eval_fn
-    self.complete indicated that the cache list has no unknowns aka False
+    Both are `Index_Ranges` and are updated incrementally, see there for the costs.
     """
 
     def __init__(self, init_list):
@@ -33,33 +160,31 @@ class Cache(list):
         self._visited_ranges = self.recompute_ranges(self.visited_eval_fn)
 
     @property
-    def visited_ranges(self):
+    def visited_ranges(self) -> Index_Ranges:
         return self._visited_ranges
 
     @property
-    def positive_ranges(self):
+    def positive_ranges(self) -> Index_Ranges:
         return self._positive_ranges
 
+    def positive_count(self, section: slice) -> int:
+        """Number of positive entries in `section`"""
+        start, stop, _ = section.indices(self.length)
+        return self._positive_ranges.count(start, stop)
+
     def update(self, key, item, force=False):
         if self[key] is not None:
             if not force:
                 raise IndexError(
                     "Can not overwrite an already cached position without force!"
                 )
-            self[key] = item
-            self._visited_ranges = self.recompute_ranges(self.visited_eval_fn)
-            self._positive_ranges = self.recompute_ranges(self.positive_eval_fn)
-
-        elif item is not None:
-            # unvisited
-            self[key] = item
-
-            self.update_ranges(self._visited_ranges, key)
-            if self.positive_eval_fn(item):
-                self.update_ranges(self._positive_ranges, key)
-        else:
+        elif item is None:
             raise ValueError("`None` is not a valid value to be assigned in the cache!")
 
+        self[key] = item
+        self._update_ranges(self._visited_ranges, key, self.visited_eval_fn(item))
+        self._update_ranges(self._positive_ranges, key, self.positive_eval_fn(item))
+
     @staticmethod
     def visited_eval_fn(x):
         return x is not None
@@ -68,38 +193,12 @@ class Cache(list):
     def positive_eval_fn(x):
         return bool(x)
 
-    def recompute_ranges(self, eval_fn):
-        group_end_index = -1
-        ranges = []
-        for key, group in itertools.groupby(self, eval_fn):
-            group_start_index = group_end_index + 1
-            group_end_index += sum(1 for _ in group)
-            if key:
-                ranges.append([group_start_index, group_end_index])
-        return ranges
-
-    @staticmethod
-    def update_ranges(ranges, index):
-        for _range in ranges:
-            # most common case: extend a range
-            if index == _range[0] - 1:
-                _range[0] = index
-                Cache.merge_ranges(ranges)
-                return
-            elif index == _range[1] + 1:
-                _range[1] = index
-                Cache.merge_ranges(ranges)
-                return
-        # somewhere outside of range proximity
-        ranges.append([index, index])
-        ranges.sort(key=lambda x: x[0])
+    def recompute_ranges(self, eval_fn) -> Index_Ranges:
+        return Index_Ranges.from_mask([eval_fn(x) for x in self])
 
     @staticmethod
-    def merge_ranges(ranges):
-        for i in range(len(ranges) - 1):
-            if ranges[i][1] == ranges[i + 1][0] - 1:
-                # merge touching fields
-                ranges[i] = [ranges[i][0], ranges[i + 1][1]]
-                # del second field
-                del ranges[i + 1]
-                return
+    def _update_ranges(ranges: Index_Ranges, index: int, is_contained: bool):
+        if is_contained:
+            ranges.add(index)
+        else:
+            ranges.remove(index)
@@ -0,0 +1,99 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import typing as T
+
+import numpy as np
+
+from .surface import Events_On_Surface
+
+
+class Heatmap_Accumulator:
+    """Gaze histogram of a surface within a range of world frames.
+
+    Gaze on the surface is mapped once for the whole recording. The histogram bin of
+    each gaze datum is kept sorted by world frame, such that changing the frame range,
+    e.g. when trimming, only counts or uncounts the gaze of the added or removed
+    frames. Blur and colormap are applied on demand, see
+    `Surface.update_heatmap_from_histogram()`.
+    """
+
+    def __init__(
+        self,
+        gaze_on_surf: Events_On_Surface,
+        grid: T.Tuple[int, int],
+        min_confidence: float = 0.0,
+        frame_range: T.Tuple[int, int] = (0, 0),
+    ):
+        on_surf = gaze_on_surf.on_surf
+        self._world_index = gaze_on_surf.world_index[on_surf]
+        self._norm_pos = gaze_on_surf.norm_pos[on_surf]
+        self._confidence = gaze_on_surf.confidence[on_surf]
+        self.grid = tuple(grid)
+        self.min_confidence = min_confidence
+        self.frame_range = tuple(frame_range)
+        self._rebuild()
+
+    @property
+    def histogram(self) -> np.ndarray:
+        """Gaze counts with shape `grid`, top row first"""
+        return self._counts.reshape(self.grid).astype(np.float64)
+
+    @property
+    def count(self) -> int:
+        return int(self._counts.sum())
+
+    def set_frame_range(self, start: int, stop: int):
+        """Only counts gaze of the world frames in `[start, stop)`"""
+        new_range = start, stop
+        for range_start, range_stop in _difference(self.frame_range, new_range):
+            self._counts -= self._count_frames(range_start, range_stop)
+        for range_start, range_stop in _difference(new_range, self.frame_range):
+            self._counts += self._count_frames(range_start, range_stop)
+        self.frame_range = new_range
+
+    def set_grid(self, grid: T.Tuple[int, int]):
+        if tuple(grid) != self.grid:
+            self.grid = tuple(grid)
+            self._rebuild()
+
+    def set_min_confidence(self, min_confidence: float):
+        if min_confidence != self.min_confidence:
+            self.min_confidence = min_confidence
+            self._rebuild()
+
+    def _rebuild(self):
+        rows, cols = self.grid
+        # bins like np.histogram2d over the flipped y and x coordinates
+        row_idc = np.minimum(
+            ((1.0 - self._norm_pos[:, 1]) * rows).astype(int), rows - 1
+        )
+        col_idc = np.minimum((self._norm_pos[:, 0] * cols).astype(int), cols - 1)
+        self._bins = np.where(
+            self._confidence >= self.min_confidence, row_idc * cols + col_idc, -1
+        )
+        self._counts = self._count_frames(*self.frame_range)
+
+    def _count_frames(self, start: int, stop: int) -> np.ndarray:
+        first, last = np.searchsorted(self._world_index, [start, stop], side="left")
+        bins = self._bins[first:last]
+        return np.bincount(bins[bins >= 0], minlength=self.grid[0] * self.grid[1])
+
+
+def _difference(frame_range, other_range) -> T.List[T.Tuple[int, int]]:
+    """Parts of `frame_range` that are not in `other_range`"""
+    start, stop = frame_range
+    other_start, other_stop = other_range
+    parts = [(start, min(stop, other_start)), (max(start, other_stop), stop)]
+    return [
+        (part_start, part_stop)
+        for part_start, part_stop in parts
+        if part_start < part_stop
+    ]
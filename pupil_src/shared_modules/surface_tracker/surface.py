@@ -29,6 +29,33 @@ Surface_Marker_UID_To_Aggregate_Mapping = typing.Mapping[
 ]
 
 
+class Events_On_Surface(typing.NamedTuple):
+    """Gaze or fixation events mapped onto a surface, as columns.
+
+    Rows are sorted by world frame and by event timestamp within each frame. Events
+    can be mapped for multiple world frames, e.g. fixations spanning several frames.
+    """
+
+    world_index: np.ndarray  # int64
+    timestamp: np.ndarray
+    norm_pos: np.ndarray  # shape (N, 2), normalized surface coordinates
+    on_surf: np.ndarray  # bool
+    confidence: np.ndarray
+    # additional fields of the events, e.g. fixation "id", "duration", "dispersion"
+    extra: typing.Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def empty(extra_keys=()) -> "Events_On_Surface":
+        return Events_On_Surface(
+            world_index=np.empty(0, dtype=np.int64),
+            timestamp=np.empty(0),
+            norm_pos=np.empty((0, 2)),
+            on_surf=np.empty(0, dtype=bool),
+            confidence=np.empty(0),
+            extra={key: np.empty(0) for key in extra_keys},
+        )
+
+
 class Surface(abc.ABC):
     """A Surface is a quadrangle whose position is defined in relation to a set of
     square markers in the real world. The markers are assumed to be in a fixed spatial
@@ -228,6 +255,47 @@ class Surface(abc.ABC):
         img_points.shape = orig_shape
         return img_points
 
+    @staticmethod
+    def map_norm_pos_to_surf(norm_pos, camera_model, trans_matrices):
+        """Map normalized world camera positions onto surfaces in a single pass.
+
+        Args:
+            norm_pos (ndarray): Normalized positions with shape (N, 2), e.g. gaze.
+            camera_model: Camera Model object. Distortion is compensated.
+            trans_matrices (ndarray): Image to surface transformation matrix of each
+            position, with shape (N, 3, 3), or a single matrix for all positions.
+
+        Returns:
+            Tuple of the positions in normalized surface space with shape (N, 2) and
+            a boolean array that is `True` for positions on the surface.
+
+        """
+        norm_pos = np.asarray(norm_pos, dtype=np.float64).reshape(-1, 2)
+        if not len(norm_pos):
+            return np.empty((0, 2)), np.empty(0, dtype=bool)
+
+        width, height = camera_model.resolution
+        img_points = np.empty_like(norm_pos)
+        img_points[:, 0] = norm_pos[:, 0] * width
+        img_points[:, 1] = (1 - norm_pos[:, 1]) * height
+        img_points = camera_model.undistort_points_on_image_plane(img_points)
+        img_points = np.asarray(img_points, dtype=np.float64).reshape(-1, 2)
+
+        # like cv2.perspectiveTransform, with a matrix per point
+        trans_matrices = np.asarray(trans_matrices, dtype=np.float64)
+        x, y = img_points[:, 0], img_points[:, 1]
+        M = trans_matrices.reshape(-1, 3, 3)
+        w = M[:, 2, 0] * x + M[:, 2, 1] * y + M[:, 2, 2]
+        w = np.divide(
+            1.0, w, out=np.zeros_like(w), where=np.abs(w) > np.finfo(float).eps
+        )
+        surf_points = np.empty_like(img_points)
+        surf_points[:, 0] = (M[:, 0, 0] * x + M[:, 0, 1] * y + M[:, 0, 2]) * w
+        surf_points[:, 1] = (M[:, 1, 0] * x + M[:, 1, 1] * y + M[:, 1, 2]) * w
+
+        on_surf = np.all((0 <= surf_points) & (surf_points <= 1), axis=1)
+        return surf_points, on_surf
+
     def map_gaze_and_fixation_events(self, events, camera_model, trans_matrix=None):
         """
         Map a list of gaze or fixation events onto the surface and return the
@@ -244,26 +312,23 @@ class Surface(abc.ABC):
             List of gaze or fixation on surface events.
 
         """
-        results = []
-        for event in events:
-            gaze_norm_pos = event["norm_pos"]
-            gaze_img_point = methods.denormalize(
-                gaze_norm_pos, camera_model.resolution, flip_y=True
-            )
-            gaze_img_point = np.array(gaze_img_point)
-            surf_norm_pos = self.map_to_surf(
-                gaze_img_point,
-                camera_model,
-                compensate_distortion=True,
-                trans_matrix=trans_matrix,
-            )
-            on_srf = bool((0 <= surf_norm_pos[0] <= 1) and (0 <= surf_norm_pos[1] <= 1))
+        if not events:
+            return []
+        if trans_matrix is None:
+            trans_matrix = self.img_to_surf_trans
+        surf_norm_pos, on_surf = self.map_norm_pos_to_surf(
+            [event["norm_pos"] for event in events], camera_model, trans_matrix
+        )
 
+        results = []
+        for event, event_surf_norm_pos, event_on_surf in zip(
+            events, surf_norm_pos.tolist(), on_surf.tolist()
+        ):
             mapped_datum = {
                 "topic": f"{event['topic']}_on_surface",
-                "norm_pos": surf_norm_pos.tolist(),
+                "norm_pos": event_surf_norm_pos,
                 "confidence": event["confidence"],
-                "on_surf": on_srf,
+                "on_surf": event_on_surf,
                 "base_data": (event["topic"], event["timestamp"]),
                 "timestamp": event["timestamp"],
             }
@@ -606,33 +671,49 @@ class Surface(abc.ABC):
         self._registered_markers_dist.pop(marker_uid)
         self._registered_markers_undist.pop(marker_uid)
 
-    def update_heatmap(self, gaze_on_surf):
-        """Compute the gaze distribution heatmap based on given gaze events."""
-
-        heatmap_data = [g["norm_pos"] for g in gaze_on_surf if g["on_surf"]]
+    @property
+    def heatmap_grid(self) -> typing.Tuple[int, int]:
+        """Number of heatmap rows and columns"""
         aspect_ratio = self.real_world_size["y"] / self.real_world_size["x"]
-        grid = (
+        return (
             max(1, int(self._heatmap_resolution * aspect_ratio)),
             int(self._heatmap_resolution),
         )
-        if heatmap_data:
-            xvals, yvals = zip(*((x, 1.0 - y) for x, y in heatmap_data))
-            hist, *edges = np.histogram2d(
-                yvals, xvals, bins=grid, range=[[0, 1.0], [0, 1.0]], density=False
-            )
-            filter_h = 19 + self._heatmap_blur_factor * 15
-            filter_w = filter_h * aspect_ratio
-            filter_h = int(filter_h) // 2 * 2 + 1
-            filter_w = int(filter_w) // 2 * 2 + 1
-
-            hist = cv2.GaussianBlur(hist, (filter_h, filter_w), 0)
-            hist_max = hist.max()
-            hist *= (255.0 / hist_max) if hist_max else 0.0
-            hist = hist.astype(np.uint8)
-        else:
+
+    def update_heatmap(self, norm_pos_on_surf):
+        """Compute the gaze distribution heatmap based on given gaze positions.
+
+        Args:
+            norm_pos_on_surf: Normalized surface positions of gaze on the surface,
+            with shape (N, 2).
+
+        """
+        heatmap_data = np.asarray(norm_pos_on_surf, dtype=np.float64).reshape(-1, 2)
+        xvals = heatmap_data[:, 0]
+        yvals = 1.0 - heatmap_data[:, 1]
+        hist, *edges = np.histogram2d(
+            yvals, xvals, bins=self.heatmap_grid, range=[[0, 1.0], [0, 1.0]]
+        )
+        self.update_heatmap_from_histogram(hist)
+
+    def update_heatmap_from_histogram(self, hist):
+        """Blur and colormap a gaze histogram with shape `heatmap_grid`"""
+        grid = hist.shape
+        if not hist.any():
             self.within_surface_heatmap = self.get_uniform_heatmap(grid)
             return
 
+        aspect_ratio = self.real_world_size["y"] / self.real_world_size["x"]
+        filter_h = 19 + self._heatmap_blur_factor * 15
+        filter_w = filter_h * aspect_ratio
+        filter_h = int(filter_h) // 2 * 2 + 1
+        filter_w = int(filter_w) // 2 * 2 + 1
+
+        hist = cv2.GaussianBlur(hist, (filter_h, filter_w), 0)
+        hist_max = hist.max()
+        hist *= (255.0 / hist_max) if hist_max else 0.0
+        hist = hist.astype(np.uint8)
+
         color_map = cv2.applyColorMap(hist, cv2.COLORMAP_JET)
         # reuse allocated memory if possible
         if self.within_surface_heatmap.shape != (*grid, 4):
@@ -12,11 +12,12 @@ import logging
 import multiprocessing
 import platform
 
+import numpy as np
 import player_methods
 
 from . import background_tasks, offline_utils
 from .cache import Cache
-from .surface import Surface, Surface_Location
+from .surface import Events_On_Surface, Surface, Surface_Location
 
 logger = logging.getLogger(__name__)
 
@@ -54,28 +55,61 @@ class Surface_Offline(Surface):
     def __setstate__(self, state):
         self.__dict__.update(state)
 
-    def map_section(self, section, all_world_timestamps, all_gaze_events, camera_model):
+    def map_section(
+        self,
+        section,
+        all_world_timestamps,
+        all_gaze_events,
+        camera_model,
+        extra_keys=(),
+    ) -> Events_On_Surface:
+        """Maps the gaze or fixation events of all world frames in `section` at once.
+
+        Events are assigned to the world frames like `player_methods.enclosing_window`
+        and mapped with the location of the surface in their frame. Only frames in
+        which the surface was detected are mapped.
+
+        Args:
+            all_gaze_events: Gaze or fixation `player_methods.Bisector`.
+            extra_keys: Further event fields to copy, e.g. for fixations.
+        """
         try:
             location_cache = self.location_cache[section]
         except TypeError:
-            return []
+            return Events_On_Surface.empty(extra_keys)
 
-        section_gaze_on_surf = []
-        for frame_idx, location in enumerate(location_cache):
-            frame_idx += section.start
+        frame_idc = []
+        trans_matrices = []
+        for frame_idx, location in enumerate(location_cache, start=section.start):
             if location and location.detected:
-                frame_window = player_methods.enclosing_window(
-                    all_world_timestamps, frame_idx
-                )
-                gaze_events = all_gaze_events.by_ts_window(frame_window)
+                frame_idc.append(frame_idx)
+                trans_matrices.append(location.img_to_surf_trans)
+        if not frame_idc:
+            return Events_On_Surface.empty(extra_keys)
 
-                gaze_on_surf = self.map_gaze_and_fixation_events(
-                    gaze_events, camera_model, trans_matrix=location.img_to_surf_trans
-                )
-            else:
-                gaze_on_surf = []
-            section_gaze_on_surf.append(gaze_on_surf)
-        return section_gaze_on_surf
+        frame_windows = player_methods.enclosing_windows(
+            all_world_timestamps, frame_idc
+        )
+        start_idc, stop_idc = all_gaze_events.index_ranges_for_windows(frame_windows)
+        # event indices, frame by frame
+        counts = stop_idc - start_idc
+        frame_of_event = np.repeat(np.arange(len(frame_idc)), counts)
+        event_idc = np.arange(counts.sum()) + np.repeat(
+            start_idc - (np.cumsum(counts) - counts), counts
+        )
+
+        norm_pos = all_gaze_events.column("norm_pos")[event_idc]
+        surf_norm_pos, on_surf = self.map_norm_pos_to_surf(
+            norm_pos, camera_model, np.asarray(trans_matrices)[frame_of_event]
+        )
+        return Events_On_Surface(
+            world_index=np.asarray(frame_idc, dtype=np.int64)[frame_of_event],
+            timestamp=all_gaze_events.column("timestamp")[event_idc],
+            norm_pos=surf_norm_pos,
+            on_surf=on_surf,
+            confidence=all_gaze_events.column("confidence")[event_idc],
+            extra={key: all_gaze_events.column(key)[event_idc] for key in extra_keys},
+        )
 
     def update_location(self, frame_idx, marker_cache, camera_model):
         if not self.defined:
@@ -267,5 +301,4 @@ class Surface_Offline(Surface):
         """Count in how many frames the surface was visible in a section."""
         if self.location_cache is None:
             return 0
-        section_cache = self.location_cache[section]
-        return sum(map(bool, section_cache))
+        return self.location_cache.positive_count(section)
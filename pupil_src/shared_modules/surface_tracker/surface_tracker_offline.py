@@ -29,8 +29,9 @@ from observable import Observable
 from plugin import Plugin
 
 from . import background_tasks, offline_utils
-from .cache import Cache
+from .cache import Cache, Index_Ranges
 from .gui import Heatmap_Mode
+from .heatmap import Heatmap_Accumulator
 from .surface_marker import Surface_Marker
 from .surface_marker_detector import MarkerDetectorMode, MarkerType
 from .surface_offline import Surface_Offline
@@ -51,6 +52,14 @@ else:
     mp_context = multiprocessing.get_context()
 
 
+def _timeline_range_vertices(timestamps, ranges: Index_Ranges) -> T.List[T.List]:
+    """Line vertices `(ts, 0)` for the start and end of all ranges"""
+    range_idc = ranges.as_array().ravel()
+    vertices = np.zeros((len(range_idc), 2))
+    vertices[:, 0] = np.asarray(timestamps)[range_idc]
+    return vertices.tolist()
+
+
 class _CacheRelevantDetectorParams(T.NamedTuple):
     mode: MarkerDetectorMode
     inverted_markers: bool
@@ -82,9 +91,12 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
         self.last_cache_update_ts = time.perf_counter()
         self.CACHE_UPDATE_INTERVAL_SEC = 5
 
-        self.gaze_on_surf_buffer = None
         self.gaze_on_surf_buffer_filler = None
+        # surfaces whose gaze is being mapped, in the order of the filler results
+        self._gaze_on_surf_buffer_surfaces = []
+        self._surfaces_to_remap = set()
 
+        self._heatmap_accumulators = {}
         self._heatmap_update_requests = set()
         self.export_proxies = set()
 
@@ -240,6 +252,7 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
             list(self.marker_cache),
             self.cache_seek_idx,
             mp_context,
+            num_workers=max(1, multiprocessing.cpu_count() - 1),
         )
 
     def _filter_marker_cache(self, cache_to_filter):
@@ -292,7 +305,15 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
             did_timeout = False
 
             for gaze in self.gaze_on_surf_buffer_filler.fetch():
-                self.gaze_on_surf_buffer.append(gaze)
+                surface = self._gaze_on_surf_buffer_surfaces.pop(0)
+                if surface in self.surfaces:
+                    self._heatmap_accumulators[surface] = Heatmap_Accumulator(
+                        gaze,
+                        surface.heatmap_grid,
+                        min_confidence=self.g_pool.min_data_confidence,
+                        frame_range=self._trim_frame_range(),
+                    )
+                    self._heatmap_update_requests.add(surface)
                 if time.perf_counter() - start_time > 1 / 50:
                     did_timeout = True
                     break
@@ -300,7 +321,6 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
             if self.gaze_on_surf_buffer_filler.completed and not did_timeout:
                 self.gaze_on_surf_buffer_filler = None
                 self._update_surface_heatmaps()
-                self.gaze_on_surf_buffer = None
 
             self._set_timeline_refresh_needed()
 
@@ -380,28 +400,26 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
                 )
 
     def _update_surface_heatmaps(self):
-        self._compute_across_surfaces_heatmap()
+        frame_range = self._trim_frame_range()
+        for accumulator in self._heatmap_accumulators.values():
+            accumulator.set_frame_range(*frame_range)
+            accumulator.set_min_confidence(self.g_pool.min_data_confidence)
 
-        for surface in self._heatmap_update_requests:
-            surf_idx = self.surfaces.index(surface)
-            gaze_on_surf = self.gaze_on_surf_buffer[surf_idx]
-            gaze_on_surf = itertools.chain.from_iterable(gaze_on_surf)
-            gaze_on_surf = (
-                g
-                for g in gaze_on_surf
-                if g["confidence"] >= self.g_pool.min_data_confidence
-            )
-            gaze_on_surf = list(gaze_on_surf)
-            surface.update_heatmap(gaze_on_surf)
+        self._compute_across_surfaces_heatmap()
 
-        self._heatmap_update_requests.clear()
+        # surfaces without accumulator are updated once their gaze is mapped
+        for surface in list(self._heatmap_update_requests):
+            accumulator = self._heatmap_accumulators.get(surface)
+            if accumulator is not None:
+                accumulator.set_grid(surface.heatmap_grid)
+                surface.update_heatmap_from_histogram(accumulator.histogram)
+                self._heatmap_update_requests.remove(surface)
 
     def _compute_across_surfaces_heatmap(self):
         gaze_counts_per_surf = []
-        for gaze in self.gaze_on_surf_buffer:
-            gaze = list(itertools.chain.from_iterable(gaze))
-            gaze = [g for g in gaze if g["on_surf"]]
-            gaze_counts_per_surf.append(len(gaze))
+        for surface in self.surfaces:
+            accumulator = self._heatmap_accumulators.get(surface)
+            gaze_counts_per_surf.append(accumulator.count if accumulator else 0)
 
         if gaze_counts_per_surf:
             max_count = max(gaze_counts_per_surf)
@@ -419,22 +437,37 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
             for surface in self.surfaces:
                 surface.across_surface_heatmap = surface.get_uniform_heatmap((1, 1))
 
-    def _fill_gaze_on_surf_buffer(self):
-        in_mark = self.g_pool.seek_control.trim_left
-        out_mark = self.g_pool.seek_control.trim_right
-        section = slice(in_mark, out_mark)
+    def _trim_frame_range(self) -> T.Tuple[int, int]:
+        return self.g_pool.seek_control.trim_left, self.g_pool.seek_control.trim_right
+
+    def _fill_gaze_on_surf_buffer(self, surfaces=None):
+        """Maps the gaze of the whole recording onto `surfaces`, by default all.
 
+        Changing the trim marks only updates the heatmap accumulators and does not
+        require mapping the gaze again.
+        """
         all_world_timestamps = self.g_pool.timestamps
         all_gaze_events = self.g_pool.gaze_positions
+        section = slice(0, len(all_world_timestamps))
+
+        requested = set(self.surfaces if surfaces is None else surfaces)
+        if self.gaze_on_surf_buffer_filler is not None:
+            # surfaces that were not mapped yet by the canceled filler
+            requested.update(self._gaze_on_surf_buffer_surfaces)
+        surfaces = [surface for surface in self.surfaces if surface in requested]
 
-        self._start_gaze_buffer_filler(all_gaze_events, all_world_timestamps, section)
+        self._start_gaze_buffer_filler(
+            surfaces, all_gaze_events, all_world_timestamps, section
+        )
 
-    def _start_gaze_buffer_filler(self, all_gaze_events, all_world_timestamps, section):
+    def _start_gaze_buffer_filler(
+        self, surfaces, all_gaze_events, all_world_timestamps, section
+    ):
         if self.gaze_on_surf_buffer_filler is not None:
             self.gaze_on_surf_buffer_filler.cancel()
-        self.gaze_on_surf_buffer = []
+        self._gaze_on_surf_buffer_surfaces = list(surfaces)
         self.gaze_on_surf_buffer_filler = background_tasks.background_gaze_on_surface(
-            self.surfaces,
+            surfaces,
             section,
             all_world_timestamps,
             all_gaze_events,
@@ -462,18 +495,18 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
         ts = self.g_pool.timestamps
         with gl_utils.Coord_System(ts[0], ts[-1], height, 0):
             # Lines for areas that have been cached
-            cached_ranges = []
-            for r in self.marker_cache.visited_ranges:
-                cached_ranges += ((ts[r[0]], 0), (ts[r[1]], 0))
+            cached_ranges = _timeline_range_vertices(
+                ts, self.marker_cache.visited_ranges
+            )
 
             gl.glTranslatef(0, scale * self.TIMELINE_LINE_HEIGHT / 2, 0)
             color = pyglui_utils.RGBA(0.8, 0.2, 0.2, 0.8)
             pyglui_utils.draw_polyline(
                 cached_ranges, color=color, line_type=gl.GL_LINES, thickness=scale * 4
             )
-            cached_ranges = []
-            for r in self.marker_cache.positive_ranges:
-                cached_ranges += ((ts[r[0]], 0), (ts[r[1]], 0))
+            cached_ranges = _timeline_range_vertices(
+                ts, self.marker_cache.positive_ranges
+            )
 
             color = pyglui_utils.RGBA(0, 0.7, 0.3, 0.8)
             pyglui_utils.draw_polyline(
@@ -485,8 +518,9 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
             for surface in self.surfaces:
                 found_at = []
                 if surface.location_cache is not None:
-                    for r in surface.location_cache.positive_ranges:  # [[0,1],[3,4]]
-                        found_at += ((ts[r[0]], 0), (ts[r[1]], 0))
+                    found_at = _timeline_range_vertices(
+                        ts, surface.location_cache.positive_ranges
+                    )
                 cached_surfaces.append(found_at)
 
             color = pyglui_utils.RGBA(0, 0.7, 0.3, 0.8)
@@ -509,7 +543,8 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
 
         try:
             self.timeline.content_height += self.TIMELINE_LINE_HEIGHT
-            self._fill_gaze_on_surf_buffer()
+            self._heatmap_update_requests.add(self.surfaces[-1])
+            self._fill_gaze_on_surf_buffer([self.surfaces[-1]])
         except AttributeError:
             pass
         self.surfaces[-1].on_surface_change = self.on_surface_change
@@ -517,10 +552,9 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
 
     def remove_surface(self, surface):
         super().remove_surface(surface)
-        try:
-            self._heatmap_update_requests.remove(surface)
-        except KeyError:
-            pass
+        self._heatmap_update_requests.discard(surface)
+        self._surfaces_to_remap.discard(surface)
+        self._heatmap_accumulators.pop(surface, None)
         self.timeline.content_height -= self.TIMELINE_LINE_HEIGHT
         self._set_timeline_refresh_needed()
 
@@ -544,15 +578,12 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
             for surface in self.surfaces:
                 if surface.name == notification["name"]:
                     self._heatmap_update_requests.add(surface)
-                    surface.within_surface_heatmap = surface.get_placeholder_heatmap()
                     break
-            self._fill_gaze_on_surf_buffer()
+            self._update_surface_heatmaps()
 
         elif notification["subject"].startswith("seek_control.trim_indices_changed"):
-            for surface in self.surfaces:
-                surface.within_surface_heatmap = surface.get_placeholder_heatmap()
-                self._heatmap_update_requests.add(surface)
-            self._fill_gaze_on_surf_buffer()
+            self._heatmap_update_requests.update(self.surfaces)
+            self._update_surface_heatmaps()
 
         elif notification["subject"] == "surface_tracker.surfaces_changed":
             for surface in self.surfaces:
@@ -600,9 +631,12 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
             notification["subject"]
             == "surface_tracker_offline._should_fill_gaze_on_surf_buffer"
         ):
-            self._fill_gaze_on_surf_buffer()
+            surfaces, self._surfaces_to_remap = self._surfaces_to_remap, set()
+            if surfaces:
+                self._fill_gaze_on_surf_buffer(surfaces)
 
     def _on_gaze_positions_changed(self):
+        self._heatmap_accumulators.clear()
         for surface in self.surfaces:
             self._heatmap_update_requests.add(surface)
             surface.within_surface_heatmap = surface.get_placeholder_heatmap()
@@ -610,7 +644,10 @@ class Surface_Tracker_Offline(Observable, Surface_Tracker, Plugin):
 
     def on_surface_change(self, surface):
         self.save_surface_definitions_to_file()
+        # the gaze of the old surface definition must not be used until remapped
+        self._heatmap_accumulators.pop(surface, None)
         self._heatmap_update_requests.add(surface)
+        self._surfaces_to_remap.add(surface)
         self._debounced_fill_gaze_on_surf_buffer()
 
     def _debounced_fill_gaze_on_surf_buffer(self):
@@ -23,6 +23,13 @@ from pyglui.cygl.utils import RGBA, mix_smooth
 
 
 class System_Graphs(System_Plugin_Base):
+    """Displays CPU load, world FPS and pupil confidences as graphs.
+
+    The optional plugin timing graph shows the duration of the `recent_events()` call
+    of the plugin that takes the longest on average. Start the plugin with
+    `{"show_plugin_timing": True}` as arguments to show it.
+    """
+
     icon_chr = chr(0xE01D)
     icon_font = "pupil_icons"
 
@@ -33,6 +40,7 @@ class System_Graphs(System_Plugin_Base):
         show_fps=True,
         show_conf0=True,
         show_conf1=True,
+        show_plugin_timing=False,
         **kwargs,
     ):
         super().__init__(g_pool)
@@ -40,6 +48,7 @@ class System_Graphs(System_Plugin_Base):
         self.show_fps = show_fps
         self.show_conf0 = show_conf0
         self.show_conf1 = show_conf1
+        self.show_plugin_timing = show_plugin_timing
         self.conf_grad_limits = 0.0, 1.0
         self.ts = None
         self.idx = None
@@ -69,6 +78,11 @@ class System_Graphs(System_Plugin_Base):
         self.conf1_graph.update_rate = 5
         self.conf1_graph.label = "id1 conf: %0.2f"
 
+        self.plugin_timing_graph = graph.Bar_Graph(max_val=1000 / 30)
+        self.plugin_timing_graph.pos = (500, 50)
+        self.plugin_timing_graph.update_rate = 5
+        self.plugin_timing_graph.label = "%0.1f ms"
+
         self.conf_grad = (
             RGBA(1.0, 0.0, 0.0, self.conf0_graph.color[3]),
             self.conf0_graph.color,
@@ -84,11 +98,13 @@ class System_Graphs(System_Plugin_Base):
         self.fps_graph.scale = content_scale
         self.conf0_graph.scale = content_scale
         self.conf1_graph.scale = content_scale
+        self.plugin_timing_graph.scale = content_scale
 
         self.cpu_graph.adjust_window_size(*fb_size)
         self.fps_graph.adjust_window_size(*fb_size)
         self.conf0_graph.adjust_window_size(*fb_size)
         self.conf1_graph.adjust_window_size(*fb_size)
+        self.plugin_timing_graph.adjust_window_size(*fb_size)
 
     def gl_display(self):
         if self.show_cpu:
@@ -113,11 +129,19 @@ class System_Graphs(System_Plugin_Base):
                 self.conf_grad_limits[1],
             )
             self.conf1_graph.draw()
+        if self.show_plugin_timing:
+            self.plugin_timing_graph.draw()
 
     def recent_events(self, events):
         # update cpu graph
         self.cpu_graph.update()
 
+        if self.show_plugin_timing:
+            slowest = self.g_pool.plugins.timing.slowest_plugins("recent_events")
+            for plugin_name, histogram in slowest:
+                self.plugin_timing_graph.label = f"{plugin_name} %0.1f ms"
+                self.plugin_timing_graph.add(histogram.last * 1000)
+
         # update pupil graphs
         if "frame" not in events or self.idx != events["frame"].index:
             for p in events["pupil"]:
@@ -153,6 +177,7 @@ class System_Graphs(System_Plugin_Base):
         self.fps_graph = None
         self.conf0_graph = None
         self.conf1_graph = None
+        self.plugin_timing_graph = None
 
     def get_init_dict(self):
         return {
@@ -160,4 +185,5 @@ class System_Graphs(System_Plugin_Base):
             "show_fps": self.show_fps,
             "show_conf0": self.show_conf0,
             "show_conf1": self.show_conf1,
+            "show_plugin_timing": self.show_plugin_timing,
         }
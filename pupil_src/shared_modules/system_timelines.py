@@ -17,11 +17,11 @@ from observable import Observable
 from plugin import System_Plugin_Base
 from pyglui import ui
 from pyglui.pyfontstash import fontstash as fs
+from timeline_pyramid import Min_Max_Pyramid, draw_envelope
 
 COLOR_LEGEND_WORLD = cygl_utils.RGBA(0.66, 0.86, 0.461, 1.0)
 COLOR_LEGEND_EYE_RIGHT = cygl_utils.RGBA(0.9844, 0.5938, 0.4023, 1.0)
 COLOR_LEGEND_EYE_LEFT = cygl_utils.RGBA(0.668, 0.6133, 0.9453, 1.0)
-NUMBER_SAMPLES_TIMELINE = 4000
 
 
 class System_Timelines(Observable, System_Plugin_Base):
@@ -29,6 +29,7 @@ class System_Timelines(Observable, System_Plugin_Base):
         super().__init__(g_pool)
         self.show_world_fps = show_world_fps
         self.show_eye_fps = show_eye_fps
+        self.cache = None
         self.cache_fps_data()
         self.pupil_positions_listener = data_changed.Listener(
             "pupil_positions", g_pool.rec_dir, plugin=self
@@ -52,38 +53,44 @@ class System_Timelines(Observable, System_Plugin_Base):
         self.fps_timeline = None
 
     def cache_fps_data(self):
-        fps_world = self.calculate_fps(self.g_pool.timestamps)
-        fps_eye0 = self.calculate_fps(self.g_pool.pupil_positions[0, ...].timestamps)
-        fps_eye1 = self.calculate_fps(self.g_pool.pupil_positions[1, ...].timestamps)
-
         t0, t1 = self.g_pool.timestamps[0], self.g_pool.timestamps[-1]
-        self.cache = {
-            "world": fps_world,
-            "eye0": fps_eye0,
-            "eye1": fps_eye1,
-            "xlim": [t0, t1],
-            "ylim": [0, 210],
-        }
+        if self.cache is None or self.cache["xlim"] != [t0, t1]:
+            self.cache = {
+                "world": Min_Max_Pyramid(t0, t1),
+                "eye0": Min_Max_Pyramid(t0, t1),
+                "eye1": Min_Max_Pyramid(t0, t1),
+                "xlim": [t0, t1],
+                "ylim": [0, 210],
+            }
+        # pyramids only rebuild the ranges that changed
+        self.cache["world"].update(*self.calculate_fps(self.g_pool.timestamps))
+        self.cache["eye0"].update(
+            *self.calculate_fps(self.g_pool.pupil_positions[0, ...].timestamps)
+        )
+        self.cache["eye1"].update(
+            *self.calculate_fps(self.g_pool.pupil_positions[1, ...].timestamps)
+        )
 
     def calculate_fps(self, timestamps):
         if len(timestamps) > 1:
             timestamps = np.unique(timestamps)
             fps = 1.0 / np.diff(timestamps)
-            return tuple(zip(timestamps, fps))
-        return ()
+            return timestamps[1:], fps
+        return np.empty(0), np.empty(0)
 
     def draw_fps(self, width, height, scale):
-        with gl_utils.Coord_System(*self.cache["xlim"], *self.cache["ylim"]):
+        xlim = self.cache["xlim"]
+        with gl_utils.Coord_System(*xlim, *self.cache["ylim"]):
             if self.show_world_fps:
-                cygl_utils.draw_points(
-                    self.cache["world"], size=2 * scale, color=COLOR_LEGEND_WORLD
+                draw_envelope(
+                    self.cache["world"], *xlim, width, COLOR_LEGEND_WORLD, scale
                 )
             if self.show_eye_fps:
-                cygl_utils.draw_points(
-                    self.cache["eye0"], size=2 * scale, color=COLOR_LEGEND_EYE_RIGHT
+                draw_envelope(
+                    self.cache["eye0"], *xlim, width, COLOR_LEGEND_EYE_RIGHT, scale
                 )
-                cygl_utils.draw_points(
-                    self.cache["eye1"], size=2 * scale, color=COLOR_LEGEND_EYE_LEFT
+                draw_envelope(
+                    self.cache["eye1"], *xlim, width, COLOR_LEGEND_EYE_LEFT, scale
                 )
 
     def draw_fps_legend(self, width, height, scale):
@@ -11,7 +11,12 @@ See COPYING and COPYING.LESSER for license details.
 import inspect
 
 from tasklib.background.patches import IPCLoggingPatch, KeyboardInterruptHandlerPatch
-from tasklib.background.task import BackgroundGeneratorFunction, BackgroundRoutine
+from tasklib.background.task import (
+    DEFAULT_YIELD_BATCH_LATENCY,
+    DEFAULT_YIELD_BATCH_SIZE,
+    BackgroundGeneratorFunction,
+    BackgroundRoutine,
+)
 
 
 def create(
@@ -21,6 +26,8 @@ def create(
     args=None,
     kwargs=None,
     patches=None,
+    yield_batch_size=DEFAULT_YIELD_BATCH_SIZE,
+    yield_batch_latency=DEFAULT_YIELD_BATCH_LATENCY,
 ):
     """
     Creates the right background task for your type of task.
@@ -51,6 +58,8 @@ def create(
             args,
             kwargs,
             patches,
+            yield_batch_size,
+            yield_batch_latency,
         )
     elif inspect.isroutine(routine_or_generator_function):
         return BackgroundRoutine(
@@ -10,6 +10,9 @@ See COPYING and COPYING.LESSER for license details.
 """
 import abc
 import multiprocessing as mp
+import pickle
+import threading
+import time
 import typing
 from collections import namedtuple
 
@@ -17,11 +20,59 @@ from tasklib.background.patches import Patch
 from tasklib.background.shared_memory import SharedMemory
 from tasklib.interface import TaskInterface
 
-_TaskYieldSignal = namedtuple("_TaskYieldSignal", "datum")
+_TaskYieldBatchSignal = namedtuple("_TaskYieldBatchSignal", "data")
 _TaskCompletedSignal = namedtuple("_TaskCompletedSignal", "return_value")
 _TaskCanceledSignal = namedtuple("_TaskCanceledSignal", "")
 _TaskExceptionSignal = namedtuple("_TaskExceptionSignal", ["exception", "traceback"])
 
+# Yields of generator functions are sent to the foreground in batches of at most
+# this many results ...
+DEFAULT_YIELD_BATCH_SIZE = 500
+# ... or after this many seconds since the last batch was sent
+DEFAULT_YIELD_BATCH_LATENCY = 0.05
+
+
+class YieldStatistics:
+    """Throughput of the results received from a background generator function"""
+
+    def __init__(self):
+        self.yield_count = 0
+        self.batch_count = 0
+        self.received_bytes = 0
+        # seconds spent in the foreground for receiving and unpickling
+        self.receive_duration = 0.0
+        self.first_receive_time = None
+        self.last_receive_time = None
+
+    def add_batch(self, yield_count, received_bytes, receive_duration):
+        now = time.monotonic()
+        if self.first_receive_time is None:
+            self.first_receive_time = now
+        self.last_receive_time = now
+        self.yield_count += yield_count
+        self.batch_count += 1
+        self.received_bytes += received_bytes
+        self.receive_duration += receive_duration
+
+    @property
+    def mean_batch_size(self):
+        return self.yield_count / self.batch_count if self.batch_count else 0.0
+
+    @property
+    def yields_per_second(self):
+        if self.first_receive_time is None:
+            return 0.0
+        duration = self.last_receive_time - self.first_receive_time
+        return self.yield_count / duration if duration > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.yield_count} yields in {self.batch_count} batches, "
+            f"{self.received_bytes / 1e6:.1f} MB, "
+            f"{self.yields_per_second:.0f} yields/s, "
+            f"{self.receive_duration * 1e3:.1f} ms receiving"
+        )
+
 
 class BackgroundTask(TaskInterface, metaclass=abc.ABCMeta):
     def __init__(
@@ -39,6 +90,7 @@ class BackgroundTask(TaskInterface, metaclass=abc.ABCMeta):
         )
         self.process.daemon = True
         self.pipe_recv = pipe_recv
+        self.yield_statistics = YieldStatistics()
 
     @abc.abstractmethod
     def get_process(self, name, generator_function, args, kwargs, pipe_send):
@@ -75,7 +127,7 @@ class BackgroundTask(TaskInterface, metaclass=abc.ABCMeta):
         super().update()
 
         while self.pipe_recv.poll(timeout=0):
-            signal = self.pipe_recv.recv()
+            signal = self._receive_signal()
             if self._shared_memory.should_terminate_flag:
                 should_continue = self._handle_signal_if_canceled(signal)
             else:
@@ -83,6 +135,20 @@ class BackgroundTask(TaskInterface, metaclass=abc.ABCMeta):
             if not should_continue:
                 return
 
+    def _receive_signal(self):
+        start = time.perf_counter()
+        message = self.pipe_recv.recv_bytes()
+        signal = pickle.loads(message)
+        if isinstance(signal, _TaskYieldBatchSignal):
+            # results are pickled individually, see `_generator_wrapper`
+            signal = _TaskYieldBatchSignal(
+                [pickle.loads(datum) for datum in signal.data]
+            )
+            self.yield_statistics.add_batch(
+                len(signal.data), len(message), time.perf_counter() - start
+            )
+        return signal
+
     def _handle_signal_normally(self, signal):
         if isinstance(signal, _TaskCompletedSignal):
             self.on_completed(signal.return_value)
@@ -97,8 +163,12 @@ class BackgroundTask(TaskInterface, metaclass=abc.ABCMeta):
             # to the foreground (see https://stackoverflow.com/a/26096355)
             self.on_exception(signal.exception)
             return False
-        elif isinstance(signal, _TaskYieldSignal):
-            self.on_yield(signal.datum)
+        elif isinstance(signal, _TaskYieldBatchSignal):
+            for datum in signal.data:
+                if self._shared_memory.should_terminate_flag:
+                    # canceled by an observer, ignore the remaining results
+                    break
+                self.on_yield(datum)
             return True
         else:
             raise ValueError(
@@ -111,7 +181,7 @@ class BackgroundTask(TaskInterface, metaclass=abc.ABCMeta):
         ):
             self.on_canceled_or_killed()
             return False
-        elif isinstance(signal, _TaskYieldSignal):
+        elif isinstance(signal, _TaskYieldBatchSignal):
             return True
         else:
             raise ValueError(
@@ -120,6 +190,24 @@ class BackgroundTask(TaskInterface, metaclass=abc.ABCMeta):
 
 
 class BackgroundGeneratorFunction(BackgroundTask):
+    def __init__(
+        self,
+        name,
+        generator_function,
+        pass_shared_memory,
+        args,
+        kwargs,
+        patches,
+        yield_batch_size=DEFAULT_YIELD_BATCH_SIZE,
+        yield_batch_latency=DEFAULT_YIELD_BATCH_LATENCY,
+    ):
+        # needed by get_process(), which is called by the base class
+        self._yield_batch_size = yield_batch_size
+        self._yield_batch_latency = yield_batch_latency
+        super().__init__(
+            name, generator_function, pass_shared_memory, args, kwargs, patches
+        )
+
     def get_process(self, name, generator_function, args, kwargs, pipe_send, patches):
         wrapper_kwargs = {
             "pipe_send": pipe_send,
@@ -132,33 +220,104 @@ class BackgroundGeneratorFunction(BackgroundTask):
             "args": args,
             "kwargs": kwargs,
             "patches": patches,
+            "yield_batch_size": self._yield_batch_size,
+            "yield_batch_latency": self._yield_batch_latency,
         }
 
         return mp.Process(target=_generator_wrapper, name=name, kwargs=wrapper_kwargs)
 
 
 def _generator_wrapper(
-    pipe_send, generator_function, args, kwargs, patches, shared_memory
+    pipe_send,
+    generator_function,
+    args,
+    kwargs,
+    patches,
+    shared_memory,
+    yield_batch_size=DEFAULT_YIELD_BATCH_SIZE,
+    yield_batch_latency=DEFAULT_YIELD_BATCH_LATENCY,
 ):
-    """Executed in background, pipes results to foreground"""
+    """Executed in background, pipes results to foreground.
+
+    Results are sent in batches, once `yield_batch_size` results were yielded or
+    `yield_batch_latency` seconds passed since the last batch was sent. The latter
+    is checked by a separate thread, such that results are also sent while the
+    generator is busy computing the next one. Each result is pickled when it is
+    yielded, i.e. later changes to a yielded object are not sent.
+    """
+    batch = []
+    batch_lock = threading.Lock()
+    last_send_time = time.monotonic()
+    send_error = None
+    stop_flushing = threading.Event()
+
+    def send_batch():
+        # requires `batch_lock`, unless the flush thread was stopped
+        nonlocal batch, last_send_time, send_error
+        pending, batch = batch, []
+        last_send_time = time.monotonic()
+        if pending and send_error is None:
+            try:
+                pipe_send.send(_TaskYieldBatchSignal(pending))
+            except Exception as err:
+                send_error = err
+                raise
+
+    def flush_periodically():
+        timeout = yield_batch_latency
+        while not stop_flushing.wait(timeout):
+            with batch_lock:
+                timeout = last_send_time + yield_batch_latency - time.monotonic()
+                if timeout <= 0:
+                    timeout = yield_batch_latency
+                    try:
+                        send_batch()
+                    except Exception:
+                        return  # raised in the generator loop via `send_error`
+
+    flush_thread = threading.Thread(target=flush_periodically, daemon=True)
+
+    def stop_flush_thread():
+        stop_flushing.set()
+        if flush_thread.is_alive():
+            flush_thread.join()
+
     try:
         for patch in patches:
             patch.apply()
+        flush_thread.start()
         for datum in generator_function(*args, **kwargs):
             if shared_memory.should_terminate_flag:
+                stop_flush_thread()
+                send_batch()
                 pipe_send.send(_TaskCanceledSignal())
                 return  # will also trigger "finally"
-            pipe_send.send(_TaskYieldSignal(datum))
+            pickled = pickle.dumps(datum, protocol=pickle.HIGHEST_PROTOCOL)
+            with batch_lock:
+                if send_error is not None:
+                    raise send_error
+                batch.append(pickled)
+                if len(batch) >= yield_batch_size:
+                    send_batch()
     except Exception as e:
         import traceback
 
         from rich import print
 
         print(traceback.format_exc())
+        stop_flush_thread()
+        try:
+            # does not send again if sending a batch raised `e`
+            send_batch()
+        except Exception:
+            pass  # the exception is sent regardless
         pipe_send.send(_TaskExceptionSignal(e, traceback.format_exc()))
     else:
+        stop_flush_thread()
+        send_batch()
         pipe_send.send(_TaskCompletedSignal(return_value=None))
     finally:
+        stop_flush_thread()
         pipe_send.close()
 
 
@@ -212,6 +371,8 @@ class TypedBackgroundGeneratorFunction(
         kwargs: typing.Mapping[str, typing.Any] = {},
         pass_shared_memory: bool = False,
         patches: typing.Iterable[typing.Type[Patch]] = tuple(),
+        yield_batch_size: int = DEFAULT_YIELD_BATCH_SIZE,
+        yield_batch_latency: float = DEFAULT_YIELD_BATCH_LATENCY,
     ):
         super().__init__(
             name=name,
@@ -220,6 +381,8 @@ class TypedBackgroundGeneratorFunction(
             args=args,
             kwargs=kwargs,
             patches=patches,
+            yield_batch_size=yield_batch_size,
+            yield_batch_latency=yield_batch_latency,
         )
 
     def add_observers(
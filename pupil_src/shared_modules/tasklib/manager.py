@@ -12,6 +12,10 @@ See COPYING and COPYING.LESSER for license details.
 import logging
 
 import tasklib.background
+from tasklib.background.task import (
+    DEFAULT_YIELD_BATCH_LATENCY,
+    DEFAULT_YIELD_BATCH_SIZE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +51,8 @@ class PluginTaskManager:
         args=None,
         kwargs=None,
         patches=None,
+        yield_batch_size=DEFAULT_YIELD_BATCH_SIZE,
+        yield_batch_latency=DEFAULT_YIELD_BATCH_LATENCY,
     ):
         """
         Creates a managed background task.
@@ -74,6 +80,12 @@ class PluginTaskManager:
                 something in the environment of the new process (see
                 tasklib.background.patches.py).
                 Per default, the IPC logging is patched.
+            yield_batch_size (int): Generator functions only. Maximum number of
+                results that are sent to the foreground at once. Observers are still
+                notified about every single result.
+            yield_batch_latency (Number): Generator functions only. Seconds after
+                which results are sent even if the batch is not full yet. Statistics
+                about the sent results are available as `task.yield_statistics`.
 
         Returns:
             A new task with base class TaskInterface.
@@ -86,6 +98,8 @@ class PluginTaskManager:
             args,
             kwargs,
             patches,
+            yield_batch_size,
+            yield_batch_latency,
         )
         self._tasks.append(task)
         return task
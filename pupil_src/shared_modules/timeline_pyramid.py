@@ -0,0 +1,240 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import typing as T
+
+import numpy as np
+import OpenGL.GL as gl
+import pyglui.cygl.utils as cygl_utils
+
+
+class Envelope(T.NamedTuple):
+    """Signal summary with one entry per non-empty pixel"""
+
+    timestamps: np.ndarray  # pixel centers
+    mins: np.ndarray
+    maxs: np.ndarray
+    means: np.ndarray
+
+
+class Min_Max_Pyramid:
+    """Multi-resolution min/max/mean summary of a signal for drawing timelines.
+
+    The time range `[start, end]` is divided into `num_bins` equally long bins,
+    which store min, max, sum and count of the samples falling into them. Each
+    further level halves the number of bins by merging neighboring bins.
+
+    `envelope()` summarizes the signal per pixel by picking the level with one to two
+    bins per pixel, such that short spikes are never skipped. `update()` only
+    rebuilds bins that contain changed samples.
+    """
+
+    def __init__(self, start: float, end: float, num_bins: int = 2**16):
+        if end <= start:
+            end = start + 1.0
+        self.start = float(start)
+        self.end = float(end)
+        self.bin_width = (self.end - self.start) / num_bins
+        self.num_bins = num_bins
+
+        self._mins = []
+        self._maxs = []
+        self._sums = []
+        self._counts = []
+        level_size = num_bins
+        while True:
+            self._mins.append(np.full(level_size, np.inf))
+            self._maxs.append(np.full(level_size, -np.inf))
+            self._sums.append(np.zeros(level_size))
+            self._counts.append(np.zeros(level_size, dtype=np.int64))
+            if level_size == 1:
+                break
+            level_size = (level_size + 1) // 2
+
+        self._timestamps = np.empty(0)
+        self._values = np.empty(0)
+
+    @classmethod
+    def from_signal(cls, start, end, timestamps, values, **kwargs):
+        pyramid = cls(start, end, **kwargs)
+        pyramid.update(timestamps, values)
+        return pyramid
+
+    @property
+    def num_levels(self) -> int:
+        return len(self._mins)
+
+    @property
+    def limits(self) -> T.Tuple[float, float]:
+        """Min and max of all samples, or (0, 1) if there are none"""
+        if not self._counts[-1][0]:
+            return 0.0, 1.0
+        return float(self._mins[-1][0]), float(self._maxs[-1][0])
+
+    def update(self, timestamps, values):
+        """Replaces the signal and rebuilds the bins of all changed samples.
+
+        Timestamps need to be sorted. Non-finite values and samples outside of the
+        time range are ignored.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        valid = np.isfinite(values) & (timestamps >= self.start)
+        valid &= timestamps <= self.end
+        if not valid.all():
+            timestamps = timestamps[valid]
+            values = values[valid]
+
+        changed_range = self._changed_time_range(timestamps, values)
+        self._timestamps = timestamps
+        self._values = values
+        if changed_range is not None:
+            first_bin, last_bin = self._bin_indices(np.array(changed_range))
+            # include neighboring bins in case of rounding errors at the bin edges
+            first_bin = max(first_bin - 1, 0)
+            stop_bin = min(last_bin + 2, self.num_bins)
+            self._rebuild_bins(first_bin, stop_bin)
+
+    def envelope(self, start: float, end: float, num_pixels: int) -> Envelope:
+        """Min, max and mean of the samples within each of `num_pixels` pixels"""
+        num_pixels = max(int(num_pixels), 1)
+        pixel_width = (end - start) / num_pixels
+        level = int(np.log2(max(pixel_width / self.bin_width, 1.0)))
+        level = min(level, self.num_levels - 1)
+        bin_width = self.bin_width * 2**level
+        counts = self._counts[level]
+
+        first_bin = max(int(np.floor((start - self.start) / bin_width)), 0)
+        stop_bin = min(int(np.ceil((end - self.start) / bin_width)), len(counts))
+        if stop_bin <= first_bin:
+            empty = np.empty(0)
+            return Envelope(empty, empty, empty, empty)
+
+        bin_centers = self.start + (np.arange(first_bin, stop_bin) + 0.5) * bin_width
+        pixels = np.floor((bin_centers - start) / pixel_width).astype(np.int64)
+        np.clip(pixels, 0, num_pixels - 1, out=pixels)
+        group_starts = np.flatnonzero(np.diff(pixels, prepend=-1))
+        pixels = pixels[group_starts]
+
+        bins = slice(first_bin, stop_bin)
+        mins = np.minimum.reduceat(self._mins[level][bins], group_starts)
+        maxs = np.maximum.reduceat(self._maxs[level][bins], group_starts)
+        sums = np.add.reduceat(self._sums[level][bins], group_starts)
+        counts = np.add.reduceat(counts[bins], group_starts)
+
+        non_empty = counts > 0
+        return Envelope(
+            timestamps=start + (pixels[non_empty] + 0.5) * pixel_width,
+            mins=mins[non_empty],
+            maxs=maxs[non_empty],
+            means=sums[non_empty] / counts[non_empty],
+        )
+
+    def _changed_time_range(self, timestamps, values):
+        """Time range of samples that differ from the current signal, or None"""
+        old_timestamps, old_values = self._timestamps, self._values
+        common_len = min(len(timestamps), len(old_timestamps))
+
+        def num_equal(old_ts, old_val, new_ts, new_val):
+            differs = (old_ts != new_ts) | (old_val != new_val)
+            return int(np.argmax(differs)) if differs.any() else len(differs)
+
+        prefix = num_equal(
+            old_timestamps[:common_len],
+            old_values[:common_len],
+            timestamps[:common_len],
+            values[:common_len],
+        )
+        if prefix == common_len and len(timestamps) == len(old_timestamps):
+            return None
+
+        suffix_len = common_len - prefix
+        suffix = num_equal(
+            old_timestamps[::-1][:suffix_len],
+            old_values[::-1][:suffix_len],
+            timestamps[::-1][:suffix_len],
+            values[::-1][:suffix_len],
+        )
+        changed_timestamps = np.concatenate(
+            [
+                old_timestamps[prefix : len(old_timestamps) - suffix],
+                timestamps[prefix : len(timestamps) - suffix],
+            ]
+        )
+        return changed_timestamps.min(), changed_timestamps.max()
+
+    def _bin_indices(self, timestamps):
+        bin_indices = np.floor((timestamps - self.start) / self.bin_width)
+        return np.clip(bin_indices, 0, self.num_bins - 1).astype(np.int64)
+
+    def _rebuild_bins(self, first_bin: int, stop_bin: int):
+        bin_edges = self.start + np.arange(first_bin, stop_bin + 1) * self.bin_width
+        sample_bounds = np.searchsorted(self._timestamps, bin_edges, side="left")
+        if stop_bin == self.num_bins:
+            # the last bin includes the end of the time range
+            sample_bounds[-1] = len(self._timestamps)
+        counts = np.diff(sample_bounds)
+
+        bins = slice(first_bin, stop_bin)
+        self._counts[0][bins] = counts
+        self._mins[0][bins] = np.inf
+        self._maxs[0][bins] = -np.inf
+        self._sums[0][bins] = 0.0
+
+        non_empty = np.flatnonzero(counts)
+        if len(non_empty):
+            sample_starts = sample_bounds[non_empty]
+            values = self._values[sample_starts[0] : sample_bounds[non_empty[-1] + 1]]
+            sample_starts -= sample_starts[0]
+            non_empty += first_bin
+            self._mins[0][non_empty] = np.minimum.reduceat(values, sample_starts)
+            self._maxs[0][non_empty] = np.maximum.reduceat(values, sample_starts)
+            self._sums[0][non_empty] = np.add.reduceat(values, sample_starts)
+
+        for level in range(1, self.num_levels):
+            first_bin //= 2
+            stop_bin = (stop_bin + 1) // 2
+            self._merge_bins(level, first_bin, stop_bin)
+
+    def _merge_bins(self, level: int, first_bin: int, stop_bin: int):
+        lower_size = len(self._counts[level - 1])
+        left = np.arange(2 * first_bin, 2 * stop_bin, 2)
+        # an odd last bin has no right neighbor and is merged with itself
+        right = np.minimum(left + 1, lower_size - 1)
+        has_right = left + 1 < lower_size
+
+        bins = slice(first_bin, stop_bin)
+        for arrays, merge in ((self._mins, np.minimum), (self._maxs, np.maximum)):
+            lower = arrays[level - 1]
+            arrays[level][bins] = merge(lower[left], lower[right])
+        for arrays in (self._sums, self._counts):
+            lower = arrays[level - 1]
+            arrays[level][bins] = lower[left] + np.where(has_right, lower[right], 0)
+
+
+def draw_envelope(
+    pyramid: Min_Max_Pyramid, start, end, num_pixels, color, scale: float = 1.0
+):
+    """Draws min/max of each pixel as vertical line and the mean as point.
+
+    Needs to be called within a `gl_utils.Coord_System` with time as x axis.
+    """
+    envelope = pyramid.envelope(start, end, num_pixels)
+    if not len(envelope.timestamps):
+        return
+    lines = np.empty((2 * len(envelope.timestamps), 2))
+    lines[0::2, 0] = lines[1::2, 0] = envelope.timestamps
+    lines[0::2, 1] = envelope.mins
+    lines[1::2, 1] = envelope.maxs
+    cygl_utils.draw_polyline(
+        lines.tolist(), color=color, line_type=gl.GL_LINES, thickness=scale
+    )
+    points = np.column_stack([envelope.timestamps, envelope.means])
+    cygl_utils.draw_points(points.tolist(), size=2.0 * scale, color=color)
@@ -9,13 +9,18 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 # logging
+import functools
 import logging
 import os
 import os.path
+import threading
 import typing as T
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from multiprocessing import cpu_count
 from time import monotonic, sleep
+from types import SimpleNamespace
 
 import av
 import numpy as np
@@ -109,6 +114,176 @@ class FakeFrame:
         return self.img[:, :, 0]  # return first channel
 
 
+class Frame_Cache:
+    """Thread-safe LRU cache of decoded frames, keyed by frame index.
+
+    The cache is bounded by the estimated memory of the decoded frames it holds.
+    Only real frames are cached; fake frames are cheap to create and are ignored.
+    Frames are returned as copies that share the decoded data but not the derived
+    images, such that consumers can not interfere with each other. The gray image
+    is kept as a copy, since it can be a view into the decoded frame buffer.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._frames = OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def frame_bytes(frame) -> int:
+        """Estimated memory of the decoded data and the gray image of a frame"""
+        planes_bytes = sum(plane.buffer_size for plane in frame._av_frame.planes)
+        return planes_bytes + frame.width * frame.height
+
+    @staticmethod
+    def estimated_frame_bytes(width: int, height: int) -> int:
+        """Estimated memory of a decoded yuv420 frame of the given size"""
+        return width * height * 3 // 2 + width * height
+
+    @property
+    def num_bytes(self) -> int:
+        return self._num_bytes
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._frames
+
+    def get(self, index: int):
+        """Copy of the cached frame at `index`, or None"""
+        with self._lock:
+            try:
+                frame, _ = self._frames[index]
+            except KeyError:
+                return None
+            self._frames.move_to_end(index)
+        copy = frame.copy()
+        copy._gray = frame._gray.copy()
+        return copy
+
+    def put(self, frame):
+        if frame.is_fake:
+            return
+        num_bytes = self.frame_bytes(frame)
+        if num_bytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._frames.pop(frame.index, None)
+            if previous is not None:
+                self._num_bytes -= previous[1]
+            self._frames[frame.index] = self._cache_copy(frame), num_bytes
+            self._num_bytes += num_bytes
+            while self._num_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._frames.popitem(last=False)
+                self._num_bytes -= evicted_bytes
+
+    @staticmethod
+    def _cache_copy(frame):
+        cached = frame.copy()
+        # the gray image can be a view into the decoded frame buffer
+        cached._gray = np.array(frame.gray)
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._num_bytes = 0
+
+
+class Frame_Read_Ahead:
+    """Decodes frames around the playhead into a `Frame_Cache` in the background.
+
+    Decoding happens on a separate thread with its own source, created by
+    `source_factory`. After each playhead update, the thread first decodes up to
+    `frames_ahead` frames after the playhead and then up to `frames_behind` frames
+    before it, skipping frames that are already cached. Work on an outdated
+    playhead is abandoned as soon as the playhead moves.
+    """
+
+    def __init__(
+        self,
+        source_factory: T.Callable,
+        frame_cache: Frame_Cache,
+        frames_ahead: int,
+        frames_behind: int,
+    ):
+        self.source_factory = source_factory
+        self.frame_cache = frame_cache
+        self.frames_ahead = frames_ahead
+        self.frames_behind = frames_behind
+        self._playhead = None
+        self._should_stop = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="Frame_Read_Ahead", daemon=True
+        )
+        self._thread.start()
+
+    def update_playhead(self, frame_idx: int):
+        with self._condition:
+            if frame_idx != self._playhead:
+                self._playhead = frame_idx
+                self._condition.notify()
+
+    def stop(self):
+        """Signal the thread to stop, it closes its source on exit"""
+        with self._condition:
+            self._should_stop = True
+            self._condition.notify()
+
+    def _wait_for_playhead(self, previous):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._should_stop or self._playhead != previous
+            )
+            return None if self._should_stop else self._playhead
+
+    def _is_outdated(self, playhead) -> bool:
+        return self._should_stop or self._playhead != playhead
+
+    def _run(self):
+        try:
+            source = self.source_factory()
+        except Exception:
+            logger.debug("Could not open source for read-ahead", exc_info=True)
+            return
+
+        try:
+            playhead = None
+            while True:
+                playhead = self._wait_for_playhead(playhead)
+                if playhead is None:
+                    break
+                frame_count = source.get_frame_count()
+                stop_ahead = min(playhead + 1 + self.frames_ahead, frame_count)
+                start_behind = max(playhead - self.frames_behind, 0)
+                # Reading ahead is more important for playback, read behind after
+                for start, stop in (
+                    (playhead + 1, stop_ahead),
+                    (start_behind, playhead),
+                ):
+                    self._read_range(source, start, stop, playhead)
+        except Exception:
+            logger.debug("Read-ahead stopped unexpectedly", exc_info=True)
+        finally:
+            source.cleanup()
+
+    def _read_range(self, source, start: int, stop: int, playhead: int):
+        for frame_idx in range(start, stop):
+            if self._is_outdated(playhead):
+                return
+            if frame_idx in self.frame_cache:
+                continue
+            try:
+                if frame_idx != source.target_frame_idx:
+                    source.seek_to_frame(frame_idx)
+                self.frame_cache.put(source.get_frame())
+            except (EndofVideoError, FileSeekError):
+                return
+
+
 class Decoder(ABC):
     """
     Abstract base class for stream decoders.
@@ -212,8 +387,15 @@ class File_Source(Playback_Source, Base_Source):
         buffered_decoding (bool): use buffered decode
         fill_gaps (bool): fill gaps with static frames
         show_plugin_menu (bool): enable to show regular capture UI with source selection
+        frame_cache_mb (int): memory budget of the decoded frame cache, 0 to disable
+        read_ahead (bool): decode frames around the playhead in the background,
+            requires the frame cache
     """
 
+    # Fractions of the frame cache that the read-ahead fills around the playhead
+    READ_AHEAD_CACHE_FRACTION = 0.5
+    READ_BEHIND_CACHE_FRACTION = 0.25
+
     def __init__(
         self,
         g_pool,
@@ -222,6 +404,8 @@ class File_Source(Playback_Source, Base_Source):
         buffered_decoding=False,
         fill_gaps=False,
         show_plugin_menu=False,
+        frame_cache_mb=0,
+        read_ahead=False,
         *args,
         **kwargs,
     ):
@@ -247,6 +431,12 @@ class File_Source(Playback_Source, Base_Source):
             # TODO: where does the fallback framerate of 1/20 come from?
             self._frame_rate = 20
         self.buffering = buffered_decoding
+        self.frame_cache_mb = frame_cache_mb
+        self.read_ahead = read_ahead
+        self._frame_cache = None
+        if frame_cache_mb > 0:
+            self._frame_cache = Frame_Cache(max_bytes=frame_cache_mb * 1024 * 1024)
+        self._read_ahead = None
         # Load video split for first frame
         self.reset_video()
         self._intrinsics = Camera_Model.from_file(rec, set_name, self.frame_size)
@@ -313,6 +503,13 @@ class File_Source(Playback_Source, Base_Source):
         self.video_stream.seek(0)
         self.current_container_index = container_index
         self.frame_iterator = self.video_stream.get_frame_iterator()
+        # the decoder decodes from the first frame of the container
+        self._decoder_next_frame_idx = None
+        container_frame_idc = np.flatnonzero(
+            self.videoset.lookup.container_idx == container_index
+        )
+        if container_index > -1 and container_frame_idc.size:
+            self._decoder_next_frame_idx = int(container_frame_idc[0])
 
     def _get_streams(self, container, should_buffer):
         """Get Video stream from containers."""
@@ -367,6 +564,8 @@ class File_Source(Playback_Source, Base_Source):
             buffered_decoding=self.buffering,
             fill_gaps=self.fill_gaps,
             show_plugin_menu=self.show_plugin_menu,
+            frame_cache_mb=self.frame_cache_mb,
+            read_ahead=self.read_ahead,
         )
 
     @property
@@ -391,9 +590,37 @@ class File_Source(Playback_Source, Base_Source):
         if target_entry.container_idx == -1:
             return self._get_fake_frame_and_advance(target_entry)
 
+        frame = self._get_cached_frame_and_advance()
+        if frame is None:
+            frame = self._decode_frame_and_advance(target_entry)
+            if self._frame_cache is not None:
+                self._frame_cache.put(frame)
+        self._update_read_ahead()
+        return frame
+
+    def _get_cached_frame_and_advance(self):
+        if self._frame_cache is None:
+            return None
+        frame = self._frame_cache.get(self.target_frame_idx)
+        if frame is not None:
+            self.current_frame_idx = self.target_frame_idx
+            self.target_frame_idx += 1
+        return frame
+
+    def _decode_frame_and_advance(self, target_entry):
         if target_entry.container_idx != self.current_container_index:
             # Contained index changed, need to load other video split
             self._setup_video(target_entry.container_idx)
+        elif self._decoder_next_frame_idx != self.target_frame_idx:
+            # Frames served from the cache do not move the decoder, and seeks to
+            # cached frames do not seek it. Seek it if it would not decode the target
+            # frame next, or if its position is unknown.
+            try:
+                self._seek_decoder(target_entry)
+            except FileSeekError:
+                logger.debug("Could not seek decoder to uncached frame.")
+                raise EndofVideoError
+            self._decoder_next_frame_idx = self.target_frame_idx
 
         # advance frame iterator until we hit the target frame
         av_frame = None
@@ -424,6 +651,7 @@ class File_Source(Playback_Source, Base_Source):
         # update indices, we know that we advanced until target_frame_index!
         self.current_frame_idx = self.target_frame_idx
         self.target_frame_idx += 1
+        self._decoder_next_frame_idx = self.current_frame_idx + 1
         return Frame(
             timestamp=target_entry.timestamp,
             av_frame=av_frame,
@@ -534,6 +762,16 @@ class File_Source(Playback_Source, Base_Source):
         except IndexError:
             logger.warning("Seeking to invalid position!")
             return
+        if self._frame_cache is None or seek_pos not in self._frame_cache:
+            # Cached frames do not need the decoder, it is seeked lazily in
+            # get_frame() when an uncached frame is requested.
+            self._seek_decoder(target_entry)
+            self._decoder_next_frame_idx = seek_pos
+        self.finished_sleep = 0
+        self.target_frame_idx = seek_pos
+        self._update_read_ahead(seek_pos)
+
+    def _seek_decoder(self, target_entry):
         if target_entry.container_idx > -1:
             if target_entry.container_idx != self.current_container_index:
                 self._setup_video(target_entry.container_idx)
@@ -548,8 +786,34 @@ class File_Source(Playback_Source, Base_Source):
             self.video_stream.seek(0)
         # need to re-initialize frame_iterator at the new seek position
         self.frame_iterator = self.video_stream.get_frame_iterator()
-        self.finished_sleep = 0
-        self.target_frame_idx = seek_pos
+        # position unknown until the caller sets the seek target
+        self._decoder_next_frame_idx = None
+
+    def _update_read_ahead(self, playhead=None):
+        if not self.read_ahead or self._frame_cache is None or not self.initialised:
+            return
+        if self._read_ahead is None:
+            frame_bytes = Frame_Cache.estimated_frame_bytes(*self.frame_size)
+            cache_frames = self._frame_cache.max_bytes // max(frame_bytes, 1)
+            # The factory must not reference self, such that sources that are not
+            # cleaned up explicitly can still be collected and stop the thread.
+            source_factory = functools.partial(
+                File_Source,
+                SimpleNamespace(),
+                source_path=self.source_path,
+                timing=None,
+                fill_gaps=self.fill_gaps,
+            )
+            self._read_ahead = Frame_Read_Ahead(
+                source_factory=source_factory,
+                frame_cache=self._frame_cache,
+                frames_ahead=int(cache_frames * self.READ_AHEAD_CACHE_FRACTION),
+                frames_behind=int(cache_frames * self.READ_BEHIND_CACHE_FRACTION),
+            )
+            self._stop_read_ahead = weakref.finalize(self, self._read_ahead.stop)
+        if playhead is None:
+            playhead = self.current_frame_idx
+        self._read_ahead.update_playhead(playhead)
 
     def on_notify(self, notification):
         super().on_notify(notification)
@@ -624,6 +888,9 @@ class File_Source(Playback_Source, Base_Source):
         return ui_elements
 
     def cleanup(self):
+        if self._read_ahead is not None:
+            self._stop_read_ahead()
+            self._read_ahead = None
         try:
             self.video_stream.cleanup()
         except AttributeError:
@@ -17,6 +17,7 @@ import numpy.typing as npt
 import zmq_tools
 from camera_models import Dummy_Camera, Radial_Dist_Camera
 from pyglui import ui
+from shared_frame_buffer import Shared_Frame_Reader
 from typing_extensions import Literal, NotRequired, TypedDict
 from video_capture.base_backend import Base_Source
 
@@ -24,7 +25,9 @@ logger = logging.getLogger(__name__)
 
 
 class SerializedFrame(TypedDict):
-    __raw_data__: List[bytes]
+    # either the frame data or a `Shared_Frame_Writer` descriptor
+    __raw_data__: NotRequired[List[bytes]]
+    shared_memory: NotRequired[dict]
     timestamp: float
     index: int
     width: int
@@ -60,6 +63,8 @@ class Uint8BufferFrame(abc.ABC):
     def interpret_buffer(
         self, buffer: bytes, width: int, height: int
     ) -> npt.NDArray[np.uint8]:
+        if isinstance(buffer, np.ndarray):
+            return buffer.reshape(height, width, self.depth)
         return np.fromstring(buffer, dtype=np.uint8).reshape(height, width, self.depth)
 
     @property
@@ -167,6 +172,7 @@ class HMD_Streaming_Source(Base_Source):
         self.distortion_coeffs = np.zeros((1, 5))
         self.__topics = topics
         self.__hwm = hwm
+        self._shared_frame_reader = Shared_Frame_Reader()
         self.frame_sub = zmq_tools.Msg_Receiver(
             self.g_pool.zmq_ctx,
             self.g_pool.ipc_sub_url,
@@ -231,14 +237,33 @@ class HMD_Streaming_Source(Base_Source):
             self.distortion_coeffs = distortion_coeffs
             self._intrinsics = None  # resets intrinsics
 
+        if "shared_memory" in frame_data:
+            buffer = self._read_shared_frame(frame_data["shared_memory"])
+            if buffer is None:
+                return None
+        else:
+            buffer = frame_data["__raw_data__"][0]
+
         return frame_class(
-            frame_data["__raw_data__"][0],
+            buffer,
             frame_data["timestamp"],
             frame_data["index"],
             frame_data["width"],
             frame_data["height"],
         )
 
+    def _read_shared_frame(self, descriptor) -> Optional[npt.NDArray[np.uint8]]:
+        frame_view = self._shared_frame_reader.read(descriptor)
+        if frame_view is None:
+            logger.debug("Dropped frame that was overwritten in shared memory")
+            return None
+        # frames are kept longer than the writer keeps them in shared memory
+        buffer = np.array(frame_view)
+        if not self._shared_frame_reader.is_current(descriptor):
+            logger.debug("Dropped frame that was overwritten while copying")
+            return None
+        return buffer
+
     @property
     def frame_size(self):
         return (
@@ -8,6 +8,7 @@ Lesser General Public License (LGPL v3.0).
 See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
+import itertools
 import logging
 import os
 import typing as T
@@ -222,12 +223,51 @@ class Video:
         self.ts = self._fix_negative_time_jumps(self.ts)
 
     def load_pts(self, container):
-        packets = container.demux(video=0)
-        # last pts is invalid
-        self._pts = np.array([packet.pts for packet in packets][:-1])
+        pts = self._pts_from_index(container)
+        if pts is None:
+            pts = self._pts_from_demux(container)
+        self._pts = pts
         self._pts.sort()
         return self._pts
 
+    @staticmethod
+    def _pts_from_index(container) -> T.Optional[np.ndarray]:
+        """Reads pts from the container's index without demuxing the video.
+
+        Index entries hold decoding timestamps. They are only used if they are
+        complete and agree with the pts of the first packets, i.e. if the stream has
+        no reordered frames. Returns None otherwise.
+        """
+        # Number of packets that are demuxed to verify the index
+        num_verification_packets = 32
+        try:
+            stream = container.streams.video[0]
+            entries = stream.index_entries
+        except (AttributeError, IndexError):
+            # index entries are not available in PyAV < 14
+            return None
+        num_entries = len(entries)
+        if num_entries == 0 or stream.frames != num_entries:
+            return None
+        timestamps = np.fromiter(
+            (entry.timestamp for entry in entries), dtype=np.int64, count=num_entries
+        )
+
+        packets = container.demux(video=0)
+        packets = itertools.islice(packets, num_verification_packets)
+        verification_pts = [packet.pts for packet in packets]
+        container.seek(0)
+        verification_pts = [pts for pts in verification_pts if pts is not None]
+        if verification_pts != timestamps[: len(verification_pts)].tolist():
+            return None
+        return timestamps
+
+    @staticmethod
+    def _pts_from_demux(container) -> np.ndarray:
+        packets = container.demux(video=0)
+        # last pts is invalid
+        return np.array([packet.pts for packet in packets][:-1])
+
     @property
     def name(self) -> str:
         file_ = os.path.split(self.path)[1]
@@ -250,7 +290,7 @@ class Video:
     @property
     def pts(self) -> np.ndarray:
         if self._pts is None:
-            self.load_pts()
+            self.load_pts(self.load_container())
         return self._pts
 
     @staticmethod
@@ -292,6 +332,22 @@ class Video:
         return timestamps
 
 
+def _sorted_isin(sorted_values: np.ndarray, test_values: np.ndarray) -> np.ndarray:
+    """Same as `np.isin(sorted_values, test_values)` for sorted `sorted_values`.
+
+    Matches the values with binary searches instead of sorting both arrays.
+    """
+    test_values = test_values[~np.isnan(test_values)]
+    match_starts = np.searchsorted(sorted_values, test_values, side="left")
+    match_stops = np.searchsorted(sorted_values, test_values, side="right")
+    # mark all indices within [match_start, match_stop) ranges
+    num_bins = sorted_values.size + 1
+    match_count = np.bincount(match_starts, minlength=num_bins) - np.bincount(
+        match_stops, minlength=num_bins
+    )
+    return np.cumsum(match_count[:-1]) > 0
+
+
 class LookupTableNotInitializedError(AttributeError):
     pass
 
@@ -399,14 +455,14 @@ class VideoSet:
                 vid_timestamps = vid.timestamps[:data_size]
                 vid_pts = vid_pts[:data_size]
 
-                lookup_mask = np.isin(lookup.timestamp, vid_timestamps)
+                lookup_mask = _sorted_isin(lookup.timestamp, vid_timestamps)
                 lookup.container_frame_idx[lookup_mask] = np.arange(vid_timestamps.size)
                 lookup.container_idx[lookup_mask] = container_idx
                 lookup.pts[lookup_mask] = vid_pts
 
             except InvalidContainerError:
                 # For invalid videos, we still try to load the timestamps (might be empty)
-                lookup_mask = np.isin(lookup.timestamp, vid.timestamps)
+                lookup_mask = _sorted_isin(lookup.timestamp, vid.timestamps)
                 lookup.container_frame_idx[lookup_mask] = np.arange(vid.timestamps.size)
 
         self.lookup = lookup
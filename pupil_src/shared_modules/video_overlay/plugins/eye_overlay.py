@@ -138,7 +138,7 @@ class Eye_Overlay(Observable, Plugin):
                     closest_pupil_idx = pm.find_closest(
                         pupil_data.data_ts, self.current_frame_ts
                     )
-                    current_datum_2d = pupil_data.data[closest_pupil_idx]
+                    current_datum_2d = pupil_data[closest_pupil_idx]
                 else:
                     current_datum_2d = None
 
@@ -148,7 +148,7 @@ class Eye_Overlay(Observable, Plugin):
                     closest_pupil_idx = pm.find_closest(
                         pupil_data.data_ts, self.current_frame_ts
                     )
-                    current_datum_3d = pupil_data.data[closest_pupil_idx]
+                    current_datum_3d = pupil_data[closest_pupil_idx]
                 else:
                     current_datum_3d = None
                 return current_datum_2d, current_datum_3d
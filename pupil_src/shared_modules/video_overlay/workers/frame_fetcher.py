@@ -22,7 +22,12 @@ class FrameFetcher:
 
     def __init__(self, video_path):
         self.source = File_Source(
-            SimpleNamespace(), source_path=video_path, timing=None, fill_gaps=True
+            SimpleNamespace(),
+            source_path=video_path,
+            timing=None,
+            fill_gaps=True,
+            frame_cache_mb=64,
+            read_ahead=True,
         )
         if not self.source.initialised:
             raise FileNotFoundError(video_path)
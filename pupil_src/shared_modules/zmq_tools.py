@@ -118,6 +118,19 @@ class Msg_Receiver(ZMQ_Socket):
         payload = self.deserialize_payload(*remaining_frames)
         return topic, payload
 
+    def recv_serialized(self):
+        """Recv a message with topic, payload and serialized payload.
+
+        Like recv(), but additionally returns the msgpack serialized payload, e.g. to
+        store it without serializing the payload again. The serialized payload is
+        None if the message has additional frames.
+        """
+        topic = self.recv_topic()
+        remaining_frames = tuple(self.recv_remaining_frames())
+        payload = self.deserialize_payload(*remaining_frames)
+        payload_serialized = remaining_frames[0] if len(remaining_frames) == 1 else None
+        return topic, payload, payload_serialized
+
     def recv_topic(self):
         return self.socket.recv_string()
 
@@ -160,6 +173,8 @@ class Msg_Streamer(ZMQ_Socket):
         everything else need to be serializable
         the contents of the iterable in '__raw_data__'
         require exposing the pyhton memoryview interface.
+
+        Returns the msgpack serialized payload.
         """
         assert deprecated == (), "Depracted use of send()"
         assert "topic" in payload, f"`topic` field required in {payload}"
@@ -179,6 +194,7 @@ class Msg_Streamer(ZMQ_Socket):
             for frame in extra_frames[:-1]:
                 self.socket.send(frame, flags=zmq.SNDMORE, copy=True)
             self.socket.send(extra_frames[-1], copy=True)
+        return serialized_payload
 
 
 class Msg_Dispatcher(Msg_Streamer):
@@ -0,0 +1,30 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+from surface_tracker import background_tasks
+from surface_tracker.background_tasks import video_processing_segments
+
+
+def test_video_processing_segments(monkeypatch):
+    monkeypatch.setattr(background_tasks, "MIN_UNVISITED_FRAMES_PER_SEGMENT", 10)
+
+    assert video_processing_segments([], 4) == [(0, 0)]
+    assert video_processing_segments([None] * 100, 1) == [(0, 100)]
+    assert video_processing_segments([None] * 100, 4) == [
+        (0, 25),
+        (25, 50),
+        (50, 75),
+        (75, 100),
+    ]
+    # segments have similar amounts of unvisited frames
+    visited_list = [[]] * 50 + [None] * 50
+    assert video_processing_segments(visited_list, 2) == [(0, 75), (75, 100)]
+    # too little work to split
+    assert video_processing_segments([None] * 15, 4) == [(0, 15)]
@@ -0,0 +1,78 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import itertools
+import random
+
+import pytest
+from surface_tracker.cache import Cache, Index_Ranges
+
+
+def _ranges(values, eval_fn):
+    group_end_index = -1
+    ranges = []
+    for key, group in itertools.groupby(values, eval_fn):
+        group_start_index = group_end_index + 1
+        group_end_index += sum(1 for _ in group)
+        if key:
+            ranges.append([group_start_index, group_end_index])
+    return ranges
+
+
+def test_cache_ranges_match_recomputation():
+    rng = random.Random(0)
+    cache = Cache([None] * 500 + [True, False] * 50)
+
+    for _ in range(2000):
+        key = rng.randrange(len(cache))
+        item = rng.choice([True, False, [], [1]])
+        if cache[key] is None:
+            cache.update(key, item)
+        else:
+            with pytest.raises(IndexError):
+                cache.update(key, item)
+            cache.update(key, item, force=True)
+
+        if rng.random() < 0.05:
+            expected_visited = _ranges(cache, Cache.visited_eval_fn)
+            expected_positive = _ranges(cache, Cache.positive_eval_fn)
+            assert cache.visited_ranges == expected_visited
+            assert cache.positive_ranges == expected_positive
+
+    with pytest.raises(ValueError):
+        Cache([None]).update(0, None)
+
+
+def test_cache_positive_count():
+    cache = Cache([None, True, True, False, True, None, True])
+    assert cache.positive_count(slice(None)) == 4
+    assert cache.positive_count(slice(2, 5)) == 2
+    assert cache.positive_count(slice(5, 100)) == 1
+
+
+def test_index_ranges():
+    ranges = Index_Ranges.from_mask([0, 1, 1, 0, 0, 1, 0, 1, 1, 1])
+    assert list(ranges) == [[1, 2], [5, 5], [7, 9]]
+
+    assert ranges.next_missing(0, 10) == 0
+    assert ranges.next_missing(1, 10) == 3
+    assert ranges.next_missing(7, 10) is None
+    assert list(ranges.overlapping(2, 8)) == [[2, 2], [5, 5], [7, 7]]
+    assert ranges.count(2, 8) == 3
+
+    ranges.add(6)
+    assert list(ranges) == [[1, 2], [5, 9]]
+    ranges.remove(7)
+    assert list(ranges) == [[1, 2], [5, 6], [8, 9]]
+    ranges.add(0)
+    ranges.remove(9)
+    assert list(ranges) == [[0, 2], [5, 6], [8, 8]]
+    assert ranges.as_array().tolist() == [[0, 2], [5, 6], [8, 8]]
+    assert 8 in ranges and 7 not in ranges
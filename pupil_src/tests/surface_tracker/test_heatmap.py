@@ -0,0 +1,66 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import numpy as np
+from surface_tracker.heatmap import Heatmap_Accumulator
+from surface_tracker.surface import Events_On_Surface
+
+FRAME_COUNT = 1000
+GRID = (12, 31)
+
+
+def _gaze_on_surf(rng, count=20_000):
+    norm_pos = rng.uniform(-0.2, 1.2, (count, 2))
+    return Events_On_Surface(
+        world_index=np.sort(rng.integers(0, FRAME_COUNT, count)),
+        timestamp=np.arange(count) / 200,
+        norm_pos=norm_pos,
+        on_surf=np.all((0 <= norm_pos) & (norm_pos <= 1), axis=1),
+        confidence=rng.uniform(size=count),
+    )
+
+
+def _expected_histogram(gaze, grid, min_confidence, frame_range):
+    start, stop = frame_range
+    mask = gaze.on_surf & (gaze.confidence >= min_confidence)
+    mask &= (start <= gaze.world_index) & (gaze.world_index < stop)
+    hist, *_ = np.histogram2d(
+        1.0 - gaze.norm_pos[mask, 1],
+        gaze.norm_pos[mask, 0],
+        bins=grid,
+        range=[[0, 1.0], [0, 1.0]],
+    )
+    return hist
+
+
+def test_incremental_updates_match_histogram():
+    rng = np.random.default_rng(0)
+    gaze = _gaze_on_surf(rng)
+    accumulator = Heatmap_Accumulator(
+        gaze, GRID, min_confidence=0.6, frame_range=(0, FRAME_COUNT)
+    )
+    assert np.array_equal(
+        accumulator.histogram,
+        _expected_histogram(gaze, GRID, 0.6, (0, FRAME_COUNT)),
+    )
+
+    # shrinking, growing, shifting and disjoint trim sections
+    for frame_range in [(100, 900), (50, 300), (200, 250), (600, 700), (0, 0)]:
+        accumulator.set_frame_range(*frame_range)
+        expected = _expected_histogram(gaze, GRID, 0.6, frame_range)
+        assert np.array_equal(accumulator.histogram, expected)
+        assert accumulator.count == expected.sum()
+
+    accumulator.set_frame_range(10, 500)
+    accumulator.set_min_confidence(0.2)
+    accumulator.set_grid((5, 7))
+    assert np.array_equal(
+        accumulator.histogram, _expected_histogram(gaze, (5, 7), 0.2, (10, 500))
+    )
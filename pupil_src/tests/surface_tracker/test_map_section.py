@@ -0,0 +1,142 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import cv2
+import numpy as np
+import player_methods as pm
+from camera_models import Radial_Dist_Camera
+from surface_tracker.cache import Cache
+from surface_tracker.surface import Surface_Location
+from surface_tracker.surface_offline import Surface_Offline
+
+RESOLUTION = (1280, 720)
+FRAME_COUNT = 60
+
+
+def _camera_model():
+    K = [[800.0, 0.0, 640.0], [0.0, 800.0, 360.0], [0.0, 0.0, 1.0]]
+    D = [[-0.1, 0.05, 0.001, 0.001, 0.0]]
+    return Radial_Dist_Camera("world", RESOLUTION, K, D)
+
+
+def _location(rng):
+    img_corners = np.array([[300, 500], [900, 520], [880, 150], [320, 170]])
+    img_corners = img_corners + rng.normal(0, 20, (4, 2))
+    surf_corners = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float64)
+    img_to_surf_trans = cv2.getPerspectiveTransform(
+        img_corners.astype(np.float32), surf_corners.astype(np.float32)
+    )
+    return Surface_Location(
+        detected=True,
+        dist_img_to_surf_trans=img_to_surf_trans,
+        surf_to_dist_img_trans=np.linalg.inv(img_to_surf_trans),
+        img_to_surf_trans=img_to_surf_trans,
+        surf_to_img_trans=np.linalg.inv(img_to_surf_trans),
+        num_detected_markers=4,
+    )
+
+
+def _surface(rng):
+    surface = Surface_Offline(name="test")
+    locations = [
+        _location(rng) if rng.uniform() < 0.8 else Surface_Location(detected=False)
+        for _ in range(FRAME_COUNT)
+    ]
+    surface.location_cache = Cache(locations)
+    return surface
+
+
+def _events(rng, world_timestamps):
+    timestamps = np.sort(rng.uniform(world_timestamps[0], world_timestamps[-1], 600))
+    events = [
+        {
+            "topic": "gaze.3d.01.",
+            "norm_pos": rng.uniform(-0.1, 1.1, 2).tolist(),
+            "confidence": rng.uniform(),
+            "timestamp": timestamp,
+        }
+        for timestamp in timestamps.tolist()
+    ]
+    return pm.Bisector(events, timestamps)
+
+
+def test_map_section_matches_mapping_per_frame():
+    rng = np.random.default_rng(0)
+    world_timestamps = np.arange(FRAME_COUNT) / 30 + rng.uniform(0, 0.01, FRAME_COUNT)
+    surface = _surface(rng)
+    gaze = _events(rng, world_timestamps)
+    camera_model = _camera_model()
+    section = slice(5, 50)
+
+    mapped = surface.map_section(section, world_timestamps, gaze, camera_model)
+
+    expected_rows = []
+    for frame_idx in range(section.start, section.stop):
+        location = surface.location_cache[frame_idx]
+        if not location.detected:
+            continue
+        window = pm.enclosing_window(world_timestamps, frame_idx)
+        for event in gaze.by_ts_window(window):
+            img_point = np.array(
+                [
+                    event["norm_pos"][0] * RESOLUTION[0],
+                    (1 - event["norm_pos"][1]) * RESOLUTION[1],
+                ]
+            )
+            surf_norm_pos = surface.map_to_surf(
+                img_point, camera_model, trans_matrix=location.img_to_surf_trans
+            )
+            expected_rows.append(
+                (frame_idx, event["timestamp"], *surf_norm_pos, event["confidence"])
+            )
+
+    expected = np.array(expected_rows)
+    assert len(expected) > 100
+    assert np.array_equal(mapped.world_index, expected[:, 0])
+    assert np.array_equal(mapped.timestamp, expected[:, 1])
+    assert np.allclose(mapped.norm_pos, expected[:, 2:4], atol=1e-9)
+    assert np.array_equal(mapped.confidence, expected[:, 4])
+    expected_on_surf = np.all((0 <= expected[:, 2:4]) & (expected[:, 2:4] <= 1), 1)
+    assert np.array_equal(mapped.on_surf, expected_on_surf)
+    assert 0 < np.count_nonzero(mapped.on_surf) < len(expected)
+
+
+def test_map_section_repeats_fixations_for_each_frame():
+    rng = np.random.default_rng(1)
+    world_timestamps = np.arange(FRAME_COUNT) / 30
+    surface = _surface(rng)
+    for frame_idx in range(FRAME_COUNT):
+        surface.location_cache[frame_idx] = _location(rng)
+    fixation = {
+        "topic": "fixations",
+        "norm_pos": [0.5, 0.5],
+        "confidence": 1.0,
+        "timestamp": 0.5,
+        "id": 7,
+        "duration": 200.0,
+        "dispersion": 1.0,
+    }
+    fixations = pm.Affiliator([fixation], [0.5], [0.7])
+
+    mapped = surface.map_section(
+        slice(0, FRAME_COUNT),
+        world_timestamps,
+        fixations,
+        _camera_model(),
+        extra_keys=("id", "duration"),
+    )
+    expected_frames = [
+        frame_idx
+        for frame_idx in range(FRAME_COUNT)
+        if len(fixations.by_ts_window(pm.enclosing_window(world_timestamps, frame_idx)))
+    ]
+    assert mapped.world_index.tolist() == expected_frames
+    assert mapped.extra["id"].tolist() == [7] * len(expected_frames)
+    assert mapped.extra["duration"].tolist() == [200.0] * len(expected_frames)
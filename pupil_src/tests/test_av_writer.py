@@ -0,0 +1,78 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+from av_writer import Async_Video_Writer, NonMonotonicTimestampError
+
+
+class _Recording_Writer:
+    def __init__(self, block_event=None):
+        self.timestamps = []
+        self.released = False
+        self.block_event = block_event
+
+    def write_video_frame(self, input_frame):
+        if self.block_event is not None:
+            self.block_event.wait()
+        if self.timestamps and input_frame.timestamp < self.timestamps[-1]:
+            self.release()
+            raise NonMonotonicTimestampError("Non-monotonic timestamps!")
+        self.timestamps.append(input_frame.timestamp)
+
+    def release(self):
+        self.released = True
+
+
+def _frames(timestamps):
+    return [SimpleNamespace(timestamp=ts) for ts in timestamps]
+
+
+def test_async_video_writer_writes_all_frames_in_order():
+    writer = _Recording_Writer()
+    async_writer = Async_Video_Writer(writer, max_queued_frames=4)
+    for frame in _frames(range(100)):
+        async_writer.write_video_frame(frame)
+    async_writer.release()
+
+    assert writer.released
+    assert writer.timestamps == list(range(100))
+    assert async_writer.dropped_frame_count == 0
+
+
+def test_async_video_writer_drops_frames_when_full():
+    block_event = threading.Event()
+    writer = _Recording_Writer(block_event)
+    async_writer = Async_Video_Writer(writer, max_queued_frames=4, max_wait_s=0.0)
+    for frame in _frames(range(20)):
+        async_writer.write_video_frame(frame)
+    block_event.set()
+    async_writer.release()
+
+    # one frame is being written while the queue is full
+    assert len(writer.timestamps) in (4, 5)
+    assert async_writer.dropped_frame_count == 20 - len(writer.timestamps)
+
+
+def test_async_video_writer_raises_writer_errors():
+    writer = _Recording_Writer()
+    async_writer = Async_Video_Writer(writer)
+    for frame in _frames([0, 1, 0.5]):
+        async_writer.write_video_frame(frame)
+    async_writer._thread.join()
+
+    with pytest.raises(NonMonotonicTimestampError):
+        async_writer.write_video_frame(_frames([2])[0])
+    assert writer.released
+    # the writer is closed after the error
+    async_writer.write_video_frame(_frames([3])[0])
+    assert writer.timestamps == [0, 1]
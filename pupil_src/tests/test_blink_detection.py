@@ -0,0 +1,56 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import numpy as np
+import pytest
+from blink_detection import blink_intervals
+
+
+def _blink_intervals_state_machine(response_classification):
+    blinks = []
+    state = "no blink"  # others: 'blink started' | 'blink ending'
+    for idx, classification in enumerate(response_classification):
+        if state == "no blink" and classification > 0:
+            start, state = idx, "blink started"
+        elif state == "blink started" and classification == -1:
+            state = "blink ending"
+        elif state == "blink ending" and classification >= 0:
+            blinks.append((start, idx - 1))
+            if classification > 0:
+                start, state = idx, "blink started"
+            else:
+                state = "no blink"
+    if state == "blink ending":
+        blinks.append((start, len(response_classification) - 1))
+    return blinks
+
+
+@pytest.mark.parametrize(
+    "classification, expected",
+    [
+        ([], []),
+        ([0, 0, -1, -1, 0], []),
+        ([0, 1, 1, 0, -1, -1, 0, 0], [(1, 5)]),
+        ([1, -1, 1, -1, -1], [(0, 1), (2, 4)]),
+        ([1, 1, 0, 1], []),
+    ],
+)
+def test_blink_intervals(classification, expected):
+    start_idc, end_idc = blink_intervals(classification)
+    assert list(zip(start_idc.tolist(), end_idc.tolist())) == expected
+
+
+def test_blink_intervals_match_state_machine():
+    rng = np.random.default_rng(0)
+    classification = rng.choice([-1.0, 0.0, 1.0], size=5000, p=[0.2, 0.6, 0.2])
+    start_idc, end_idc = blink_intervals(classification)
+    expected = _blink_intervals_state_machine(classification)
+    assert expected
+    assert list(zip(start_idc.tolist(), end_idc.tolist())) == expected
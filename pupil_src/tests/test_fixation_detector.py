@@ -0,0 +1,244 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+from collections import deque
+from types import SimpleNamespace
+
+import file_methods as fm
+import numpy as np
+import pytest
+from camera_models import Dummy_Camera
+from fixation_detector import (
+    Fixation_Result_Factory,
+    FixationDetectionMethod,
+    Sliding_Window_Dispersion,
+    can_use_3d_gaze_mapping,
+    detect_fixations,
+    fixation_detection_chunks,
+    gaze_dispersion,
+    unproject_norm_pos,
+    vector_dispersion,
+)
+
+
+def _detect_fixations_reference(
+    capture, gaze_data, max_dispersion, min_duration, max_duration, min_data_confidence
+):
+    """Original implementation of `detect_fixations`.
+
+    Recomputes the dispersion of the complete working queue for every step.
+    """
+    yield "Detecting fixations...", ()
+    gaze_data = (
+        fm.Serialized_Dict(msgpack_bytes=serialized) for serialized in gaze_data
+    )
+    gaze_data = [
+        datum for datum in gaze_data if datum["confidence"] > min_data_confidence
+    ]
+    if not gaze_data:
+        return "Fixation detection failed", ()
+
+    method = (
+        FixationDetectionMethod.GAZE_3D
+        if can_use_3d_gaze_mapping(gaze_data)
+        else FixationDetectionMethod.GAZE_2D
+    )
+    fixation_result = Fixation_Result_Factory()
+
+    working_queue = deque()
+    remaining_gaze = deque(gaze_data)
+
+    while remaining_gaze:
+        # check if working_queue contains enough data
+        if (
+            len(working_queue) < 2
+            or (working_queue[-1]["timestamp"] - working_queue[0]["timestamp"])
+            < min_duration
+        ):
+            datum = remaining_gaze.popleft()
+            working_queue.append(datum)
+            continue
+
+        # min duration reached, check for fixation
+        dispersion = gaze_dispersion(capture, working_queue, method)
+        if dispersion > max_dispersion:
+            # not a fixation, move forward
+            working_queue.popleft()
+            continue
+
+        left_idx = len(working_queue)
+
+        # minimal fixation found. collect maximal data
+        # to perform binary search for fixation end
+        while remaining_gaze:
+            datum = remaining_gaze[0]
+            if datum["timestamp"] > working_queue[0]["timestamp"] + max_duration:
+                break  # maximum data found
+            working_queue.append(remaining_gaze.popleft())
+
+        # check for fixation with maximum duration
+        dispersion = gaze_dispersion(capture, working_queue, method)
+        if dispersion <= max_dispersion:
+            fixation = fixation_result.from_data(
+                dispersion, method, working_queue, capture.timestamps
+            )
+            yield "Detecting fixations...", fixation
+            working_queue.clear()  # discard old Q
+            continue
+
+        slicable = list(working_queue)  # deque does not support slicing
+        right_idx = len(working_queue)
+
+        # binary search
+        while left_idx < right_idx - 1:
+            middle_idx = (left_idx + right_idx) // 2
+            dispersion = gaze_dispersion(
+                capture,
+                slicable[: middle_idx + 1],
+                method,
+            )
+            if dispersion <= max_dispersion:
+                left_idx = middle_idx
+            else:
+                right_idx = middle_idx
+
+        # left_idx-1 is last valid base datum
+        final_base_data = slicable[:left_idx]
+        to_be_placed_back = slicable[left_idx:]
+        dispersion_result = gaze_dispersion(capture, final_base_data, method)
+
+        fixation = fixation_result.from_data(
+            dispersion_result, method, final_base_data, capture.timestamps
+        )
+        yield "Detecting fixations...", fixation
+        working_queue.clear()  # clear queue
+        remaining_gaze.extendleft(reversed(to_be_placed_back))
+
+    yield "Fixation detection complete", ()
+
+
+def _gaze_data(with_3d: bool, num_samples=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = np.cumsum(rng.uniform(0.003, 0.006, size=num_samples))
+    # random walk with occasional saccades
+    steps = rng.normal(scale=1.0, size=(num_samples, 3))
+    saccades = rng.random(num_samples) < 0.02
+    steps[saccades] *= 40
+    points = np.cumsum(steps, axis=0) + [0.0, 0.0, 500.0]
+    gaze_data = []
+    for ts, point in zip(timestamps, points):
+        datum = {
+            "topic": "gaze",
+            "timestamp": float(ts),
+            "confidence": float(rng.uniform(0.5, 1.0)),
+            "norm_pos": [0.5 + point[0] / 2000, 0.5 + point[1] / 2000],
+        }
+        if with_3d:
+            datum["gaze_point_3d"] = point.tolist()
+        gaze_data.append(fm.Serialized_Dict(python_dict=datum).serialized)
+    return gaze_data
+
+
+@pytest.fixture
+def capture():
+    cap = SimpleNamespace()
+    cap.frame_size = (1280, 720)
+    cap.intrinsics = Dummy_Camera("test", cap.frame_size)
+    cap.timestamps = np.arange(0, 20, 1 / 30)
+    return cap
+
+
+@pytest.mark.parametrize("with_3d", [True, False])
+@pytest.mark.parametrize(
+    "max_dispersion, min_duration, max_duration",
+    [(1.5, 0.08, 0.22), (3.0, 0.1, 0.6), (0.5, 0.05, 0.1)],
+)
+def test_detect_fixations_matches_reference(
+    capture, with_3d, max_dispersion, min_duration, max_duration
+):
+    args = (
+        capture,
+        _gaze_data(with_3d),
+        np.deg2rad(max_dispersion),
+        min_duration,
+        max_duration,
+        0.6,
+    )
+    expected = [fix for _, fix in _detect_fixations_reference(*args) if fix]
+    result = [fix for _, fix in detect_fixations(*args) if fix]
+    assert expected
+    assert result == expected
+
+
+@pytest.mark.parametrize("with_3d", [True, False])
+@pytest.mark.parametrize(
+    "max_dispersion, min_duration, max_duration",
+    [(1.5, 0.08, 0.22), (3.0, 0.1, 0.6)],
+)
+def test_chunked_detection_matches_serial(
+    capture, with_3d, max_dispersion, min_duration, max_duration
+):
+    gaze_data = [
+        datum
+        for datum in _gaze_data(with_3d)
+        if fm.Serialized_Dict(msgpack_bytes=datum)["confidence"] > 0.6
+    ]
+    args = (np.deg2rad(max_dispersion), min_duration, max_duration, 0.6)
+    expected = [fix for _, fix in detect_fixations(capture, gaze_data, *args) if fix]
+
+    data = [fm.Serialized_Dict(msgpack_bytes=datum) for datum in gaze_data]
+    timestamps = np.array([datum["timestamp"] for datum in data])
+    if with_3d:
+        method = FixationDetectionMethod.GAZE_3D
+        vectors = np.array([datum["gaze_point_3d"] for datum in data])
+    else:
+        method = FixationDetectionMethod.GAZE_2D
+        vectors = unproject_norm_pos(capture, [datum["norm_pos"] for datum in data])
+    chunks = fixation_detection_chunks(timestamps, vectors, *args[:3], num_chunks=7)
+    assert len(chunks) > 1
+
+    result = []
+    for start, stop, data_stop in chunks:
+        chunk_fixations = detect_fixations(
+            capture,
+            gaze_data[start:data_stop],
+            *args,
+            method=method,
+            chunk_stop=stop - start,
+        )
+        for _, (serialized, start_ts, stop_ts) in filter(
+            lambda item: item[1], chunk_fixations
+        ):
+            serialized = Fixation_Result_Factory.with_id(serialized, len(result))
+            result.append((serialized, start_ts, stop_ts))
+    assert expected
+    assert result == expected
+
+
+def test_sliding_window_dispersion():
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(60, 3)) + [0.0, 0.0, 10.0]
+    dispersion = Sliding_Window_Dispersion(vectors)
+
+    for start, stop in [(0, 5), (2, 5), (2, 20), (10, 40)]:
+        expected = vector_dispersion(vectors[start:stop])
+        assert dispersion.angle(start, stop) == pytest.approx(expected, abs=1e-9)
+
+    with pytest.raises(ValueError):
+        dispersion.angle(10, 30)
+
+    prefix_angles = dispersion.prefix_angles(10, 40)
+    for length in range(2, 31):
+        expected = vector_dispersion(vectors[10 : 10 + length])
+        assert prefix_angles[length - 1] == pytest.approx(expected, abs=1e-9)
+
+    dispersion.reset(40)
+    expected = vector_dispersion(vectors[40:60])
+    assert dispersion.angle(40, 60) == pytest.approx(expected, abs=1e-9)
@@ -0,0 +1,135 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+from camera_models import Radial_Dist_Camera
+from gaze_mapping.gazer_2d import Gazer2D
+from gaze_mapping.gazer_3d.gazer_headset import Gazer3D
+
+RESOLUTION = (1280, 720)
+
+
+def _g_pool():
+    K = [[800.0, 0.0, 640.0], [0.0, 800.0, 360.0], [0.0, 0.0, 1.0]]
+    D = [[-0.1, 0.05, 0.001, 0.001, 0.0]]
+    intrinsics = Radial_Dist_Camera("world", RESOLUTION, K, D)
+    return SimpleNamespace(
+        capture=SimpleNamespace(intrinsics=intrinsics, frame_size=RESOLUTION)
+    )
+
+
+def _eye_camera_to_world_matrix(rotation_vector, translation):
+    matrix = np.eye(4)
+    matrix[:3, :3] = cv2.Rodrigues(np.array(rotation_vector, dtype=float))[0]
+    matrix[:3, 3] = translation
+    return matrix.tolist()
+
+
+def _params_3d():
+    matrix0 = _eye_camera_to_world_matrix([0.1, 2.9, 0.1], [20, 15, -20])
+    matrix1 = _eye_camera_to_world_matrix([-0.1, 2.9, -0.1], [-40, 15, -20])
+    return {
+        "left_model": {"eye_camera_to_world_matrix": matrix1, "gaze_distance": 500},
+        "right_model": {"eye_camera_to_world_matrix": matrix0, "gaze_distance": 500},
+        "binocular_model": {
+            "eye_camera_to_world_matrix0": matrix0,
+            "eye_camera_to_world_matrix1": matrix1,
+        },
+    }
+
+
+def _params_2d(rng):
+    def model_params(feature_count):
+        return {
+            "coef_": rng.normal(size=(2, feature_count)).tolist(),
+            "intercept_": rng.normal(size=2).tolist(),
+        }
+
+    return {
+        "left_model": model_params(6),
+        "right_model": model_params(6),
+        "binocular_model": model_params(12),
+    }
+
+
+def _pupil_matches(rng, count):
+    def pupil(eye_id, timestamp):
+        normal = rng.normal([0, 0, -1], 0.2)
+        return {
+            "id": eye_id,
+            "timestamp": timestamp,
+            "confidence": rng.uniform(0.6, 1.0),
+            "norm_pos": rng.uniform(0.2, 0.8, 2).tolist(),
+            "sphere": {"center": rng.normal([0, 0, 35], 2).tolist()},
+            "circle_3d": {"normal": (normal / np.linalg.norm(normal)).tolist()},
+        }
+
+    matches = []
+    for idx in range(count):
+        kind = rng.choice(["binocular", "right", "left"], p=[0.6, 0.2, 0.2])
+        if kind == "binocular":
+            matches.append([pupil(0, idx + 0.01), pupil(1, idx)])
+        else:
+            matches.append([pupil(0 if kind == "right" else 1, float(idx))])
+    return matches
+
+
+def _assert_gaze_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for actual_datum, expected_datum in zip(actual, expected):
+        assert actual_datum.keys() == expected_datum.keys()
+        for key, value in expected_datum.items():
+            if key in ("topic", "base_data"):
+                assert actual_datum[key] == value
+            elif isinstance(value, dict):
+                for eye, eye_value in value.items():
+                    assert np.allclose(actual_datum[key][eye], eye_value)
+            else:
+                assert np.allclose(actual_datum[key], value, rtol=1e-9)
+
+
+@pytest.mark.parametrize("link_monocular_models", [False, True])
+def test_gazer_3d_predict_batch_matches_predict(link_monocular_models):
+    rng = np.random.default_rng(0)
+    matches = _pupil_matches(rng, 500)
+
+    def gazer():
+        gazer = Gazer3D(_g_pool(), params=_params_3d())
+        if link_monocular_models:
+            # as after fitting on calibration data
+            gazer.left_model.binocular_model = gazer.binocular_model
+            gazer.right_model.binocular_model = gazer.binocular_model
+        return gazer
+
+    serial_gazer, batch_gazer = gazer(), gazer()
+    expected = list(serial_gazer.predict(matches))
+    actual = [
+        gaze
+        for start in range(0, len(matches), 64)
+        for gaze in batch_gazer.predict_batch(matches[start : start + 64])
+    ]
+    _assert_gaze_equal(actual, expected)
+    assert np.isclose(
+        batch_gazer.binocular_model.last_gaze_distance,
+        serial_gazer.binocular_model.last_gaze_distance,
+    )
+
+
+def test_gazer_2d_predict_batch_matches_predict():
+    rng = np.random.default_rng(0)
+    matches = _pupil_matches(rng, 500)
+    gazer = Gazer2D(_g_pool(), params=_params_2d(rng))
+    expected = list(gazer.predict(matches))
+    actual = list(gazer.predict_batch(matches))
+    _assert_gaze_equal(actual, expected)
@@ -0,0 +1,49 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import numpy as np
+from gaze_mapping.matching import RealtimeMatcher
+
+
+def _pupil_data(rng):
+    pupil_data = []
+    for eye_id, start, frame_rate in ((0, 0.0, 120), (1, 0.3, 200)):
+        timestamps = start + np.cumsum(rng.uniform(0.5, 1.5, 3000)) / frame_rate
+        # recording gaps of one eye
+        timestamps = timestamps[(timestamps < 5.0) | (timestamps > 5.5 + eye_id)]
+        confidences = rng.choice([0.2, 0.7, 0.9, 1.0], size=len(timestamps))
+        pupil_data.extend(
+            {"id": eye_id, "timestamp": ts, "confidence": conf}
+            for ts, conf in zip(timestamps.tolist(), confidences.tolist())
+        )
+    pupil_data.sort(key=lambda p: p["timestamp"])
+    return pupil_data
+
+
+def test_map_batch_matches_on_pupil_datum():
+    pupil_data = _pupil_data(np.random.default_rng(0))
+
+    realtime_matcher = RealtimeMatcher()
+    expected = [
+        match for p in pupil_data for match in realtime_matcher.on_pupil_datum(p)
+    ]
+    batch_matcher = RealtimeMatcher()
+    actual = batch_matcher.map_batch(pupil_data)
+
+    assert {len(match) for match in expected} == {1, 2}
+    assert len(actual) == len(expected)
+    for actual_match, expected_match in zip(actual, expected):
+        assert [p["timestamp"] for p in actual_match] == [
+            p["timestamp"] for p in expected_match
+        ]
+    assert (
+        batch_matcher.recently_estimated_framerate
+        == realtime_matcher.recently_estimated_framerate
+    )
@@ -0,0 +1,51 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import numpy as np
+import player_methods as pm
+from head_pose_tracker.worker import detection_worker
+
+
+def test_detection_chunks_split_uncalculated_frames_evenly(monkeypatch):
+    monkeypatch.setattr(detection_worker, "MIN_FRAMES_PER_CHUNK", 100)
+    frame_index_range = (100, 1099)
+    calculated = set(range(100, 500)) | set(range(700, 800))
+
+    chunks = detection_worker.detection_chunks(frame_index_range, calculated, 4)
+
+    assert chunks[0][0] == 100 and chunks[-1][1] == 1099
+    assert all(end + 1 == start for (_, end), (start, _) in zip(chunks, chunks[1:]))
+    uncalculated = [
+        len(set(range(start, end + 1)) - calculated) for start, end in chunks
+    ]
+    assert sum(uncalculated) == 500
+    assert max(uncalculated) - min(uncalculated) <= 1
+
+    assert detection_worker.detection_chunks(frame_index_range, calculated, 8)[-1] == (
+        1000,
+        1099,
+    )
+    assert detection_worker.detection_chunks((0, 150), set(), 4) == [(0, 150)]
+
+
+def test_insert_many_matches_insert():
+    rng = np.random.default_rng(0)
+    timestamps = rng.uniform(0, 10, 200).round(1)
+    expected = pm.Mutable_Bisector()
+    bisector = pm.Mutable_Bisector()
+    for batch in np.array_split(np.arange(200), 7):
+        for idx in batch:
+            expected.insert(timestamps[idx], {"idx": int(idx)})
+        bisector.insert_many(timestamps[batch], [{"idx": int(idx)} for idx in batch])
+    bisector.insert_many([], [])
+
+    assert np.array_equal(bisector.data_ts, expected.data_ts)
+    assert np.all(np.diff(bisector.data_ts) >= 0)
+    assert sorted(d["idx"] for d in bisector.data) == list(range(200))
@@ -0,0 +1,114 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import numpy as np
+from head_pose_tracker import storage
+from head_pose_tracker.function import pick_key_markers
+
+
+def _frames(rng, count):
+    frames = []
+    for frame_id in range(count):
+        marker_ids = rng.choice(8, size=rng.integers(0, 4), replace=False)
+        frames.append(
+            [
+                {
+                    "id": int(marker_id),
+                    "verts": [[0.0, 0.0]] * 4,
+                    "centroid": rng.uniform(0, 1, 2).tolist(),
+                    "timestamp": float(frame_id),
+                }
+                for marker_id in marker_ids
+            ]
+        )
+    return frames
+
+
+def _is_available_by_scan(markers_in_frame, all_key_markers):
+    """Bin availability by scanning all key markers"""
+    for marker in markers_in_frame:
+        marker_bin = pick_key_markers._get_bins([marker])[0]
+        n_same_markers_in_bin = len(
+            [
+                key_marker
+                for key_marker in all_key_markers
+                if key_marker.marker_id == marker["id"] and key_marker.bin == marker_bin
+            ]
+        )
+        if n_same_markers_in_bin < pick_key_markers.max_n_same_markers_per_bin:
+            return True
+    return False
+
+
+def test_indexed_selection_matches_scan():
+    frames = _frames(np.random.default_rng(0), 500)
+
+    expected = []
+    for markers_in_frame in frames:
+        if len(
+            markers_in_frame
+        ) >= pick_key_markers.min_n_markers_per_frame and _is_available_by_scan(
+            markers_in_frame, expected
+        ):
+            expected += pick_key_markers._get_key_markers(
+                markers_in_frame, pick_key_markers._get_bins(markers_in_frame)
+            )
+
+    indexed = []
+    key_marker_index = pick_key_markers.KeyMarkerIndex()
+    for markers_in_frame in frames:
+        indexed += pick_key_markers.run(
+            markers_in_frame,
+            indexed,
+            select_key_markers_interval=1,
+            key_marker_index=key_marker_index,
+        )
+    assert indexed == expected
+
+    # without index, the key markers are indexed on demand
+    unindexed = []
+    for markers_in_frame in frames:
+        unindexed += pick_key_markers.run(
+            markers_in_frame, unindexed, select_key_markers_interval=1
+        )
+    assert unindexed == expected
+    assert all(
+        isinstance(bin_idx, int) for marker in expected for bin_idx in marker.bin
+    )
+
+
+def test_model_keeps_key_marker_index():
+    frames = _frames(np.random.default_rng(1), 200)
+    model = storage.Markers3DModel()
+    for markers_in_frame in frames:
+        key_markers = pick_key_markers.run(
+            markers_in_frame,
+            model.all_key_markers,
+            select_key_markers_interval=1,
+            key_marker_index=model.key_marker_index,
+        )
+        model.all_key_markers.extend(key_markers)
+    assert model.all_key_markers
+
+    keys = {(marker.marker_id, marker.bin) for marker in model.all_key_markers}
+
+    def counts(index):
+        return {key: index.count(*key) for key in keys}
+
+    rebuilt = pick_key_markers.KeyMarkerIndex(model.all_key_markers)
+    assert counts(model.key_marker_index) == counts(rebuilt)
+
+    failed_frame_id = model.all_key_markers[0].frame_id
+    model.discard_failed_key_markers({failed_frame_id})
+    rebuilt = pick_key_markers.KeyMarkerIndex(model.all_key_markers)
+    assert counts(model.key_marker_index) == counts(rebuilt)
+
+    model.set_to_default_values()
+    assert not any(counts(model.key_marker_index).values())
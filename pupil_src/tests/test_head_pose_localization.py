@@ -0,0 +1,103 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import types
+
+import cv2
+import numpy as np
+import player_methods as pm
+from camera_models import Radial_Dist_Camera
+from head_pose_tracker.function import utils
+from head_pose_tracker.worker import localization_worker
+
+FRAME_COUNT = 400
+
+
+def _camera_model():
+    K = [[800.0, 0.0, 640.0], [0.0, 800.0, 360.0], [0.0, 0.0, 1.0]]
+    D = [[0.0, 0.0, 0.0, 0.0, 0.0]]
+    return Radial_Dist_Camera("world", (1280, 720), K, D)
+
+
+def _recording(camera_model):
+    """Two markers seen by a slowly moving camera, with some frames missing"""
+    marker_id_to_extrinsics = {
+        0: np.array([0.0, 0.0, 0.0, -1.5, -0.5, 0.0]),
+        1: np.array([0.0, 0.0, 0.0, 0.5, -0.5, 0.0]),
+    }
+    timestamps = np.arange(FRAME_COUNT) / 30
+    markers, markers_ts = [], []
+    frame_index_to_num_markers = {}
+    for frame_index, timestamp in enumerate(timestamps):
+        angle = frame_index / FRAME_COUNT
+        rotation = np.array([0.1 * np.sin(angle), 0.2 * angle, 0.0])
+        translation = np.array([0.2 * np.cos(angle), 0.0, 8.0])
+        num_markers = 0 if frame_index % 50 in (20, 21) else 2
+        for marker_id in range(num_markers):
+            points_3d = utils.convert_marker_extrinsics_to_points_3d(
+                marker_id_to_extrinsics[marker_id]
+            )
+            verts, _ = cv2.projectPoints(
+                points_3d, rotation, translation, camera_model.K, camera_model.D
+            )
+            markers.append({"id": marker_id, "verts": verts.reshape(4, 2).tolist()})
+            markers_ts.append(timestamp)
+        frame_index_to_num_markers[frame_index] = num_markers
+    markers_bisector = pm.Mutable_Bisector(markers, markers_ts)
+    return (
+        timestamps,
+        markers_bisector,
+        frame_index_to_num_markers,
+        marker_id_to_extrinsics,
+    )
+
+
+def _localize(recording, camera_model, frame_index_range, **kwargs):
+    timestamps, markers_bisector, num_markers, marker_id_to_extrinsics = recording
+    batches = localization_worker.offline_localization(
+        timestamps,
+        frame_index_range,
+        markers_bisector,
+        num_markers,
+        marker_id_to_extrinsics,
+        camera_model,
+        shared_memory=types.SimpleNamespace(progress=0.0),
+        **kwargs,
+    )
+    return [pair for batch in batches for pair in batch]
+
+
+def test_stitched_chunks_match_sequential_localization(monkeypatch):
+    monkeypatch.setattr(localization_worker, "MIN_FRAMES_PER_CHUNK", 100)
+    camera_model = _camera_model()
+    recording = _recording(camera_model)
+    frame_index_range = (10, FRAME_COUNT - 1)
+
+    sequential = _localize(recording, camera_model, frame_index_range)
+
+    chunks = localization_worker.localization_chunks(frame_index_range, num_chunks=3)
+    assert len(chunks) == 3
+    assert chunks[0][:2] == (10, 10) and chunks[-1][2] == FRAME_COUNT - 1
+    pose_bisector = pm.Mutable_Bisector()
+    for seam_start, start, end in reversed(chunks):
+        pairs = _localize(
+            recording,
+            camera_model,
+            (seam_start, end),
+            first_yielded_frame_index=start,
+        )
+        pose_bisector.insert_many(*zip(*pairs))
+
+    assert len(sequential) == FRAME_COUNT - 10 - 2 * 8
+    assert np.array_equal(pose_bisector.data_ts, [ts for ts, _ in sequential])
+    for (_, expected), pose in zip(sequential, pose_bisector.data):
+        assert np.allclose(
+            pose["camera_extrinsics"], expected["camera_extrinsics"], atol=1e-4
+        )
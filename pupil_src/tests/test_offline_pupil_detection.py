@@ -0,0 +1,39 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import pytest
+from offline_pupil_detection import (
+    MIN_FRAMES_PER_CHUNK,
+    Detection_Settings,
+    detection_chunks,
+)
+
+
+@pytest.mark.parametrize(
+    "frame_count, num_chunks",
+    [(0, 4), (10, 4), (MIN_FRAMES_PER_CHUNK * 3, 8), (12_345, 4), (12_345, 1)],
+)
+def test_detection_chunks_cover_all_frames(frame_count, num_chunks):
+    chunks = detection_chunks(frame_count, num_chunks)
+    assert 1 <= len(chunks) <= max(num_chunks, 1)
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == frame_count
+    for (_, stop), (start, _) in zip(chunks[:-1], chunks[1:]):
+        assert stop == start
+    if len(chunks) > 1:
+        assert all(stop - start >= MIN_FRAMES_PER_CHUNK for start, stop in chunks)
+
+
+def test_roi_bounds_for_frame_size():
+    settings = Detection_Settings(roi_frame_size=(192, 192), roi_bounds=(1, 2, 3, 4))
+    assert settings.roi_bounds_for_frame_size(192, 192) == (1, 2, 3, 4)
+    assert settings.roi_bounds_for_frame_size(400, 400) == (0, 0, 399, 399)
+    default_settings = Detection_Settings()
+    assert default_settings.roi_bounds_for_frame_size(192, 192) == (0, 0, 191, 191)
@@ -0,0 +1,90 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import os
+
+import file_methods as fm
+import numpy as np
+import player_methods as pm
+import pytest
+from pldata_columns import PLData_Columns, columns_from_data
+
+
+def _gaze_datum(idx, with_3d=True):
+    datum = {
+        "topic": "gaze.3d.01.",
+        "timestamp": float(idx),
+        "confidence": 1.0 - idx / 100,
+        "norm_pos": [idx / 100, 1 - idx / 100],
+    }
+    if with_3d:
+        datum["gaze_point_3d"] = [idx, 2 * idx, 3 * idx]
+    return datum
+
+
+@pytest.fixture
+def gaze_dir(tmpdir):
+    with fm.PLData_Writer(tmpdir, "gaze") as writer:
+        writer.extend(_gaze_datum(idx, with_3d=idx % 2 == 0) for idx in range(20))
+    return str(tmpdir)
+
+
+def test_columns_from_data_fills_missing_fields():
+    columns = columns_from_data([_gaze_datum(0), _gaze_datum(1, with_3d=False)])
+    assert columns["timestamp"].tolist() == [0.0, 1.0]
+    assert columns["gaze_point_3d"][0].tolist() == [0.0, 0.0, 0.0]
+    assert np.isnan(columns["gaze_point_3d"][1]).all()
+    assert np.isnan(columns["diameter"]).all()
+
+
+def test_columns_cache_is_persisted_and_invalidated(gaze_dir):
+    cache_dir = os.path.join(gaze_dir, "offline_data")
+    gaze = fm.load_pldata_file_memory_mapped(gaze_dir, "gaze")
+    columns = PLData_Columns(gaze.data, gaze_dir, "gaze", cache_dir)
+    assert columns.array["confidence"][3] == pytest.approx(0.97)
+    assert os.path.exists(os.path.join(cache_dir, "gaze_columns.npy"))
+
+    reloaded = PLData_Columns(gaze.data, gaze_dir, "gaze", cache_dir)
+    assert isinstance(reloaded._load_cache(), np.memmap)
+
+    gaze.data.close()
+    with fm.PLData_Writer(gaze_dir, "gaze") as writer:
+        writer.extend(_gaze_datum(idx) for idx in range(5))
+    gaze = fm.load_pldata_file_memory_mapped(gaze_dir, "gaze")
+    rebuilt = PLData_Columns(gaze.data, gaze_dir, "gaze", cache_dir)
+    assert rebuilt._load_cache() is None
+    assert len(rebuilt.array) == 5
+
+
+def test_bisector_columns_match_data(gaze_dir):
+    gaze = fm.load_pldata_file_memory_mapped(gaze_dir, "gaze")
+    columns = PLData_Columns(
+        gaze.data, gaze_dir, "gaze", os.path.join(gaze_dir, "offline_data")
+    )
+    mapped = pm.Memory_Mapped_Bisector(gaze.data, gaze.timestamps, columns=columns)
+    eager = pm.Bisector(list(gaze.data), gaze.timestamps)
+
+    for bisector in (mapped, eager):
+        assert bisector.column("confidence").tolist() == [
+            d["confidence"] for d in bisector
+        ]
+        assert bisector.column("norm_pos").shape == (20, 2)
+        window = bisector.column_for_window("timestamp", (5.0, 8.0))
+        assert window.tolist() == [5.0, 6.0, 7.0]
+    assert np.array_equal(
+        mapped.column("gaze_point_3d"), eager.column("gaze_point_3d"), equal_nan=True
+    )
+
+
+def test_mutable_bisector_invalidates_columns():
+    bisector = pm.Mutable_Bisector([_gaze_datum(0)], [0.0])
+    assert bisector.column("timestamp").tolist() == [0.0]
+    bisector.insert(1.0, _gaze_datum(1))
+    assert bisector.column("timestamp").tolist() == [0.0, 1.0]
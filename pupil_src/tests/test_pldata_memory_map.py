@@ -0,0 +1,184 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import os
+import pickle
+
+import file_methods as fm
+import msgpack
+import numpy as np
+import player_methods as pm
+import pytest
+
+
+@pytest.fixture
+def pupil_pldata_dir(tmpdir):
+    with fm.PLData_Writer(tmpdir, "pupil") as writer:
+        for idx in range(50):
+            eye_id = idx % 2
+            # write slightly out of order to exercise sorting
+            timestamp = float(idx + (0.5 if idx % 5 == 0 else 0.0))
+            writer.append(
+                {
+                    "topic": f"pupil.{eye_id}.3d",
+                    "timestamp": timestamp,
+                    "confidence": idx / 50,
+                    "id": eye_id,
+                }
+            )
+    return str(tmpdir)
+
+
+def test_writer_creates_index(pupil_pldata_dir):
+    index = fm.load_pldata_index(pupil_pldata_dir, "pupil")
+    assert len(index.offsets) == 51
+    assert index.offsets[-1] == os.path.getsize(
+        os.path.join(pupil_pldata_dir, "pupil.pldata")
+    )
+    assert set(index.topics) == {"pupil.0.3d", "pupil.1.3d"}
+
+
+def test_index_is_rebuilt_if_missing_or_stale(pupil_pldata_dir):
+    expected = fm.load_pldata_index(pupil_pldata_dir, "pupil")
+    os.remove(os.path.join(pupil_pldata_dir, "pupil_index.npz"))
+    rebuilt = fm.load_pldata_index(pupil_pldata_dir, "pupil")
+    assert np.array_equal(rebuilt.offsets, expected.offsets)
+    assert np.array_equal(rebuilt.topics, expected.topics)
+    assert np.array_equal(rebuilt.topic_idc, expected.topic_idc)
+    assert os.path.exists(os.path.join(pupil_pldata_dir, "pupil_index.npz"))
+
+    with fm.PLData_Writer(pupil_pldata_dir, "other") as writer:
+        writer.append({"topic": "other", "timestamp": 0.0})
+    os.replace(
+        os.path.join(pupil_pldata_dir, "other_index.npz"),
+        os.path.join(pupil_pldata_dir, "pupil_index.npz"),
+    )
+    rebuilt = fm.load_pldata_index(pupil_pldata_dir, "pupil")
+    assert np.array_equal(rebuilt.offsets, expected.offsets)
+
+
+def test_index_is_rebuilt_if_file_was_modified(pupil_pldata_dir, monkeypatch):
+    fm.load_pldata_index(pupil_pldata_dir, "pupil")
+    build_calls = []
+    build_pldata_index = fm.build_pldata_index
+
+    def counting_build_pldata_index(*args):
+        build_calls.append(args)
+        return build_pldata_index(*args)
+
+    monkeypatch.setattr(fm, "build_pldata_index", counting_build_pldata_index)
+    fm.load_pldata_index(pupil_pldata_dir, "pupil")
+    assert not build_calls
+
+    # same size, different modification time, e.g. rewritten in place
+    pldata_path = os.path.join(pupil_pldata_dir, "pupil.pldata")
+    stat = os.stat(pldata_path)
+    os.utime(pldata_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    fm.load_pldata_index(pupil_pldata_dir, "pupil")
+    assert len(build_calls) == 1
+
+
+def test_memory_mapped_data_matches_eager_data(pupil_pldata_dir):
+    eager = fm.load_pldata_file(pupil_pldata_dir, "pupil")
+    lazy = fm.load_pldata_file_memory_mapped(pupil_pldata_dir, "pupil")
+    assert len(lazy.data) == len(eager.data)
+    assert list(lazy.topics) == list(eager.topics)
+    assert np.array_equal(lazy.timestamps, eager.timestamps)
+    for lazy_datum, eager_datum in zip(lazy.data, eager.data):
+        assert lazy_datum.serialized == eager_datum.serialized
+    assert lazy.data[-1].serialized == eager.data[-1].serialized
+    with pytest.raises(IndexError):
+        lazy.data[len(eager.data)]
+
+
+def test_memory_mapped_pupil_data_bisector(pupil_pldata_dir):
+    eager = pm.PupilDataBisector.load_from_file(pupil_pldata_dir, "pupil")
+    lazy = pm.PupilDataBisector.load_from_file(
+        pupil_pldata_dir, "pupil", memory_mapped=True
+    )
+
+    for key in [(0, "3d"), (1, "3d"), (..., ...)]:
+        assert isinstance(lazy[key], pm.Memory_Mapped_Bisector)
+        assert np.array_equal(lazy[key].timestamps, eager[key].timestamps)
+        assert [d.serialized for d in lazy[key]] == [d.serialized for d in eager[key]]
+
+    window = (10.0, 20.0)
+    lazy_window = lazy[..., ...].by_ts_window(window)
+    eager_window = eager[..., ...].by_ts_window(window)
+    assert [d["timestamp"] for d in lazy_window] == [
+        d["timestamp"] for d in eager_window
+    ]
+    assert lazy[0, "3d"].by_ts(10.5)["confidence"] == 10 / 50
+    with pytest.raises(ValueError):
+        lazy[0, "3d"].by_ts(11.0)
+
+
+def test_memory_mapped_bisector_close(pupil_pldata_dir):
+    lazy = pm.PupilDataBisector.load_from_file(
+        pupil_pldata_dir, "pupil", memory_mapped=True
+    )
+    bisector = lazy[0, "3d"]
+    assert bisector.data is bisector.data
+    assert bisector[3].serialized == bisector.data[3].serialized
+
+    records = bisector.records
+    lazy.close()
+    assert not len(records._buffer)
+
+
+def test_memory_mapped_empty_file(tmpdir):
+    with fm.PLData_Writer(tmpdir, "gaze"):
+        pass
+    gaze = fm.load_pldata_file_memory_mapped(str(tmpdir), "gaze")
+    bisector = pm.Memory_Mapped_Bisector(gaze.data, gaze.timestamps)
+    assert not bisector
+    assert len(bisector.data) == 0
+    assert len(bisector.by_ts_window((0.0, 1.0))) == 0
+
+
+def test_writer_keeps_received_payload(tmpdir):
+    datum = {"topic": "gaze.3d.01.", "timestamp": 1.0, "norm_pos": [0.5, 0.5]}
+    # payload as received over IPC, with a different key order than `datum`
+    payload = msgpack.packb(dict(reversed(datum.items())), use_bin_type=True)
+    received = fm.Serialized_Payload_Dict(datum, payload)
+    modified = fm.Serialized_Payload_Dict(datum, payload)
+    modified["confidence"] = 0.9
+    assert modified.serialized is None
+
+    with fm.PLData_Writer(tmpdir, "gaze") as writer:
+        writer.extend([received, modified])
+
+    index = fm.load_pldata_index(str(tmpdir), "gaze")
+    with open(os.path.join(str(tmpdir), "gaze.pldata"), "rb") as file:
+        pldata = file.read()
+    _, written = msgpack.unpackb(pldata[index.offsets[0] : index.offsets[1]])
+    assert written == payload
+    data = fm.load_pldata_file(str(tmpdir), "gaze").data
+    assert data[1]["confidence"] == 0.9
+
+
+def test_memory_mapped_bisector_pickle(pupil_pldata_dir, tmpdir):
+    lazy = pm.PupilDataBisector.load_from_file(
+        pupil_pldata_dir,
+        "pupil",
+        memory_mapped=True,
+        columns_cache_dir=str(tmpdir.join("offline_data")),
+    )
+    bisector = lazy[..., ...]
+    expected_confidence = bisector.column("confidence")
+    bisector.data  # unpacked data is not pickled
+
+    unpickled = pickle.loads(pickle.dumps(bisector))
+    assert isinstance(unpickled.records, fm.PLData_Memory_Map)
+    assert unpickled._data is None
+    assert np.array_equal(unpickled.timestamps, bisector.timestamps)
+    assert [d.serialized for d in unpickled] == [d.serialized for d in bisector]
+    assert np.array_equal(unpickled.column("confidence"), expected_confidence)
+    unpickled.close()
@@ -0,0 +1,63 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import msgpack
+import pytest
+from plugin_timing import Plugin_Timing, Timing_Histogram
+
+
+def test_timing_histogram():
+    histogram = Timing_Histogram()
+    assert histogram.mean == 0.0
+    assert histogram.percentile(50) == 0.0
+
+    durations = [0.001] * 90 + [0.05] * 9 + [2.0]
+    for duration in durations:
+        histogram.add(duration)
+
+    assert histogram.count == 100
+    assert sum(histogram.counts) == 100
+    assert histogram.mean == pytest.approx(sum(durations) / 100)
+    assert histogram.max == 2.0
+    assert histogram.last == 2.0
+    # percentiles are the upper edges of the bins
+    assert 0.001 <= histogram.percentile(50) < 0.002
+    assert 0.05 <= histogram.percentile(95) < 0.06
+    assert histogram.percentile(100) == 2.0
+
+
+def test_plugin_timing_report():
+    timing = Plugin_Timing()
+    for _ in range(10):
+        timing.add_plugin_duration("recent_events", "Fast_Plugin", 0.001)
+        timing.add_plugin_duration("recent_events", "Slow_Plugin", 0.01)
+        timing.add_plugin_duration("gl_display", "Slow_Plugin", 0.1)
+    timing.add_duration("loop", 0.02)
+    timing.add_value("notifications", 3)
+    timing.add_value("notifications", 1)
+
+    slowest = timing.slowest_plugins("recent_events")
+    assert [plugin_name for plugin_name, _ in slowest] == ["Slow_Plugin"]
+    assert timing.slowest_plugins("on_notify") == []
+
+    notification = timing.report_notification("world", reset=True)
+    # notifications are sent as msgpack
+    notification = msgpack.unpackb(msgpack.packb(notification))
+    report = notification["timing"]
+    assert notification["subject"] == "plugin_timing.report"
+    assert report["plugins"]["recent_events"]["Fast_Plugin"]["count"] == 10
+    assert report["durations"]["loop"]["mean_ms"] == pytest.approx(20)
+    assert report["values"]["notifications"] == {
+        "count": 2,
+        "mean": 2.0,
+        "max": 3,
+        "last": 1,
+    }
+    assert timing.report() == {"plugins": {}, "durations": {}, "values": {}}
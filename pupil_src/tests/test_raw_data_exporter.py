@@ -8,6 +8,12 @@ Lesser General Public License (LGPL v3.0).
 See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
+import csv
+import io
+
+import file_methods as fm
+import numpy as np
+import player_methods as pm
 import pytest
 from raw_data_exporter import Gaze_Positions_Exporter, Pupil_Positions_Exporter
 
@@ -280,6 +286,64 @@ PUPIL_INVISIBLE_GAZE_EXPORT_DICT_0 = {
 }
 
 
+@pytest.mark.parametrize(
+    "exporter, positions",
+    [
+        (Pupil_Positions_Exporter(), PUPIL_CAPTURE_PUPIL_POSITION_0),
+        (Gaze_Positions_Exporter(), PUPIL_CAPTURE_GAZE_POSITION_0),
+        (Gaze_Positions_Exporter(), PUPIL_INVISIBLE_GAZE_POSITION_0),
+    ],
+)
+def test_csv_export_write_matches_dict_export(tmp_path, exporter, positions):
+    exporter.CSV_BLOCK_SIZE = 3
+    data, data_ts = [], []
+    for idx in range(10):
+        datum = dict(positions, timestamp=positions["timestamp"] + idx)
+        datum["confidence"] = 0.2 if idx % 4 == 0 else positions["confidence"]
+        data.append(fm.Serialized_Dict(python_dict=datum))
+        data_ts.append(datum["timestamp"])
+    world_ts = np.array(data_ts[::2]) + 0.1
+
+    exporter.csv_export_write(
+        pm.Bisector(data, data_ts),
+        world_ts,
+        [data_ts[1], data_ts[-1] + 1],
+        tmp_path,
+        min_confidence_threshold=0.6,
+        should_export_npz=True,
+    )
+
+    labels = exporter.csv_export_labels()
+    expected_rows = [
+        exporter.dict_export(datum, world_index)
+        for datum, world_index in zip(data, pm.find_closest(world_ts, data_ts))
+        if datum["confidence"] >= 0.6 and datum["timestamp"] >= data_ts[1]
+    ]
+    expected = io.StringIO(newline="")
+    dict_writer = csv.DictWriter(expected, fieldnames=labels)
+    dict_writer.writeheader()
+    dict_writer.writerows(expected_rows)
+
+    export_file = tmp_path / exporter.csv_export_filename()
+    with open(export_file, encoding="utf-8", newline="") as csv_file:
+        assert csv_file.read() == expected.getvalue()
+
+    columns = np.load(export_file.with_suffix(".npz"))
+    assert list(columns.keys()) == list(labels)
+    for label in labels:
+        values = [row[label] for row in expected_rows]
+        if label.endswith("timestamp"):
+            assert columns[label].tolist() == [float(value) for value in values]
+        elif isinstance(values[0], str):
+            assert columns[label].tolist() == values
+        else:
+            assert np.array_equal(
+                columns[label],
+                np.array(values, dtype=np.float64),
+                equal_nan=True,
+            )
+
+
 if __name__ == "__main__":
     # Test pupil/gaze exporter with recording from Pupil Capture
     test_pupil_positions_exporter_capture()
@@ -0,0 +1,102 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import cv2
+import numpy as np
+from scan_path.algorithm import ScanPathAlgorithm
+from scan_path.utils import (
+    ScanPathGazeAccumulator,
+    scan_path_segments,
+    scan_path_zeros_numpy_array,
+)
+
+IMAGE_SIZE = (160, 120)
+FRAME_RATE = 30
+
+
+def _gray_images(frame_count, rng):
+    texture = rng.integers(0, 256, size=(400, 400), dtype=np.uint8)
+    texture = cv2.GaussianBlur(texture, (9, 9), 3)
+    width, height = IMAGE_SIZE
+    images = []
+    for frame_index in range(frame_count):
+        x, y = 100 + int(40 * np.sin(frame_index / 10)), 100 + frame_index % 50
+        images.append(np.ascontiguousarray(texture[y : y + height, x : x + width]))
+    return images
+
+
+def _preprocessed_data(frame_count, rng):
+    gaze_data = []
+    for frame_index in range(frame_count):
+        # leave frames without gaze, which do not trim the tracked gaze
+        count = rng.choice([0, 0, 1, 2, 3]) if frame_index % 40 < 30 else 0
+        timestamps = np.sort(frame_index + rng.random(count)) / FRAME_RATE
+        data = scan_path_zeros_numpy_array(count)
+        data.frame_index = frame_index
+        data.timestamp = timestamps
+        data.norm_x = rng.uniform(0.2, 0.8, count)
+        data.norm_y = rng.uniform(0.2, 0.8, count)
+        gaze_data.append(data)
+    return np.concatenate(gaze_data).view(np.recarray)
+
+
+def _run(timeframe, images, preprocessed_data, start, stop):
+    algorithm = ScanPathAlgorithm(timeframe)
+    results = []
+    for frame_index in range(start, stop):
+        gaze_data = preprocessed_data[preprocessed_data.frame_index == frame_index]
+        results.append(
+            algorithm.update_from_raw_data(
+                frame_index, gaze_data, IMAGE_SIZE, images[frame_index]
+            )
+        )
+    return results
+
+
+def test_scan_path_segments_match_serial_calculation():
+    rng = np.random.default_rng(0)
+    frame_count = 300
+    timeframe = 0.5
+    images = _gray_images(frame_count, rng)
+    preprocessed_data = _preprocessed_data(frame_count, rng)
+
+    expected = _run(timeframe, images, preprocessed_data, 0, frame_count)
+    segments = scan_path_segments(preprocessed_data, frame_count, timeframe, 7)
+    starts = [start for _, start, _ in segments]
+    assert starts == [0, 42, 85, 128, 171, 214, 257]
+
+    actual = []
+    for warm_up_start, start, stop in segments:
+        assert warm_up_start <= start
+        results = _run(timeframe, images, preprocessed_data, warm_up_start, stop)
+        actual.extend(results[start - warm_up_start :])
+
+    assert sum(len(gaze_data) for gaze_data in expected) > frame_count
+    assert len(actual) == len(expected)
+    for actual_data, expected_data in zip(actual, expected):
+        assert actual_data.tolist() == expected_data.tolist()
+
+
+def test_scan_path_gaze_accumulator():
+    rng = np.random.default_rng(0)
+    accumulator = ScanPathGazeAccumulator()
+    accumulator.CHUNK_SIZE = 16
+    assert len(accumulator.to_array()) == 0
+
+    chunks = []
+    for _ in range(50):
+        chunk = scan_path_zeros_numpy_array(rng.integers(0, 40))
+        chunk.timestamp = rng.random(len(chunk))
+        accumulator.append(chunk)
+        chunks.append(chunk)
+
+    expected = np.concatenate(chunks)
+    assert len(accumulator) == len(expected)
+    assert accumulator.to_array().tolist() == expected.tolist()
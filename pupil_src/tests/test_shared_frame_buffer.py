@@ -0,0 +1,70 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import os
+
+import msgpack
+import numpy as np
+import pytest
+from shared_frame_buffer import Shared_Frame_Reader, Shared_Frame_Writer
+
+SLOT_COUNT = 4
+
+
+@pytest.fixture
+def writer():
+    writer = Shared_Frame_Writer("test", slot_count=SLOT_COUNT)
+    yield writer
+    writer.close()
+
+
+def _frame(value, shape=(12, 16, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_read_frames(writer):
+    reader = Shared_Frame_Reader()
+    for value in range(2 * SLOT_COUNT):
+        frame = _frame(value)
+        # descriptors are sent as msgpack payloads
+        descriptor = msgpack.unpackb(msgpack.packb(writer.write(frame)))
+        frame_view = reader.read(descriptor)
+        assert frame_view.shape == frame.shape
+        assert np.array_equal(frame_view, frame)
+        assert reader.is_current(descriptor)
+
+    jpeg_buffer = bytes(range(100))
+    frame_view = reader.read(writer.write(jpeg_buffer))
+    assert frame_view.tobytes() == jpeg_buffer
+
+
+def test_overwritten_frames_are_detected(writer):
+    reader = Shared_Frame_Reader()
+    descriptors = [writer.write(_frame(value)) for value in range(SLOT_COUNT)]
+    assert all(reader.read(descriptor) is not None for descriptor in descriptors)
+
+    writer.write(_frame(SLOT_COUNT))
+    assert not reader.is_current(descriptors[0])
+    assert reader.read(descriptors[0]) is None
+    assert np.array_equal(reader.read(descriptors[1]), _frame(1))
+
+
+def test_buffer_grows_for_larger_frames(writer):
+    reader = Shared_Frame_Reader()
+    small = writer.write(_frame(1))
+    assert np.array_equal(reader.read(small), _frame(1))
+
+    large = writer.write(_frame(2, shape=(120, 160, 3)))
+    assert large["path"] != small["path"]
+    assert not os.path.exists(small["path"])
+    assert np.array_equal(reader.read(large), _frame(2, shape=(120, 160, 3)))
+
+    writer.close()
+    assert not os.path.exists(large["path"])
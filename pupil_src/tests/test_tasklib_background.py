@@ -0,0 +1,121 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import time
+
+import tasklib.background
+
+YIELD_COUNT = 2_000
+
+
+def _count(count):
+    for value in range(count):
+        yield [value]
+
+
+def _count_and_fail(count):
+    yield from _count(count)
+    raise ValueError("expected")
+
+
+def _yield_and_sleep(duration):
+    yield [0]
+    time.sleep(duration)
+    yield [1]
+
+
+def _yield_unpicklable(count):
+    yield from _count(count)
+    yield lambda: None
+
+
+def _yield_and_modify(count):
+    datum = [0]
+    for value in range(count):
+        datum[0] = value
+        yield datum
+
+
+def _run(task, timeout=10.0):
+    results = []
+    exceptions = []
+    task.add_observer("on_yield", results.append)
+    task.add_observer("on_exception", exceptions.append)
+    task.start()
+    deadline = time.monotonic() + timeout
+    while task.running and time.monotonic() < deadline:
+        task.update()
+        time.sleep(0.001)
+    assert task.ended
+    return results, exceptions
+
+
+def test_yields_are_batched_in_order():
+    task = tasklib.background.create(
+        "test", _count, args=(YIELD_COUNT,), patches=[], yield_batch_size=100
+    )
+    results, exceptions = _run(task)
+    assert task.completed and not exceptions
+    assert results == [[value] for value in range(YIELD_COUNT)]
+    statistics = task.yield_statistics
+    assert statistics.yield_count == YIELD_COUNT
+    assert YIELD_COUNT / 100 <= statistics.batch_count < YIELD_COUNT
+    assert statistics.received_bytes > 0
+
+
+def test_yields_before_exception_are_sent():
+    task = tasklib.background.create(
+        "test", _count_and_fail, args=(10,), patches=[], yield_batch_size=100
+    )
+    results, exceptions = _run(task)
+    assert not task.completed
+    assert results == [[value] for value in range(10)]
+    assert isinstance(exceptions[0], ValueError)
+
+
+def test_unpicklable_yield_raises_in_foreground():
+    task = tasklib.background.create(
+        "test", _yield_unpicklable, args=(10,), patches=[], yield_batch_size=100
+    )
+    results, exceptions = _run(task)
+    assert not task.completed
+    assert results == [[value] for value in range(10)]
+    assert exceptions
+
+
+def test_yields_are_sent_as_yielded():
+    task = tasklib.background.create(
+        "test", _yield_and_modify, args=(10,), patches=[], yield_batch_size=100
+    )
+    results, exceptions = _run(task)
+    assert task.completed and not exceptions
+    assert results == [[value] for value in range(10)]
+
+
+def test_yields_are_sent_while_generator_is_busy():
+    task = tasklib.background.create(
+        "test",
+        _yield_and_sleep,
+        args=(2.0,),
+        patches=[],
+        yield_batch_size=100,
+        yield_batch_latency=0.05,
+    )
+    results = []
+    task.add_observer("on_yield", results.append)
+    task.start()
+    deadline = time.monotonic() + 10.0
+    while not results and time.monotonic() < deadline:
+        task.update()
+        time.sleep(0.001)
+    # the first result arrives while the generator still sleeps
+    assert results == [[0]]
+    assert task.running
+    task.kill(grace_period=None)
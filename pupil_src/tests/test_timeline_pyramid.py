@@ -0,0 +1,83 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import numpy as np
+from timeline_pyramid import Min_Max_Pyramid
+
+START, END, NUM_BINS = 10.0, 20.0, 2**10
+
+
+def _signal(rng, count):
+    timestamps = np.sort(rng.uniform(START, END, count))
+    values = rng.normal(size=count)
+    # short spikes must survive any level of detail
+    values[rng.integers(0, count, 5)] = 100.0
+    return timestamps, values
+
+
+def test_envelope_matches_per_pixel_min_max():
+    rng = np.random.default_rng(0)
+    timestamps, values = _signal(rng, 50_000)
+    pyramid = Min_Max_Pyramid.from_signal(
+        START, END, timestamps, values, num_bins=NUM_BINS
+    )
+
+    for num_pixels in (1, 4, 64, NUM_BINS):
+        # pixel edges are aligned with the bin edges of the chosen level
+        envelope = pyramid.envelope(START, END, num_pixels)
+        pixels = np.minimum(
+            ((timestamps - START) / (END - START) * num_pixels).astype(int),
+            num_pixels - 1,
+        )
+        non_empty = np.unique(pixels)
+        assert len(envelope.timestamps) == len(non_empty)
+        expected_mins = [values[pixels == pixel].min() for pixel in non_empty]
+        expected_maxs = [values[pixels == pixel].max() for pixel in non_empty]
+        expected_means = [values[pixels == pixel].mean() for pixel in non_empty]
+        assert np.array_equal(envelope.mins, expected_mins)
+        assert np.array_equal(envelope.maxs, expected_maxs)
+        assert np.allclose(envelope.means, expected_means)
+
+    assert pyramid.limits == (values.min(), values.max())
+
+
+def test_incremental_update_matches_rebuild():
+    rng = np.random.default_rng(1)
+    timestamps, values = _signal(rng, 20_000)
+    pyramid = Min_Max_Pyramid.from_signal(
+        START, END, timestamps, values, num_bins=NUM_BINS
+    )
+
+    # change a section, append samples and add out-of-range and invalid samples
+    values = values.copy()
+    values[5_000:5_100] = rng.normal(size=100)
+    values[7_000] = np.nan
+    extra = np.sort(rng.uniform(END - 0.1, END + 0.1, 100))
+    timestamps = np.concatenate([timestamps[timestamps < END - 0.1], extra])
+    values = values[: len(timestamps)]
+    pyramid.update(timestamps, values)
+
+    rebuilt = Min_Max_Pyramid.from_signal(
+        START, END, timestamps, values, num_bins=NUM_BINS
+    )
+    for level in range(rebuilt.num_levels):
+        assert np.array_equal(pyramid._counts[level], rebuilt._counts[level])
+        assert np.array_equal(pyramid._mins[level], rebuilt._mins[level])
+        assert np.array_equal(pyramid._maxs[level], rebuilt._maxs[level])
+        assert np.allclose(pyramid._sums[level], rebuilt._sums[level])
+    assert rebuilt._counts[-1][0] == np.count_nonzero(
+        np.isfinite(values) & (timestamps <= END)
+    )
+
+
+def test_empty_pyramid():
+    pyramid = Min_Max_Pyramid(START, END)
+    assert pyramid.limits == (0.0, 1.0)
+    assert len(pyramid.envelope(START, END, 100).timestamps) == 0
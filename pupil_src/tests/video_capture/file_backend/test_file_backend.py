@@ -9,13 +9,22 @@ See COPYING and COPYING.LESSER for license details.
 ---------------------------------------------------------------------------~(*)
 """
 import logging
+import time
 from multiprocessing import cpu_count
 from types import SimpleNamespace
 
 import av
+import numpy as np
 import pytest
 from video_capture.base_backend import NoMoreVideoError
-from video_capture.file_backend import Decoder, File_Source, OnDemandDecoder
+from video_capture.file_backend import (
+    Decoder,
+    File_Source,
+    Frame,
+    Frame_Cache,
+    Frame_Read_Ahead,
+    OnDemandDecoder,
+)
 
 from ..common import broken_data, multiple_data, single_data
 
@@ -62,3 +71,105 @@ def test_get_rec_set_name(single_fill_gaps):
     assert ("/foo", "eye0_timestamp") == single_fill_gaps.get_rec_set_name(
         "/foo/eye0_timestamp.npy"
     )
+
+
+def _frame(index, width=64, height=48):
+    av_frame = av.VideoFrame(width, height, "yuv420p")
+    return Frame(timestamp=index / 30, av_frame=av_frame, index=index)
+
+
+def test_frame_cache_evicts_least_recently_used():
+    frames = [_frame(index) for index in range(4)]
+    frame_bytes = Frame_Cache.frame_bytes(frames[0])
+    assert frame_bytes == Frame_Cache.estimated_frame_bytes(64, 48)
+
+    cache = Frame_Cache(max_bytes=3 * frame_bytes)
+    for frame in frames[:3]:
+        cache.put(frame)
+    assert cache.get(0).index == 0
+    cache.put(frames[3])
+    assert 1 not in cache
+    assert all(index in cache for index in (0, 2, 3))
+    assert cache.num_bytes == 3 * frame_bytes
+    assert cache.get(1) is None
+    assert cache.get(3) is not frames[3]
+
+
+class _Counting_Source:
+    def __init__(self, frame_count):
+        self.frame_count = frame_count
+        self.target_frame_idx = 0
+        self.decoded = []
+
+    def get_frame_count(self):
+        return self.frame_count
+
+    def seek_to_frame(self, index):
+        self.target_frame_idx = index
+
+    def get_frame(self):
+        self.decoded.append(self.target_frame_idx)
+        self.target_frame_idx += 1
+        return _frame(self.decoded[-1])
+
+    def cleanup(self):
+        pass
+
+
+def test_read_ahead_fills_around_playhead():
+    source = _Counting_Source(frame_count=100)
+    cache = Frame_Cache(max_bytes=100 * Frame_Cache.estimated_frame_bytes(64, 48))
+    read_ahead = Frame_Read_Ahead(
+        lambda: source, cache, frames_ahead=10, frames_behind=5
+    )
+    read_ahead.update_playhead(50)
+    for _ in range(100):
+        if len(cache) == 15:
+            break
+        time.sleep(0.01)
+    read_ahead.stop()
+    assert sorted(source.decoded) == list(range(45, 50)) + list(range(51, 61))
+    assert source.decoded[:10] == list(range(51, 61))
+
+
+def _write_video(path, frame_count, gop_size):
+    """Video whose frames have the brightness `4 * index`, with timestamps"""
+    container = av.open(str(path), "w")
+    stream = container.add_stream("mpeg4", rate=30)
+    stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+    stream.codec_context.gop_size = gop_size
+    for index in range(frame_count):
+        img = np.full((48, 64, 3), 4 * index, dtype=np.uint8)
+        frame = av.VideoFrame.from_ndarray(img, format="rgb24")
+        container.mux(stream.encode(frame))
+    container.mux(stream.encode())
+    container.close()
+    np.save(str(path).replace(".mp4", "_timestamps.npy"), np.arange(frame_count) / 30)
+
+
+@pytest.mark.skipif(
+    not hasattr(av, "AVError"), reason="decoding requires a PyAV with av.AVError"
+)
+def test_uncached_frame_after_seek_to_cached_frame(tmp_path):
+    video_path = tmp_path / "world.mp4"
+    _write_video(video_path, frame_count=60, gop_size=10)
+    source = File_Source(
+        SimpleNamespace(),
+        source_path=str(video_path),
+        timing=None,
+        frame_cache_mb=16,
+        read_ahead=False,
+    )
+    source.seek_to_frame(20)
+    expected = source.get_frame().gray.mean()
+
+    # moves the decoder, but the following seek to a cached frame does not
+    source.seek_to_frame(50)
+    source.seek_to_frame(20)
+    cached = source.get_frame()
+    uncached = source.get_frame()
+
+    assert cached.index == 20 and cached.gray.mean() == expected
+    assert uncached.index == 21 and uncached.timestamp == pytest.approx(21 / 30)
+    assert uncached.gray.mean() > expected
+    assert source.target_frame_idx == 22
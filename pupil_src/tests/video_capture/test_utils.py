@@ -0,0 +1,35 @@
+"""
+(*)~---------------------------------------------------------------------------
+Pupil - eye tracking platform
+Copyright (C) Pupil Labs
+
+Distributed under the terms of the GNU
+Lesser General Public License (LGPL v3.0).
+See COPYING and COPYING.LESSER for license details.
+---------------------------------------------------------------------------~(*)
+"""
+import numpy as np
+import pytest
+from video_capture.utils import Video, _sorted_isin
+
+from .common import multiple_data, single_data
+
+
+@pytest.mark.parametrize("path", [single_data, multiple_data])
+def test_pts_from_index_matches_demux(path):
+    video = Video(path)
+    container = video.load_container()
+    index_pts = Video._pts_from_index(container)
+    demux_pts = Video._pts_from_demux(container)
+    assert index_pts is not None
+    assert index_pts.tolist() == demux_pts.tolist()
+
+
+def test_sorted_isin():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        values = np.sort(rng.integers(0, 50, size=rng.integers(0, 60)) / 10)
+        test_values = rng.integers(-5, 55, size=rng.integers(0, 30)) / 10
+        test_values = np.append(test_values, np.nan)
+        expected = np.isin(values, test_values)
+        assert _sorted_isin(values, test_values).tolist() == expected.tolist()